@@ -0,0 +1 @@
+"""Offline benchmarks for the Aura Telegram Bot."""
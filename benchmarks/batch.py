@@ -0,0 +1,96 @@
+"""Throughput benchmark of the CLI batch mode against a fake Gemini backend.
+
+The real engine is built with ``create_engine`` and answers a batch of
+distinct questions with ``cli.run_batch`` at several concurrency levels, so
+that neither the answer cache nor call coalescing hides the model latency.
+Gemini is replaced by ``FakeGemini``, so nothing leaves the machine. For each
+level, the benchmark reports questions per second, latency percentiles and
+the mean prompt size. Throughput stops growing at ``GEMINI_MAX_CONCURRENCY``
+(4 by default): beyond it, questions wait in the engine's scheduler.
+
+Run with::
+
+    python -m benchmarks.batch
+    python -m benchmarks.batch --questions 400 --concurrency 1 8 32 --latency 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.core.factory import create_engine
+from benchmarks.fakes import FakeGemini
+from benchmarks.retrieval import KNOWLEDGE_BASE_PATH, synthesize_corpus
+from benchmarks.stats import latency_summary
+from benchmarks.suite import configure_environment
+from cli import BatchQuestion, run_batch
+
+
+async def measure(questions: list[BatchQuestion], concurrency: int, gemini: FakeGemini) -> dict:
+    """Answers the batch with a fresh engine and summarizes the results."""
+    with patch("aura_telegram_bot.core.engine.genai", gemini):
+        engine = create_engine(get_settings())
+    output = io.StringIO()
+    try:
+        started = time.perf_counter()
+        answered = await run_batch(engine, questions, output, concurrency=concurrency)
+        elapsed = time.perf_counter() - started
+    finally:
+        engine.close()
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    summary = latency_summary([record["latency_ms"] / 1000 for record in records])
+    return {
+        "concurrency": concurrency,
+        "questions_per_s": round(answered / elapsed, 1),
+        "p50_ms": round(summary["p50_ms"], 1),
+        "p95_ms": round(summary["p95_ms"], 1),
+        "p99_ms": round(summary["p99_ms"], 1),
+        "prompt_tokens_mean": round(statistics.mean(r["prompt_tokens"] for r in records)),
+        "errors": sum(record["source"] == "error" for record in records),
+    }
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.1, help="Median model latency.")
+    parser.add_argument("--kb-size", type=int, default=50, help="Knowledge base size in KB.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    questions = [
+        BatchQuestion(str(number), f"What does fault code F{number} mean?")
+        for number in range(args.questions)
+    ]
+    with tempfile.TemporaryDirectory() as workdir:
+        knowledge_base = Path(workdir) / "knowledge_base.txt"
+        seed = KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8")
+        knowledge_base.write_text(synthesize_corpus(seed, args.kb_size), encoding="utf-8")
+        configure_environment(knowledge_base, cache=True, stream=False, edit_interval=1.0)
+        results = {
+            "questions": args.questions,
+            "median_latency_s": args.latency,
+            "runs": [
+                asyncio.run(
+                    measure(questions, concurrency, FakeGemini(median_latency=args.latency))
+                )
+                for concurrency in args.concurrency
+            ],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark startup time and memory of a knowledge base directory against a single file.
+
+A corpus of synthetic device manuals is written to a temporary directory.
+The benchmark then compares:
+
+* ``file``: all manuals concatenated into one file, read with ``read_text``
+  and indexed in full, as for a ``knowledge_base.txt``;
+* ``corpus``: the directory opened with ``Corpus.open``, which reads only the
+  front matter, then loads documents as questions need them.
+
+For each, it reports the time to open, the latency of the first question and
+of the following ones, and the peak Python heap traced while answering.
+
+Run with::
+
+    python -m benchmarks.corpus
+    python -m benchmarks.corpus --documents 20 --document-kb 4000 --resident-mb 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from aura_telegram_bot.core.corpus import Corpus
+from aura_telegram_bot.core.retrieval import KnowledgeIndex
+from benchmarks.retrieval import KNOWLEDGE_BASE_PATH, synthesize_corpus
+from benchmarks.stats import latency_summary
+
+TOP_K = 4
+TOKEN_BUDGET = 2000
+
+
+def write_corpus(directory: Path, documents: int, document_kb: int) -> list[str]:
+    """Writes the synthetic manuals and returns one question per device."""
+    seed = KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8")
+    body = synthesize_corpus(seed, document_kb)
+    questions = []
+    for number in range(documents):
+        device = f"Device{number} unit"
+        (directory / f"device_{number:03}.md").write_text(
+            f"---\ndevice: {device}\nkeywords: device{number}\ndefault: {number == 0}\n---\n"
+            + body,
+            encoding="utf-8",
+        )
+        questions.append(f"What does fault code F2 on device{number} mean?")
+    return questions
+
+
+def measure(
+    name: str,
+    open_knowledge_base: Callable[[], KnowledgeIndex | Corpus],
+    questions: list[str],
+    rounds: int,
+) -> dict:
+    """Opens a knowledge base, asks every question ``rounds`` times and summarizes."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    knowledge_base = open_knowledge_base()
+    opened = time.perf_counter() - started
+    _, open_peak = tracemalloc.get_traced_memory()
+
+    first = []
+    repeated = []
+    for round_number in range(rounds):
+        for question in questions:
+            started = time.perf_counter()
+            knowledge_base.build_context(question, top_k=TOP_K, token_budget=TOKEN_BUDGET)
+            (first if round_number == 0 else repeated).append(time.perf_counter() - started)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {
+        "setup": name,
+        "open_ms": round(opened * 1000, 1),
+        "open_peak_mib": round(open_peak / 2**20, 2),
+        "first_question_ms": round(latency_summary(first)["p50_ms"], 2),
+        "repeated_question_ms": round(latency_summary(repeated)["p50_ms"], 2),
+        "heap_after_mib": round(current / 2**20, 2),
+        "heap_peak_mib": round(peak / 2**20, 2),
+    }
+    if isinstance(knowledge_base, Corpus):
+        result.update(loads=knowledge_base.loads, evictions=knowledge_base.evictions)
+    return result
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--document-kb", type=int, default=1000, help="Size of each manual.")
+    parser.add_argument("--resident-mb", type=float, default=4, help="Corpus memory budget.")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        directory = Path(workdir) / "documents"
+        directory.mkdir()
+        questions = write_corpus(directory, args.documents, args.document_kb)
+        single_file = Path(workdir) / "knowledge_base.txt"
+        single_file.write_text(
+            "\n\n".join(path.read_text(encoding="utf-8") for path in sorted(directory.iterdir())),
+            encoding="utf-8",
+        )
+
+        results = {
+            "documents": args.documents,
+            "document_kb": args.document_kb,
+            "resident_mb": args.resident_mb,
+            "setups": [
+                measure(
+                    "file",
+                    lambda: KnowledgeIndex.from_text(single_file.read_text(encoding="utf-8")),
+                    questions,
+                    args.rounds,
+                ),
+                measure(
+                    "corpus",
+                    lambda: Corpus.open(
+                        directory,
+                        max_resident_bytes=int(args.resident_mb * 2**20),
+                        documents_per_question=1,
+                    ),
+                    questions,
+                    args.rounds,
+                ),
+            ],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
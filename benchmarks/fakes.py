@@ -0,0 +1,245 @@
+"""Local stand-ins for the Telegram Bot API, Gemini and the engine, used by the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import math
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
+from types import SimpleNamespace
+from typing import Any
+
+from telegram.request import BaseRequest, RequestData
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Aura", "username": "aura_test_bot"}
+TEST_USER_ID = 123456789
+
+
+def make_update(update_id: int, chat_id: int, text: str, user_id: int = TEST_USER_ID) -> dict:
+    """Builds a synthetic Telegram ``Update`` payload carrying a text message."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Load"},
+            "text": text,
+        },
+    }
+
+
+class FakeBotApi(BaseRequest):
+    """Answers Bot API requests locally instead of calling api.telegram.org.
+
+    Every outgoing message is recorded with the time it was sent, so that
+    benchmarks can measure end-to-end latency per chat.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Initializes the fake API.
+
+        Args:
+            latency: Simulated network latency per Bot API call, in seconds.
+        """
+        self._latency = latency
+        self._message_ids = itertools.count(1)
+        self.calls: Counter[str] = Counter()
+        self.sent: list[tuple[float, int, str]] = []
+        self.on_send: Callable[[int, str], None] | None = None
+
+    @property
+    def read_timeout(self) -> float | None:
+        """The fake API never times out."""
+        return None
+
+    async def initialize(self) -> None:
+        """Nothing to set up."""
+
+    async def shutdown(self) -> None:
+        """Nothing to tear down."""
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: RequestData | None = None,
+        read_timeout: Any = None,
+        write_timeout: Any = None,
+        connect_timeout: Any = None,
+        pool_timeout: Any = None,
+    ) -> tuple[int, bytes]:
+        """Returns a canned successful response for the Bot API method in the URL."""
+        endpoint = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+        self.calls[endpoint] += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+        result: Any = True
+        if endpoint == "getMe":
+            result = BOT_USER
+        elif endpoint == "getUpdates":
+            await asyncio.sleep(0.1)
+            result = []
+        elif endpoint in ("sendMessage", "editMessageText"):
+            chat_id = int(params["chat_id"])
+            text = str(params["text"])
+            self.sent.append((time.perf_counter(), chat_id, text))
+            if self.on_send:
+                self.on_send(chat_id, text)
+            result = {
+                "message_id": params.get("message_id") or next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": text,
+            }
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+class StubEngine:
+    """An engine with a fixed answer latency and no model behind it."""
+
+    def __init__(self, latency: float = 0.05, answer: str = "Stub answer.") -> None:
+        """Initializes the stub.
+
+        Args:
+            latency: How long each answer takes, in seconds.
+            answer: The answer returned for every question.
+        """
+        self._latency = latency
+        self._answer = answer
+        self.questions = 0
+
+    async def get_response(self, user_input: str, *args: Any, **kwargs: Any) -> str:
+        """Returns the fixed answer after the configured latency."""
+        self.questions += 1
+        await asyncio.sleep(self._latency)
+        return self._answer
+
+    async def stream_response(
+        self, user_input: str, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """Yields the fixed answer in one chunk after the configured latency."""
+        yield await self.get_response(user_input)
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class FakeGeminiError(Exception):
+    """A simulated, non-retryable Gemini API failure."""
+
+
+def _refuse_context_cache(**kwargs: Any) -> Any:
+    """Fails like a model without context caching, so the engine sends prompts instead."""
+    raise FakeGeminiError("Context caching is not simulated.")
+
+
+class FakeGemini:
+    """Stands in for the ``google.generativeai`` module the engine calls.
+
+    Answers take a log-normally distributed time, which has the long tail of
+    real model latency, and fail at a configurable rate. Every prompt is
+    recorded, so benchmarks can report how many bytes the bot sends.
+    """
+
+    caching = SimpleNamespace(CachedContent=SimpleNamespace(create=_refuse_context_cache))
+
+    def __init__(
+        self,
+        *,
+        median_latency: float = 0.5,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        stall_latency: float = 5.0,
+        chunks: int = 4,
+        answer: str = "The boiler pressure should be between 1 and 2 bar when cold.",
+        seed: int = 42,
+    ) -> None:
+        """Initializes the fake.
+
+        Args:
+            median_latency: The median time to a complete answer, in seconds.
+            latency_sigma: The spread of the log-normal latency distribution;
+                0 makes every call take exactly the median.
+            error_rate: The share of calls that fail, between 0 and 1.
+            stall_rate: The share of calls that stall, e.g. on an overloaded
+                backend, between 0 and 1.
+            stall_latency: How long a stalled call takes, in seconds.
+            chunks: How many pieces a streamed answer arrives in.
+            answer: The text of every answer.
+            seed: Seeds the latency and error draws, for repeatable runs.
+        """
+        self.median_latency = median_latency
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_latency = stall_latency
+        self.chunks = chunks
+        self.answer = answer
+        self._rng = random.Random(seed)  # noqa: S311
+        self.calls = 0
+        self.errors = 0
+        self.prompt_bytes: list[int] = []
+
+    def configure(self, **kwargs: Any) -> None:
+        """Accepts the API key; there is nothing to configure."""
+
+    def GenerativeModel(  # Mirrors the attribute of the real module.
+        self, model_name: str, system_instruction: str = ""
+    ) -> FakeGeminiModel:
+        """Returns a model that answers with the fake's latency and error rate."""
+        return FakeGeminiModel(self, len(system_instruction.encode("utf-8")))
+
+    def draw(self, prompt: str, system_bytes: int) -> tuple[float, bool]:
+        """Records a call and returns its latency and whether it fails."""
+        self.calls += 1
+        self.prompt_bytes.append(system_bytes + len(prompt.encode("utf-8")))
+        latency = self.median_latency * math.exp(self._rng.gauss(0, self.latency_sigma))
+        if self.stall_rate and self._rng.random() < self.stall_rate:
+            latency = self.stall_latency
+        fails = self._rng.random() < self.error_rate
+        self.errors += fails
+        return latency, fails
+
+
+class FakeGeminiModel:
+    """A fake model bound to one system instruction."""
+
+    def __init__(self, gemini: FakeGemini, system_bytes: int) -> None:
+        """Initializes the model.
+
+        Args:
+            gemini: The fake that draws latencies and records prompts.
+            system_bytes: The size of the system instruction sent with every prompt.
+        """
+        self._gemini = gemini
+        self._system_bytes = system_bytes
+
+    async def generate_content_async(self, prompt: str, stream: bool = False) -> Any:
+        """Answers after the drawn latency, in one piece or as a stream."""
+        latency, fails = self._gemini.draw(prompt, self._system_bytes)
+        if not stream:
+            await asyncio.sleep(latency)
+            if fails:
+                raise FakeGeminiError("Simulated Gemini failure.")
+            return SimpleNamespace(text=self._gemini.answer)
+        return self._stream(latency, fails)
+
+    async def _stream(self, latency: float, fails: bool) -> AsyncIterator[SimpleNamespace]:
+        """Yields the answer in evenly spaced chunks, failing halfway if drawn to fail."""
+        text = self._gemini.answer
+        size = -(-len(text) // self._gemini.chunks)
+        pieces = [text[start : start + size] for start in range(0, len(text), size)]
+        for number, piece in enumerate(pieces):
+            await asyncio.sleep(latency / len(pieces))
+            if fails and number >= len(pieces) // 2:
+                raise FakeGeminiError("Simulated Gemini failure.")
+            yield SimpleNamespace(text=piece)
@@ -0,0 +1,104 @@
+"""Benchmark the latency tail of Gemini calls with and without a hedging fallback model.
+
+The real engine is built with ``create_engine`` and answers distinct questions
+from several simulated users at once, with the answer cache off. Gemini is
+replaced by ``FakeGemini``, which stalls a share of its calls, as an overloaded
+backend does. With a fallback model configured, a call that outlives the
+primary's usual latency is also sent to the fallback, whose calls stall
+independently, and the first answer wins.
+
+Run with::
+
+    python -m benchmarks.hedging
+    python -m benchmarks.hedging --requests 1000 --stall-rate 0.05 --stall-latency 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.core.factory import create_engine
+from benchmarks.fakes import FakeGemini
+from benchmarks.retrieval import KNOWLEDGE_BASE_PATH
+from benchmarks.stats import latency_summary
+from benchmarks.suite import configure_environment
+
+
+async def measure(args: argparse.Namespace, fallback_models: list[str]) -> dict:
+    """Answers the requests with a fresh engine and summarizes their latency."""
+    os.environ["GEMINI_FALLBACK_MODELS"] = json.dumps(fallback_models)
+    os.environ["GEMINI_MAX_CONCURRENCY"] = str(args.users)
+    os.environ["INTENT_ROUTER_ENABLED"] = "false"
+    get_settings.cache_clear()
+    gemini = FakeGemini(
+        median_latency=args.latency,
+        latency_sigma=0.3,
+        stall_rate=args.stall_rate,
+        stall_latency=args.stall_latency,
+    )
+    with patch("aura_telegram_bot.core.engine.genai", gemini):
+        engine = create_engine(get_settings())
+    latencies: list[float] = []
+    questions = iter(range(args.requests))
+
+    async def user() -> None:
+        for number in questions:
+            started = time.perf_counter()
+            await engine.get_response(f"What does fault code F{number} mean?")
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(user() for _ in range(args.users)))
+    finally:
+        engine.close()
+    summary = latency_summary(latencies)
+    return {
+        "fallback_models": fallback_models,
+        "p50_ms": round(summary["p50_ms"], 1),
+        "p95_ms": round(summary["p95_ms"], 1),
+        "p99_ms": round(summary["p99_ms"], 1),
+        "max_ms": round(summary["max_ms"], 1),
+        "model_calls": gemini.calls,
+        "hedges": engine.hedger.hedges,
+        "hedge_wins": engine.hedger.hedge_wins,
+    }
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Median model latency.")
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall-latency", type=float, default=1.0, help="Seconds.")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        knowledge_base = Path(workdir) / "knowledge_base.txt"
+        knowledge_base.write_text(KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8"))
+        configure_environment(knowledge_base, cache=False, stream=False, edit_interval=1.0)
+        results = {
+            "requests": args.requests,
+            "stall_rate": args.stall_rate,
+            "stall_latency_s": args.stall_latency,
+            "runs": [
+                asyncio.run(measure(args, fallback_models))
+                for fallback_models in ([], ["gemini-fallback"])
+            ],
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
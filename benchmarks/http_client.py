@@ -0,0 +1,100 @@
+"""Benchmark per-request latency of a pooled HTTP client versus a client per use.
+
+Runs a local stub of the Home Assistant states endpoint and fetches an entity
+state repeatedly, either opening a new client for every ``async with`` block
+(as integrations did before the shared client) or reusing one pooled client.
+The stub speaks plain HTTP on loopback, so the difference shown is a lower
+bound: against a real server, every new connection also pays a TLS handshake.
+
+Run with::
+
+    python -m benchmarks.http_client --requests 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application, RequestHandler
+
+from aura_telegram_bot.integrations.home_assistant import HomeAssistantClient
+from aura_telegram_bot.integrations.http import create_http_client
+from benchmarks.stats import latency_summary
+
+ENTITY_ID = "sensor.boiler_pressure"
+TOKEN = "benchmark-token"  # noqa: S105
+
+
+class StateHandler(RequestHandler):
+    """Answers every state request with the same small entity state."""
+
+    def get(self, entity_id: str) -> None:
+        """Returns the state of an entity."""
+        self.write({"entity_id": entity_id, "state": "1.5"})
+
+
+def start_stub_server() -> tuple[HTTPServer, str]:
+    """Starts the stub server on a free local port and returns its base URL."""
+    sockets = bind_sockets(0, "127.0.0.1")
+    server = HTTPServer(Application([(r"/api/states/(.+)", StateHandler)]))
+    server.add_sockets(sockets)
+    return server, f"http://127.0.0.1:{sockets[0].getsockname()[1]}"
+
+
+async def per_use_client(base_url: str, requests: int) -> list[float]:
+    """Measures requests that each open and close their own client."""
+    client = HomeAssistantClient(base_url, TOKEN, state_ttl=0)
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        async with client:
+            await client.get_entity_state(ENTITY_ID)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def pooled_client(base_url: str, requests: int) -> list[float]:
+    """Measures requests that share one pooled client."""
+    http_client = create_http_client()
+    client = HomeAssistantClient(base_url, TOKEN, client=http_client, state_ttl=0)
+    latencies = []
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            await client.get_entity_state(ENTITY_ID)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        await http_client.aclose()
+    return latencies
+
+
+async def run(requests: int) -> dict:
+    """Runs both variants against the stub server and returns their latencies."""
+    server, base_url = start_stub_server()
+    try:
+        # Warm up the server and the imports before measuring.
+        await pooled_client(base_url, 10)
+        return {
+            "requests": requests,
+            "per_use_client": latency_summary(await per_use_client(base_url, requests)),
+            "pooled_client": latency_summary(await pooled_client(base_url, requests)),
+        }
+    finally:
+        server.stop()
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
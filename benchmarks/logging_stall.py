@@ -0,0 +1,136 @@
+"""Benchmark how much logging stalls the event loop.
+
+Simulated requests log the lines the bot logs per update while a probe task
+measures how late the event loop wakes it up. The log output is a stream
+whose writes take a configurable time, standing in for a slow terminal, a
+full pipe or a container logging driver.
+
+Two setups are compared: the synchronous ``logging.basicConfig`` handler the
+bot used to install, which writes on the event loop, and ``configure_logging``,
+which queues records and writes them from a background thread.
+
+Run with::
+
+    python -m benchmarks.logging_stall
+    python -m benchmarks.logging_stall --write-latency 0.002 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import time
+from typing import TextIO
+
+from aura_telegram_bot.logs import configure_logging, request_context, user_text
+from benchmarks.stats import latency_summary
+
+QUESTION = "The pressure is below 1 bar and the display shows F2, what should I do?"
+# How often the probe checks the event loop, in seconds.
+PROBE_INTERVAL = 0.001
+
+
+class SlowStream(io.StringIO):
+    """A text stream whose writes block for a fixed time."""
+
+    def __init__(self, latency: float) -> None:
+        """Initializes the stream.
+
+        Args:
+            latency: How long each write blocks, in seconds.
+        """
+        super().__init__()
+        self._latency = latency
+
+    def write(self, text: str) -> int:
+        """Blocks, then discards the text."""
+        time.sleep(self._latency)
+        return len(text)
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    """Records how late each wake-up of the event loop is."""
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def serve(requests: int, concurrency: int, logger: logging.Logger) -> float:
+    """Simulates requests that log like the bot does; returns the seconds they took."""
+
+    async def request(number: int) -> None:
+        with request_context(number):
+            logger.info("Received question from user %s: %r", 123456789, user_text(QUESTION))
+            logger.info("Answer served from cache.")
+            await asyncio.sleep(0)
+            logger.info("Trace %s: %s", "telegram_update", "cache@0.1ms=0.0ms")
+
+    started = time.perf_counter()
+    for first in range(0, requests, concurrency):
+        await asyncio.gather(
+            *(request(number) for number in range(first, min(first + concurrency, requests)))
+        )
+    return time.perf_counter() - started
+
+
+async def measure(requests: int, concurrency: int) -> dict[str, float]:
+    """Serves the requests while probing the event loop, and summarizes the lag."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+    elapsed = await serve(requests, concurrency, logging.getLogger("aura_telegram_bot.main"))
+    stop.set()
+    await prober
+    summary = latency_summary(lags)
+    return {
+        "loop_lag_p50_ms": round(summary["p50_ms"], 3),
+        "loop_lag_p99_ms": round(summary["p99_ms"], 3),
+        "loop_lag_max_ms": round(summary["max_ms"], 3),
+        "requests_per_s": round(requests / elapsed, 1),
+    }
+
+
+def run_setup(name: str, stream: TextIO, args: argparse.Namespace) -> dict[str, float]:
+    """Installs one logging setup, measures it and removes it again."""
+    root = logging.getLogger()
+    listener = None
+    if name == "synchronous":
+        logging.basicConfig(
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+            level=logging.INFO,
+            stream=stream,
+            force=True,
+        )
+    else:
+        listener = configure_logging(stream=stream, json_format=True)
+    try:
+        return asyncio.run(measure(args.requests, args.concurrency))
+    finally:
+        if listener is not None:
+            listener.stop()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-latency", type=float, default=0.0005, help="Seconds.")
+    args = parser.parse_args()
+
+    results = {
+        name: run_setup(name, SlowStream(args.write_latency), args)
+        for name in ("synchronous", "queued")
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark the cost of metrics and tracing on the hot path.
+
+Measures each instrumentation primitive on its own, then the full answer
+path of the engine for a cached question, with tracing off and with every
+request traced. The engine is built with a mocked Gemini module, so no
+network is needed. A cached answer is the cheapest request the bot
+serves, so it shows the largest relative overhead.
+
+Run with::
+
+    python -m benchmarks.metrics_overhead
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import timeit
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from aura_telegram_bot.core.engine import AuraEngine
+from aura_telegram_bot.metrics import (
+    Counter,
+    Histogram,
+    configure_tracing,
+    span,
+    trace_request,
+)
+from benchmarks.stats import latency_summary
+
+QUESTION = "What does fault code F2 mean?"
+
+
+def primitive_costs(rounds: int) -> dict[str, float]:
+    """Returns the cost of each instrumentation primitive, in nanoseconds per call."""
+    counter = Counter("benchmark_total", "Benchmark.")
+    labelled = Counter("benchmark_labelled_total", "Benchmark.", ["component"])
+    histogram = Histogram("benchmark_seconds", "Benchmark.")
+
+    def timed_block() -> None:
+        with histogram.time():
+            pass
+
+    def untraced_span() -> None:
+        with span("stage"):
+            pass
+
+    candidates = {
+        "counter_inc": counter.inc,
+        "labelled_counter_inc": lambda: labelled.inc(labels=("gemini",)),
+        "histogram_observe": lambda: histogram.observe(0.123),
+        "histogram_time": timed_block,
+        "span_without_trace": untraced_span,
+    }
+    return {
+        name: round(min(timeit.repeat(func, number=rounds, repeat=5)) / rounds * 1e9, 1)
+        for name, func in candidates.items()
+    }
+
+
+async def cached_answer_latencies(requests: int, *, traced: bool) -> list[float]:
+    """Answers a cached question repeatedly and returns the latency of each answer."""
+    with patch("aura_telegram_bot.core.engine.genai") as genai:
+        generate = genai.GenerativeModel.return_value.generate_content_async
+
+        async def answer(prompt: str) -> SimpleNamespace:
+            return SimpleNamespace(text="Overheating.")
+
+        generate.side_effect = answer
+        engine = AuraEngine(
+            gemini_api_key="benchmark",
+            knowledge_base="Fault code F2: overheating.",
+            intent_threshold=None,
+        )
+        await engine.get_response(QUESTION)
+        configure_tracing(1.0 if traced else 0.0)
+        latencies = []
+        try:
+            for _ in range(requests):
+                started = timeit.default_timer()
+                with trace_request("benchmark"):
+                    await engine.get_response(QUESTION)
+                latencies.append(timeit.default_timer() - started)
+        finally:
+            configure_tracing(0.0)
+    return latencies
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    args = parser.parse_args()
+    # Keep per-request log lines out of the measurement.
+    logging.disable(logging.INFO)
+    untraced = asyncio.run(cached_answer_latencies(args.requests, traced=False))
+    traced = asyncio.run(cached_answer_latencies(args.requests, traced=True))
+    results = {
+        "primitives_ns": primitive_costs(args.rounds),
+        "cached_answer": latency_summary(untraced),
+        "cached_answer_traced": latency_summary(traced),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark per-request prompt construction cost and input tokens.
+
+Compares the original prompt, which dedented an f-string embedding the whole
+knowledge base on every question, with the precompiled static prefix, with
+and without Gemini's server-side context cache.
+
+Run with::
+
+    python -m benchmarks.prompt
+"""
+
+from __future__ import annotations
+
+import textwrap
+import timeit
+
+from aura_telegram_bot.core.prompt import PromptPrefix
+from aura_telegram_bot.core.retrieval import estimate_tokens
+from benchmarks.retrieval import KNOWLEDGE_BASE_PATH, synthesize_corpus
+
+QUESTION = "What does fault code F2 mean?"
+TOP_K = 4
+TOKEN_BUDGET = 2000
+ROUNDS = 2000
+
+
+def legacy_prompt(knowledge_base: str, question: str) -> str:
+    """Builds the prompt the way the engine did before the static prefix."""
+    return textwrap.dedent(f"""
+        You are a helpful and polite expert assistant for the Viessmann Vitodens 111-F gas
+        boiler. Your task is to answer user questions based ONLY on the technical
+        information provided below. If the answer cannot be found in the provided text,
+        you must clearly state that you do not have that information.
+        Do not invent any information. Answer in the same language as the user's question.
+
+        --- Knowledge Base Start ---
+        {knowledge_base}
+        --- Knowledge Base End ---
+
+        User Question: "{question}"
+        """).strip()
+
+
+def measure(label: str, knowledge_base: str) -> None:
+    """Prints construction time and input tokens for one knowledge base."""
+    legacy_us = timeit.timeit(lambda: legacy_prompt(knowledge_base, QUESTION), number=ROUNDS)
+    legacy_tokens = estimate_tokens(legacy_prompt(knowledge_base, QUESTION))
+
+    prefix = PromptPrefix.build(knowledge_base, token_budget=TOKEN_BUDGET)
+    render = lambda: prefix.render(QUESTION, top_k=TOP_K, token_budget=TOKEN_BUDGET)  # noqa: E731
+    prefix_us = timeit.timeit(render, number=ROUNDS)
+    request_tokens = estimate_tokens(render())
+    prefix_tokens = estimate_tokens(prefix.system_instruction)
+
+    cached = PromptPrefix.build(knowledge_base, token_budget=TOKEN_BUDGET, inline=True)
+    cached_tokens = estimate_tokens(
+        cached.render(QUESTION, top_k=TOP_K, token_budget=TOKEN_BUDGET)
+    )
+
+    scale = 1_000_000 / ROUNDS
+    print(f"{label}")
+    print(f"  legacy f-string     {legacy_us * scale:>9.1f} us/request {legacy_tokens:>8} tokens")
+    print(
+        f"  static prefix       {prefix_us * scale:>9.1f} us/request "
+        f"{prefix_tokens + request_tokens:>8} tokens ({request_tokens} rendered per request)",
+    )
+    print(f"  context cache       {'-':>9} us/request {cached_tokens:>8} tokens (question only)")
+
+
+def main() -> None:
+    """Runs the benchmark for the shipped and a large synthetic knowledge base."""
+    seed = KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8")
+    measure(f"knowledge_base.txt ({len(seed)} bytes)", seed)
+    large = synthesize_corpus(seed, 200)
+    measure(f"synthetic corpus ({len(large)} bytes)", large)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Recovery benchmark: how long the bot takes to answer a backlog after a restart.
+
+A journal is filled with thousands of unanswered updates, spread over many
+chats and with some questions repeated, as if they had arrived while the bot
+was down. A fresh application is then started on it, with a stub engine and
+a fake Bot API, and the benchmark measures the time until the journal is
+empty, i.e. every update left over was answered, merged or dropped as a
+repeat. It reports updates recovered per second and how many answers the
+backlog took.
+
+Run with::
+
+    python -m benchmarks.recovery
+    python -m benchmarks.recovery --updates 10000 --chats 500 --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from telegram import Update
+from telegram.ext import Application, CommandHandler, MessageHandler, filters
+
+from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.dispatch import PerChatUpdateProcessor
+from aura_telegram_bot.journal import JournaledUpdateQueue, UpdateJournal
+from aura_telegram_bot.main import handle_message, start
+from benchmarks.fakes import FakeBotApi, StubEngine, make_update
+from benchmarks.webhook_load import configure_environment
+
+
+def fill_journal(path: Path, updates: int, chats: int, repeat_rate: float) -> None:
+    """Records a backlog of unanswered questions, as left by a bot that went down."""
+    rng = random.Random(42)  # noqa: S311
+    journal = UpdateJournal(path)
+    asked: dict[int, list[str]] = {}
+    for update_id in range(1, updates + 1):
+        chat_id = rng.randrange(chats)
+        previous = asked.setdefault(chat_id, [])
+        if previous and rng.random() < repeat_rate:
+            text = rng.choice(previous)
+        else:
+            text = f"Question {update_id}"
+            previous.append(text)
+        journal.record(Update.de_json(make_update(update_id, chat_id, text), None))
+    journal.close()
+
+
+def build_application(
+    api: FakeBotApi, engine: StubEngine, journal: UpdateJournal, workers: int
+) -> Application:
+    """Builds the bot application on a journal, wired to the fake Bot API and the stub engine."""
+    processor = PerChatUpdateProcessor(
+        workers,
+        merge_window=get_settings().chat_merge_window_seconds,
+        journal=journal,
+    )
+    application = (
+        Application.builder()
+        .token(get_settings().telegram_token)
+        .request(api)
+        .get_updates_request(api)
+        .concurrent_updates(processor)
+        .update_queue(JournaledUpdateQueue(journal))
+        .build()
+    )
+    processor.bind(application)
+    application.bot_data["engine"] = engine
+    application.bot_data["update_journal"] = journal
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    return application
+
+
+async def recover(path: Path, workers: int, engine_latency: float) -> dict:
+    """Starts the bot on the journal and waits until its backlog is answered."""
+    journal = UpdateJournal(path)
+    backlog = len(journal)
+    api = FakeBotApi()
+    application = build_application(api, StubEngine(engine_latency), journal, workers)
+    await application.initialize()
+    await application.start()
+
+    started = time.perf_counter()
+    queue = application.update_queue
+    if not isinstance(queue, JournaledUpdateQueue):
+        raise TypeError("The application was built without the journaled update queue.")
+    replayed = queue.replay(application.bot)
+    while len(journal):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+
+    await application.stop()
+    await application.shutdown()
+    journal.close()
+    return {
+        "backlog": backlog,
+        "replayed": replayed,
+        "repeats_skipped": backlog - replayed,
+        "answers_sent": len(api.sent),
+        "workers": workers,
+        "engine_latency_ms": engine_latency * 1000,
+        "recovery_s": round(elapsed, 2),
+        "updates_per_s": round(backlog / elapsed, 1),
+    }
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=250)
+    parser.add_argument("--repeat-rate", type=float, default=0.1, help="Repeated questions.")
+    parser.add_argument("--engine-latency", type=float, default=0.01, help="Seconds.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, force=True)
+    configure_environment()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers in args.workers:
+            path = Path(workdir) / f"updates-{workers}.sqlite3"
+            fill_journal(path, args.updates, args.chats, args.repeat_rate)
+            runs.append(asyncio.run(recover(path, workers, args.engine_latency)))
+    print(json.dumps({"updates": args.updates, "chats": args.chats, "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark prompt size and retrieval latency against knowledge base size.
+
+Run with::
+
+    python -m benchmarks.retrieval
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from pathlib import Path
+
+from aura_telegram_bot.core.retrieval import KnowledgeIndex
+
+KNOWLEDGE_BASE_PATH = Path(__file__).resolve().parent.parent / "knowledge_base.txt"
+CORPUS_SIZES_KB = (2, 50, 200, 500, 2000)
+QUESTIONS = (
+    "What does fault code F2 mean?",
+    "How do I switch to eco mode?",
+    "How often should the boiler be serviced?",
+    "The pressure is below 1 bar, what should I do?",
+)
+TOP_K = 4
+TOKEN_BUDGET = 2000
+
+
+def synthesize_corpus(seed: str, size_kb: int) -> str:
+    """Grows the seed knowledge base into a corpus of roughly ``size_kb`` kilobytes.
+
+    Every copy renames its headings and fault codes so that sections stay distinct.
+    """
+    parts = [seed]
+    copy = 0
+    while sum(len(part) for part in parts) < size_kb * 1024:
+        copy += 1
+        renamed = seed.replace("## ", f"## Device {copy} ")
+        parts.append(renamed.replace("Fault Code F", f"Fault Code F{copy}"))
+    return "\n\n".join(parts)
+
+
+def main() -> None:
+    """Prints a table of prompt bytes and latency for each corpus size."""
+    seed = KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8")
+    print(
+        f"{'corpus KB':>10} {'sections':>9} {'build ms':>9} "
+        f"{'full bytes':>11} {'top-k bytes':>12} {'p50 us':>8} {'max us':>8}",
+    )
+    for size_kb in CORPUS_SIZES_KB:
+        corpus = synthesize_corpus(seed, size_kb)
+
+        started = time.perf_counter()
+        index = KnowledgeIndex.from_text(corpus)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        latencies: list[float] = []
+        context_bytes: list[int] = []
+        for _ in range(50):
+            for question in QUESTIONS:
+                started = time.perf_counter()
+                context = index.build_context(question, top_k=TOP_K, token_budget=TOKEN_BUDGET)
+                latencies.append((time.perf_counter() - started) * 1_000_000)
+                context_bytes.append(len(context.encode("utf-8")))
+
+        print(
+            f"{len(corpus) // 1024:>10} {len(index.sections):>9} {build_ms:>9.1f} "
+            f"{len(corpus.encode('utf-8')):>11} {max(context_bytes):>12} "
+            f"{statistics.median(latencies):>8.0f} {max(latencies):>8.0f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark lookup latency and memory of the semantic answer cache.
+
+Fills the cache with synthetic questions built from boiler vocabulary and
+then looks up a mix of reworded cached questions (hits) and new questions
+(misses). Each lookup embeds the question and scans every cached vector,
+so latency grows linearly with the number of entries.
+
+Run with::
+
+    python -m benchmarks.semantic_cache --entries 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from aura_telegram_bot.core.semantic_cache import SemanticCache
+from benchmarks.stats import latency_summary
+
+SUBJECTS = (
+    "boiler pressure", "radiator", "hot water", "heating", "thermostat", "flame", "pump",
+    "filling loop", "display", "eco mode", "comfort mode", "timer", "valve", "flue", "sensor",
+    "condensate pipe", "expansion vessel", "fault code", "service", "summer mode",
+)  # fmt: skip
+PROBLEMS = (
+    "is too low", "is too high", "keeps dropping", "is noisy", "is not working", "is cold",
+    "shows an error", "is leaking", "needs a reset", "is blinking", "turns off", "is frozen",
+)  # fmt: skip
+PLACES = ("", "in the kitchen", "in the bathroom", "upstairs", "at night", "in winter", "today")
+
+
+def synthetic_questions(count: int, rng: random.Random) -> list[str]:
+    """Returns distinct synthetic questions."""
+    questions: set[str] = set()
+    while len(questions) < count:
+        questions.add(
+            f"why {rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)} {rng.choice(PLACES)} "
+            f"unit {rng.randrange(count * 10)}"
+        )
+    return list(questions)
+
+
+def run(entries: int, lookups: int, seed: int = 42) -> dict:
+    """Fills a cache with ``entries`` answers and measures ``lookups`` lookups."""
+    rng = random.Random(seed)  # noqa: S311
+    cache = SemanticCache(max_entries=entries)
+    cache.bind("benchmark")
+    questions = synthetic_questions(entries, rng)
+    started = time.perf_counter()
+    for question in questions:
+        cache.put(question, f"Answer to {question}")
+    fill_seconds = time.perf_counter() - started
+
+    hit_queries = [f"{question}?".replace("why", "why is the") for question in questions]
+    miss_queries = synthetic_questions(lookups, random.Random(seed + 1))  # noqa: S311
+    queries = [rng.choice(hit_queries) if i % 2 else miss_queries[i] for i in range(lookups)]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        cache.get(query)
+        latencies.append(time.perf_counter() - started)
+    return {
+        "entries": len(cache),
+        "lookups": lookups,
+        "hit_rate": round(cache.hits / lookups, 3),
+        "fill_seconds": round(fill_seconds, 2),
+        "matrix_mib": round(cache.memory_bytes / 2**20, 1),
+        "lookup": latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps([run(entries, args.lookups) for entries in args.entries], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Benchmark the cold start of the bot, up to its first poll for updates.
+
+Two measurements:
+
+* ``python -X importtime`` of ``aura_telegram_bot.main``, summarized as the
+  total import time and the slowest top-level packages. Heavy SDKs that are
+  imported lazily should not show up here.
+* The time to the first poll: a fresh interpreter starts the bot the way
+  ``main`` does, against a fake Bot API, and reports the moment it sends its
+  first ``getUpdates``. The time is measured from the moment the process is
+  spawned, so it includes the interpreter start, every import, building the
+  engine and initializing the application.
+
+The run fails if the median time to the first poll exceeds ``--target``.
+
+Run with::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --kb-size 500 --target 1.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks.fakes import TEST_USER_ID
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+KNOWLEDGE_BASE_PATH = REPO_ROOT / "knowledge_base.txt"
+# The median time to the first poll that a run must stay under, in seconds.
+DEFAULT_TARGET = 2.0
+
+
+def bot_environment(knowledge_base: Path) -> dict[str, str]:
+    """Returns the environment of a bot process that touches no real service."""
+    return {
+        **os.environ,
+        "TELEGRAM_TOKEN": "123456:benchmark",
+        "GEMINI_API_KEY": "unused",
+        "HOME_ASSISTANT_TOKEN": "unused",
+        "HOME_ASSISTANT_URL": "http://127.0.0.1:8123",
+        "ALLOWED_TELEGRAM_USER_IDS": f"[{TEST_USER_ID}]",
+        "KNOWLEDGE_BASE_PATH": str(knowledge_base),
+        "TELEGRAM_UPDATE_MODE": "polling",
+        "METRICS_ENABLED": "false",
+        "KNOWLEDGE_BASE_RELOAD_INTERVAL_SECONDS": "0",
+    }
+
+
+def import_times(environment: dict[str, str], top: int) -> dict:
+    """Returns the total import time of the bot and its slowest top-level packages."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import aura_telegram_bot.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=environment,
+        cwd=REPO_ROOT,
+    )
+    self_us: defaultdict[str, int] = defaultdict(int)
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line.removeprefix("import time:").split("|")
+        if not fields[0].strip().isdigit():
+            continue  # The header line.
+        module = fields[2].strip()
+        modules.add(module)
+        self_us[module.split(".")[0]] += int(fields[0])
+        total_us += int(fields[0])
+    slowest = sorted(self_us.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "modules": len(modules),
+        "slowest_packages_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        "gemini_sdk_imported": "google.generativeai" in modules,
+    }
+
+
+def time_to_first_poll(environment: dict[str, str]) -> dict[str, float]:
+    """Starts the bot in a fresh interpreter and returns how long it took to poll."""
+    spawned = time.time()
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=environment,
+        cwd=REPO_ROOT,
+        timeout=120,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        "imported_s": report["imported_at"] - spawned,
+        "first_poll_s": report["first_poll_at"] - spawned,
+    }
+
+
+def run_child() -> None:
+    """Runs the bot until its first poll, then prints the timestamps and exits."""
+    from aura_telegram_bot.config import get_settings
+    from aura_telegram_bot.main import build_application
+    from benchmarks.fakes import FakeBotApi
+
+    imported_at = time.time()
+
+    class FirstPollBotApi(FakeBotApi):
+        """Ends the process as soon as the bot asks for its first updates."""
+
+        async def do_request(self, url: str, *args: object, **kwargs: object) -> tuple[int, bytes]:
+            if url.endswith("/getUpdates"):
+                report = {"imported_at": imported_at, "first_poll_at": time.time()}
+                print(json.dumps(report), flush=True)
+                os._exit(0)
+            return await super().do_request(url, *args, **kwargs)
+
+    application = build_application(get_settings(), request=FirstPollBotApi())
+    application.run_polling(drop_pending_updates=True, stop_signals=None)
+
+
+def main() -> None:
+    """Parses the command line, runs the measurements and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--kb-size", type=int, default=0, help="Grow the KB to this many KB.")
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET, help="Seconds.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child()
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        knowledge_base = KNOWLEDGE_BASE_PATH
+        if args.kb_size:
+            from benchmarks.retrieval import synthesize_corpus
+
+            knowledge_base = Path(workdir) / "knowledge_base.txt"
+            seed = KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8")
+            knowledge_base.write_text(synthesize_corpus(seed, args.kb_size), encoding="utf-8")
+        environment = bot_environment(knowledge_base)
+        imports = import_times(environment, args.top)
+        runs = [time_to_first_poll(environment) for _ in range(args.runs)]
+
+    first_poll = statistics.median(run["first_poll_s"] for run in runs)
+    results = {
+        "python": sys.version.split()[0],
+        "imports": imports,
+        "imported_p50_s": round(statistics.median(run["imported_s"] for run in runs), 3),
+        "first_poll_p50_s": round(first_poll, 3),
+        "first_poll_max_s": round(max(run["first_poll_s"] for run in runs), 3),
+        "target_s": args.target,
+        "passed": first_poll <= args.target,
+    }
+    print(json.dumps(results, indent=2))
+    if not results["passed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
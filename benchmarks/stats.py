@@ -0,0 +1,24 @@
+"""Small statistics helpers shared by the benchmarks."""
+
+from __future__ import annotations
+
+import math
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Returns the ``q``-th percentile (0-100) using the nearest-rank method."""
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(latencies: list[float]) -> dict[str, float]:
+    """Summarizes latencies, given in seconds, as milliseconds."""
+    return {
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=math.nan) * 1000,
+    }
@@ -0,0 +1,314 @@
+"""End-to-end throughput benchmark of the bot against fake Gemini and Bot API backends.
+
+Each scenario builds the real engine with ``create_engine`` and the real
+Telegram handlers from ``main``, then lets a number of simulated users ask
+questions one after another, each waiting for the previous reply. Gemini is
+replaced by a fake with a configurable latency distribution, error rate and
+streaming, and the Bot API by a local fake, so nothing leaves the machine.
+
+The scenarios cover every combination of concurrent users, knowledge base
+sizes and answer cache on or off. For each, the suite reports throughput,
+reply latency percentiles, time to the first visible reply, the bytes sent
+to the model and the peak traced memory. Results are written as JSON,
+tagged with the git commit, and can be compared with an earlier run.
+
+Run with::
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --users 1 20 --kb-sizes 2 500 --compare bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+from telegram import Update
+from telegram.ext import Application, MessageHandler, filters
+
+from aura_telegram_bot.auth import RATE_LIMITED_MESSAGE
+from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.core.engine import BUSY_MESSAGE, ERROR_MESSAGE
+from aura_telegram_bot.core.factory import create_engine
+from aura_telegram_bot.main import handle_message
+from benchmarks.fakes import TEST_USER_ID, FakeBotApi, FakeGemini, make_update
+from benchmarks.retrieval import KNOWLEDGE_BASE_PATH, synthesize_corpus
+from benchmarks.stats import latency_summary, percentile
+
+logger = logging.getLogger(__name__)
+
+# Questions are drawn from a small pool, so that repeats can hit the cache.
+QUESTIONS = (
+    "What does fault code F2 mean?",
+    "How do I switch to eco mode?",
+    "How often should the boiler be serviced?",
+    "The pressure is below 1 bar, what should I do?",
+    "Why is the radiator cold?",
+    "How do I top up the boiler pressure?",
+    "What does the flashing flame symbol mean?",
+    "How do I set the hot water temperature?",
+)
+# Metrics compared between runs, and whether a higher value is better.
+COMPARED = {
+    "throughput_per_s": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "prompt_bytes_mean": False,
+    "peak_memory_mib": False,
+}
+
+
+def configure_environment(
+    knowledge_base: Path, *, cache: bool, stream: bool, edit_interval: float
+) -> None:
+    """Points the settings at a scenario, without touching real services."""
+    os.environ.update(
+        {
+            "TELEGRAM_TOKEN": "123456:benchmark",
+            "GEMINI_API_KEY": "unused",
+            "HOME_ASSISTANT_TOKEN": "unused",
+            "HOME_ASSISTANT_URL": "http://127.0.0.1:8123",
+            "ALLOWED_TELEGRAM_USER_IDS": f"[{TEST_USER_ID}]",
+            # Every simulated user sends as TEST_USER_ID, so the per-user limit is off.
+            "USER_REQUESTS_PER_MINUTE": "0",
+            "KNOWLEDGE_BASE_PATH": str(knowledge_base),
+            "ANSWER_CACHE_SIZE": "256" if cache else "0",
+            "SEMANTIC_CACHE_ENABLED": "false",
+            "CONVERSATION_MEMORY_TURNS": "0",
+            "GEMINI_REQUESTS_PER_MINUTE": "0",
+            "STREAM_RESPONSES": "true" if stream else "false",
+            "STREAM_EDIT_INTERVAL_SECONDS": str(edit_interval),
+        },
+    )
+    get_settings.cache_clear()
+
+
+def git_commit() -> str | None:
+    """Returns the commit the benchmark runs on, or None outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run_scenario(
+    *,
+    users: int,
+    kb_size_kb: int,
+    cache: bool,
+    questions_per_user: int,
+    gemini: FakeGemini,
+    stream: bool,
+    edit_interval: float,
+    workdir: Path,
+) -> dict:
+    """Runs one scenario and returns its results."""
+    knowledge_base = workdir / f"knowledge_base_{kb_size_kb}kb.txt"
+    if not knowledge_base.exists():
+        seed = KNOWLEDGE_BASE_PATH.read_text(encoding="utf-8")
+        knowledge_base.write_text(synthesize_corpus(seed, kb_size_kb), encoding="utf-8")
+    configure_environment(knowledge_base, cache=cache, stream=stream, edit_interval=edit_interval)
+
+    api = FakeBotApi()
+    first_reply_at: dict[int, float] = {}
+    api.on_send = lambda chat_id, text: first_reply_at.setdefault(chat_id, time.perf_counter())
+    tracemalloc.start()
+    with patch("aura_telegram_bot.core.engine.genai", gemini):
+        engine = create_engine(get_settings())
+        application = (
+            Application.builder().token(get_settings().telegram_token).request(api).build()
+        )
+        application.bot_data["engine"] = engine
+        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+        await application.initialize()
+
+        update_ids = itertools.count(1)
+        latencies: list[float] = []
+        first_reply_latencies: list[float] = []
+        outcomes = {"answered": 0, "busy": 0, "error": 0, "rate_limited": 0, "no_reply": 0}
+
+        async def user(number: int) -> None:
+            rng = random.Random(number)  # noqa: S311
+            chat_id = 1_000_000 + number
+            for _ in range(questions_per_user):
+                update = Update.de_json(
+                    make_update(next(update_ids), chat_id, rng.choice(QUESTIONS)),
+                    application.bot,
+                )
+                first_reply_at.pop(chat_id, None)
+                sent = len(api.sent)
+                started = time.perf_counter()
+                await application.process_update(update)
+                latencies.append(time.perf_counter() - started)
+                first_reply_latencies.append(first_reply_at.get(chat_id, started) - started)
+                reply = next(
+                    (text for _, chat, text in reversed(api.sent[sent:]) if chat == chat_id),
+                    "",
+                )
+                if not reply:
+                    outcomes["no_reply"] += 1
+                elif reply == RATE_LIMITED_MESSAGE:
+                    outcomes["rate_limited"] += 1
+                elif reply == BUSY_MESSAGE:
+                    outcomes["busy"] += 1
+                elif reply.endswith(ERROR_MESSAGE):
+                    outcomes["error"] += 1
+                else:
+                    outcomes["answered"] += 1
+
+        calls_before = gemini.calls
+        prompts_before = len(gemini.prompt_bytes)
+        started = time.perf_counter()
+        await asyncio.gather(*(user(number) for number in range(users)))
+        elapsed = time.perf_counter() - started
+        await application.shutdown()
+        engine.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    prompt_bytes = gemini.prompt_bytes[prompts_before:]
+    requests = users * questions_per_user
+    # Errors are injected by the fake Gemini; any other request without an
+    # answer means the scenario measured something else than answering.
+    if outcomes["answered"] + outcomes["busy"] + outcomes["error"] != requests:
+        raise RuntimeError(f"Not every request was answered or shed: {outcomes}")
+    return {
+        "users": users,
+        "kb_size_kb": kb_size_kb,
+        "cache": cache,
+        "requests": requests,
+        "throughput_per_s": round(requests / elapsed, 2),
+        **{key: round(value, 2) for key, value in latency_summary(latencies).items()},
+        "first_reply_p50_ms": round(percentile(first_reply_latencies, 50) * 1000, 2),
+        "gemini_calls": gemini.calls - calls_before,
+        "cache_hit_rate": round(engine.answer_cache.hits / requests, 3),
+        **outcomes,
+        "prompt_bytes_mean": round(sum(prompt_bytes) / len(prompt_bytes)) if prompt_bytes else 0,
+        "prompt_bytes_total": sum(prompt_bytes),
+        "peak_memory_mib": round(peak / 2**20, 2),
+    }
+
+
+def scenario_key(result: dict) -> tuple[int, int, bool]:
+    """Identifies a scenario across runs."""
+    return result["users"], result["kb_size_kb"], result["cache"]
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """Returns the relative change of each compared metric, per scenario present in both runs.
+
+    A positive ``change_pct`` is always an improvement.
+    """
+    previous = {scenario_key(result): result for result in baseline["scenarios"]}
+    changes = []
+    for result in current["scenarios"]:
+        before = previous.get(scenario_key(result))
+        if before is None:
+            continue
+        deltas = {}
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            deltas[metric] = round(change if higher_is_better else -change, 1)
+        changes.append(
+            {
+                "users": result["users"],
+                "kb_size_kb": result["kb_size_kb"],
+                "cache": result["cache"],
+                "change_pct": deltas,
+            },
+        )
+    return changes
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Runs every scenario and returns the results with the run's metadata."""
+    scenarios = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for users, kb_size_kb, cache in itertools.product(
+            args.users, args.kb_sizes, (True, False)
+        ):
+            gemini = FakeGemini(
+                median_latency=args.median_latency,
+                latency_sigma=args.latency_sigma,
+                error_rate=args.error_rate,
+            )
+            result = await run_scenario(
+                users=users,
+                kb_size_kb=kb_size_kb,
+                cache=cache,
+                questions_per_user=args.questions,
+                gemini=gemini,
+                stream=args.stream,
+                edit_interval=args.edit_interval,
+                workdir=Path(workdir),
+            )
+            logger.warning("Finished scenario: %s", result)
+            scenarios.append(result)
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "median_latency_s": args.median_latency,
+            "latency_sigma": args.latency_sigma,
+            "error_rate": args.error_rate,
+            "stream": args.stream,
+            "edit_interval_s": args.edit_interval,
+            "questions_per_user": args.questions,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main() -> None:
+    """Parses the command line, runs the suite and prints or saves the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--kb-sizes", type=int, nargs="+", default=[2, 200], help="KB.")
+    parser.add_argument("--questions", type=int, default=20, help="Questions per user.")
+    parser.add_argument("--median-latency", type=float, default=0.3, help="Seconds.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True)
+    # Streamed replies are complete only after the final, throttled edit.
+    parser.add_argument("--edit-interval", type=float, default=0.5, help="Seconds.")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--compare", type=Path, help="An earlier results file to compare to.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, force=True)
+
+    results = asyncio.run(run(args))
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        results["compared_to"] = baseline.get("commit")
+        results["changes"] = compare(baseline, results)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
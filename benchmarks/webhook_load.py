@@ -0,0 +1,149 @@
+"""Load test for webhook mode against a stub engine and a fake Bot API.
+
+Starts the bot's webhook server locally, POSTs synthetic updates to it and
+measures the time from each POST until the bot's reply reaches the (fake)
+Bot API, reporting throughput and latency percentiles.
+
+Run with::
+
+    python -m benchmarks.webhook_load --updates 500 --concurrency 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import httpx
+from telegram.ext import Application, CommandHandler, MessageHandler, filters
+
+from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.dispatch import PerChatUpdateProcessor
+from aura_telegram_bot.main import handle_message, start
+from benchmarks.fakes import TEST_USER_ID, FakeBotApi, StubEngine, make_update
+from benchmarks.stats import latency_summary
+
+SECRET_TOKEN = "load-test-secret"  # noqa: S105
+URL_PATH = "telegram"
+
+
+def configure_environment() -> None:
+    """Provides the settings the handlers need, without touching real services."""
+    os.environ.setdefault("TELEGRAM_TOKEN", "123456:load-test")
+    os.environ.setdefault("GEMINI_API_KEY", "unused")
+    os.environ.setdefault("HOME_ASSISTANT_TOKEN", "unused")
+    os.environ.setdefault("HOME_ASSISTANT_URL", "http://127.0.0.1:8123")
+    os.environ["ALLOWED_TELEGRAM_USER_IDS"] = f"[{TEST_USER_ID}]"
+    # Every update is sent as TEST_USER_ID, so the per-user limit is off.
+    os.environ["USER_REQUESTS_PER_MINUTE"] = "0"
+    get_settings.cache_clear()
+
+
+def build_application(api: FakeBotApi, engine: StubEngine, workers: int) -> Application:
+    """Builds the bot application wired to the fake Bot API and the stub engine."""
+    processor = PerChatUpdateProcessor(workers)
+    application = (
+        Application.builder()
+        .token(get_settings().telegram_token)
+        .request(api)
+        .get_updates_request(api)
+        .concurrent_updates(processor)
+        .build()
+    )
+    processor.bind(application)
+    application.bot_data["engine"] = engine
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    return application
+
+
+async def run(
+    updates: int, concurrency: int, engine_latency: float, port: int, workers: int
+) -> dict:
+    """Runs the load test and returns its results."""
+    configure_environment()
+    api = FakeBotApi()
+    application = build_application(api, StubEngine(engine_latency), workers)
+
+    posted_at: dict[int, float] = {}
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    def on_send(chat_id: int, text: str) -> None:
+        started = posted_at.pop(chat_id, None)
+        if started is not None:
+            latencies.append(time.perf_counter() - started)
+            if len(latencies) == updates:
+                done.set()
+
+    api.on_send = on_send
+    url = f"http://127.0.0.1:{port}/{URL_PATH}"
+    await application.initialize()
+    await application.start()
+    if application.updater is None:
+        raise RuntimeError("The application was built without an updater.")
+    await application.updater.start_webhook(
+        listen="127.0.0.1",
+        port=port,
+        url_path=URL_PATH,
+        secret_token=SECRET_TOKEN,
+        webhook_url=url,
+    )
+
+    limit = asyncio.Semaphore(concurrency)
+    headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET_TOKEN}
+    async with httpx.AsyncClient(timeout=30) as client:
+        forged = await client.post(url, json=make_update(0, 0, "forged"))
+
+        async def post(update_id: int) -> None:
+            chat_id = 1_000_000 + update_id  # One chat per update keeps replies distinct.
+            async with limit:
+                posted_at[chat_id] = time.perf_counter()
+                response = await client.post(
+                    url,
+                    json=make_update(update_id, chat_id, f"Question {update_id}"),
+                    headers=headers,
+                )
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(i) for i in range(1, updates + 1)))
+        await asyncio.wait_for(done.wait(), timeout=120)
+        elapsed = time.perf_counter() - started
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    return {
+        "updates": updates,
+        "client_concurrency": concurrency,
+        "workers": workers,
+        "engine_latency_ms": engine_latency * 1000,
+        "forged_update_status": forged.status_code,
+        "throughput_per_s": updates / elapsed,
+        **latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    """Parses the command line and prints the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50, help="Parallel POSTs.")
+    parser.add_argument("--engine-latency", type=float, default=0.05, help="Seconds.")
+    parser.add_argument("--workers", type=int, default=1, help="Update workers.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, force=True)
+    results = asyncio.run(
+        run(args.updates, args.concurrency, args.engine_latency, args.port, args.workers),
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
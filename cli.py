@@ -1,27 +1,193 @@
-"""A command-line interface (CLI) for interacting with the AuraEngine."""
+"""A command-line interface (CLI) for interacting with the AuraEngine.
+
+Without arguments, the CLI is an interactive chat. With ``--batch``, it answers
+the questions in a file, or on stdin, concurrently and appends one JSON object
+per answer to ``--output``, with its source, latency and prompt size::
+
+    python cli.py --batch questions.txt --output answers.jsonl --concurrency 8
+    cat questions.txt | python cli.py --batch - --output answers.jsonl
+
+Each input line is a question, or a JSON object with a "question" and an
+optional "id"; plain questions are identified by their line number. Questions
+already answered in the output are skipped, so an interrupted run continues
+where it stopped. Questions that failed or were shed are asked again.
+"""
 
 from __future__ import annotations
 
+import argparse
 import asyncio
+import json
 import logging
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
 
 from aura_telegram_bot.config import get_settings
-from aura_telegram_bot.core.engine import AuraEngine
+from aura_telegram_bot.core.engine import ResponseStats
+from aura_telegram_bot.core.factory import create_engine
+from aura_telegram_bot.core.scheduler import Priority
+
+if TYPE_CHECKING:
+    from aura_telegram_bot.core.engine import AuraEngine
 
 # --- Setup logging ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The CLI session is one conversation, so follow-up questions work as in Telegram.
+CLI_CHAT_ID = 0
+# Answers from these sources are not answers; a resumed batch asks again.
+RETRIED_SOURCES = frozenset({"busy", "error"})
+
+
+@dataclass(slots=True)
+class BatchQuestion:
+    """A question of a batch and the ID its result is written under."""
+
+    id: str
+    question: str
+
+
+def read_questions(lines: Iterable[str]) -> list[BatchQuestion]:
+    """Parses batch input: plain questions, or JSON objects with "question" and "id".
+
+    Raises:
+        ValueError: If a JSON line is malformed or has no question.
+    """
+    questions = []
+    for number, line in enumerate(lines, start=1):
+        text = line.strip()
+        if not text:
+            continue
+        if text.startswith("{"):
+            try:
+                data = json.loads(text)
+                questions.append(BatchQuestion(str(data.get("id", number)), data["question"]))
+            except (json.JSONDecodeError, KeyError) as e:
+                raise ValueError(f"Line {number} is not a valid question: {e}") from e
+        else:
+            questions.append(BatchQuestion(str(number), text))
+    return questions
+
+
+def completed_ids(output: Path) -> set[str]:
+    """Returns the IDs of the questions answered by an earlier run into ``output``."""
+    if not output.exists():
+        return set()
+    done = set()
+    with output.open(encoding="utf-8") as lines:
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interruption.
+            if record.get("source") not in RETRIED_SOURCES:
+                done.add(str(record["id"]))
+    return done
+
+
+async def answer_question(engine: AuraEngine, question: BatchQuestion) -> dict[str, Any]:
+    """Answers one question of a batch and returns its result record."""
+    stats = ResponseStats()
+    started = time.perf_counter()
+    # Each question is asked on its own, outside any conversation.
+    answer = await engine.get_response(question.question, Priority.BULK, stats=stats)
+    return {
+        "id": question.id,
+        "question": question.question,
+        "answer": answer,
+        "source": stats.source,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "prompt_tokens": stats.prompt_tokens,
+    }
+
+
+async def run_batch(
+    engine: AuraEngine,
+    questions: Iterable[BatchQuestion],
+    output: TextIO,
+    *,
+    concurrency: int = 4,
+) -> int:
+    """Answers questions concurrently, writing each result as a JSON line once it is ready.
+
+    Lines are flushed one by one, so an interruption loses only the answers in
+    progress.
+
+    Args:
+        engine: The engine to ask.
+        questions: The questions to answer.
+        output: Receives one JSON object per answer, in order of completion.
+        concurrency: How many questions are answered at once.
+
+    Returns:
+        The number of questions answered.
+    """
+    pending = iter(questions)
+    answered = 0
+
+    async def worker() -> None:
+        nonlocal answered
+        # The workers share the iterator, so each question is taken once.
+        for question in pending:
+            record = await answer_question(engine, question)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            answered += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return answered
+
+
+async def batch(source: str, output: Path, *, concurrency: int) -> None:
+    """Answers the questions in ``source``, "-" for stdin, appending the results to ``output``."""
+    settings = get_settings()
+    building = asyncio.create_task(asyncio.to_thread(create_engine, settings))
+    if source == "-":
+        questions = read_questions(sys.stdin)
+    else:
+        with Path(source).open(encoding="utf-8") as lines:
+            questions = read_questions(lines)
+    done = completed_ids(output)
+    remaining = [question for question in questions if question.id not in done]
+    logger.info(
+        "Answering %d of %d questions; %d were answered earlier.",
+        len(remaining),
+        len(questions),
+        len(questions) - len(remaining),
+    )
+
+    engine = await building
+    try:
+        with output.open("a", encoding="utf-8") as results:
+            if results.tell() and not output.read_bytes().endswith(b"\n"):
+                # Terminate a line cut short by an interruption.
+                results.write("\n")
+            started = time.perf_counter()
+            answered = await run_batch(engine, remaining, results, concurrency=concurrency)
+            elapsed = time.perf_counter() - started
+    finally:
+        engine.close()
+    logger.info(
+        "Answered %d questions in %.1fs (%.1f per second).",
+        answered,
+        elapsed,
+        answered / elapsed if elapsed else 0.0,
+    )
+
 
 async def main() -> None:
     """Runs the main CLI loop."""
     # Settings are loaded and validated upon import.
     # We can directly use the `settings` object.
-    print("Initializing AuraEngine for CLI...")
     settings = get_settings()
-    knowledge_base = settings.load_knowledge_base()
-    engine = AuraEngine(gemini_api_key=settings.gemini_api_key, knowledge_base=knowledge_base)
-    print("Engine ready. Type 'exit' or 'quit' to end the session.")
+    # Build the engine in the background, so the prompt appears right away.
+    building = asyncio.create_task(asyncio.to_thread(create_engine, settings))
+    print("Type 'exit' or 'quit' to end the session.")
     print("-" * 20)
 
     while True:
@@ -31,14 +197,40 @@ async def main() -> None:
                 print("Aura: Goodbye!")
                 break
 
-            response = await engine.get_response(user_input)
-            print(f"Aura: {response}")
+            engine = await building
+            # Print the answer piece by piece as it is generated.
+            print("Aura: ", end="", flush=True)
+            async for chunk in engine.stream_response(user_input, chat_id=CLI_CHAT_ID):
+                print(chunk, end="", flush=True)
+            print()
 
         except (KeyboardInterrupt, EOFError):
             # Handle Ctrl+C or Ctrl+D gracefully
             print("\nAura: Goodbye!")
             break
 
+    # The build thread cannot be interrupted, so let it finish before releasing the engine.
+    engine = await building
+    engine.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parses the command line; without ``--batch`` the CLI is interactive."""
+    parser = argparse.ArgumentParser(description="Chat with Aura, or answer a batch of questions.")
+    parser.add_argument("--batch", metavar="FILE", help='Questions to answer; "-" reads stdin.')
+    parser.add_argument("--output", type=Path, help="The JSONL file results are appended to.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+    if args.batch and args.output is None:
+        parser.error("--batch requires --output.")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be positive.")
+    return args
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    arguments = parse_args()
+    if arguments.batch:
+        asyncio.run(batch(arguments.batch, arguments.output, concurrency=arguments.concurrency))
+    else:
+        asyncio.run(main())
@@ -1,4 +1,12 @@
-"""Authorization logic for the Telegram bot."""
+"""Authorization and per-user flood control for the Telegram bot.
+
+Every update passes through :func:`restricted`, which answers three questions
+in constant time: is the user allowed (a frozenset lookup), does the user have
+budget left (a per-user token bucket), and should a rejection be logged (a
+token bucket shared by all rejections, so that spam cannot flood the log).
+Messages a user sends in quick succession are merged before they get here,
+by the per-chat update processor.
+"""
 
 from __future__ import annotations
 
@@ -7,26 +15,127 @@ from collections.abc import Awaitable, Callable
 from functools import wraps
 from typing import TYPE_CHECKING
 
+from pydantic import ValidationError
+
 if TYPE_CHECKING:
     from telegram import Update
     from telegram.ext import ContextTypes
 
-from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.config import Settings, get_settings
+from aura_telegram_bot.core.scheduler import TokenBucket
+from aura_telegram_bot.metrics import AUTH_REJECTIONS, AUTH_SHED
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMITED_MESSAGE = "You are sending messages faster than I can answer. Please wait a moment."
+# Unauthorized access attempts are logged in bursts of up to this many, then at
+# this rate; the attempts in between are only counted.
+REJECTION_LOG_BURST = 5
+REJECTION_LOGS_PER_SECOND = 0.1
+
+
+class _AccessControl:
+    """The allowlist and the per-user request budgets of one version of the settings."""
+
+    __slots__ = ("_buckets", "_burst", "_rate", "_warned", "allowed", "settings")
+
+    def __init__(self, settings: Settings, previous: _AccessControl | None = None) -> None:
+        """Precomputes the allowlist; budgets of users still allowed are kept from ``previous``."""
+        self.settings = settings
+        self.allowed = frozenset(settings.allowed_telegram_user_ids)
+        self._rate = settings.user_requests_per_minute / 60
+        self._burst = settings.user_burst
+        self._buckets: dict[int, TokenBucket] = {}
+        # Users who were told to slow down and have not been admitted since.
+        self._warned: set[int] = set()
+        if previous is not None and (previous._rate, previous._burst) == (self._rate, self._burst):
+            self._buckets = {
+                user_id: bucket
+                for user_id, bucket in previous._buckets.items()
+                if user_id in self.allowed
+            }
+
+    def admit(self, user_id: int) -> bool:
+        """Takes a request from an allowed user's budget; returns False if it is spent.
+
+        Buckets are only created for allowed users, so their number is bounded
+        by the allowlist.
+        """
+        if not self._rate:
+            return True
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self._rate, self._burst)
+        if bucket.try_acquire():
+            self._warned.discard(user_id)
+            return True
+        return False
+
+    def should_warn(self, user_id: int) -> bool:
+        """Tells whether a rate-limited user has yet to be told so, and marks them as told."""
+        if user_id in self._warned:
+            return False
+        self._warned.add(user_id)
+        return True
+
+
+_access: _AccessControl | None = None
+_rejection_log = TokenBucket(REJECTION_LOGS_PER_SECOND, REJECTION_LOG_BURST)
+_suppressed_rejection_logs = 0
+
+
+def _access_for(settings: Settings) -> _AccessControl:
+    """Returns the access control of the settings, rebuilding it when they were replaced."""
+    global _access
+    if _access is None or _access.settings is not settings:
+        _access = _AccessControl(settings, _access)
+    return _access
+
+
+def reload_allowlist() -> None:
+    """Re-reads the settings, so that allowlist and user limit changes take effect.
+
+    Only changes to the .env file are seen: the process environment, which takes
+    precedence over it, cannot change while the bot runs. Invalid settings are
+    logged and the current ones are kept.
+    """
+    try:
+        Settings()  # ty: ignore[missing-argument]
+    except ValidationError:
+        logger.exception("Kept the current allowlist; the changed settings are invalid.")
+        return
+    get_settings.cache_clear()
+    access = _access_for(get_settings())
+    logger.info("Reloaded the allowlist of %d users.", len(access.allowed))
+
+
+def _log_rejection(user_id: int, user_name: str) -> None:
+    """Logs an unauthorized access attempt, unless rejections are being logged too often."""
+    global _suppressed_rejection_logs
+    if not _rejection_log.try_acquire():
+        _suppressed_rejection_logs += 1
+        AUTH_SHED.inc(labels=("rejection_log",))
+        return
+    logger.warning(
+        "Unauthorized access attempt by user_id: %s (Name: %s); %d attempts not logged.",
+        user_id,
+        user_name,
+        _suppressed_rejection_logs,
+    )
+    _suppressed_rejection_logs = 0
+
 
 # The corrected version uses Python 3.12+ syntax for generics (PEP 695).
 # We declare the TypeVar `R` directly in the function signature.
 def restricted[R](
     func: Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[R]],
 ) -> Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[R | None]]:
-    """Restrict access to handlers to authorized users."""
+    """Restrict access to handlers to authorized users, within their request budget."""
 
     @wraps(func)
     async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE) -> R | None:
         """The inner wrapper function that performs the authorization check."""
-        settings = get_settings()
+        access = _access_for(get_settings())
         if not update.effective_user:
             logger.warning("Decorator received an update with no effective_user.")
             return None
@@ -34,15 +143,20 @@ def restricted[R](
         user_id = update.effective_user.id
         user_name = update.effective_user.first_name
 
-        if user_id not in settings.allowed_telegram_user_ids:
-            logger.warning(
-                "Unauthorized access attempt by user_id: %s (Name: %s).",
-                user_id,
-                user_name,
-            )
+        if user_id not in access.allowed:
+            AUTH_REJECTIONS.inc()
+            _log_rejection(user_id, user_name)
             return None  # Silently ignore the request
 
-        logger.info("Authorized access for user_id: %s (Name: %s).", user_id, user_name)
+        if not access.admit(user_id):
+            AUTH_SHED.inc(labels=("rate_limited",))
+            if access.should_warn(user_id):
+                logger.info("User %s is over their request budget.", user_id)
+                if update.message:
+                    await update.message.reply_text(RATE_LIMITED_MESSAGE)
+            return None
+
+        logger.debug("Authorized access for user_id: %s (Name: %s).", user_id, user_name)
         # The wrapped function's signature is known, so we call it directly.
         return await func(update, context)
 
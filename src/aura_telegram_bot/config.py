@@ -5,10 +5,13 @@ from __future__ import annotations
 import logging
 from functools import lru_cache
 from pathlib import Path
+from typing import Annotated, Literal, Self
 
-from pydantic import Field, HttpUrl
+from pydantic import Field, HttpUrl, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from aura_telegram_bot.core.corpus import Corpus
+
 # --- Setup logging ---
 logger = logging.getLogger(__name__)
 
@@ -30,26 +33,203 @@ class Settings(BaseSettings):
     # --- URLs ---
     home_assistant_url: HttpUrl
 
+    # --- Home Assistant ---
+    # Mirror all entity states in memory over Home Assistant's WebSocket API
+    # instead of requesting them on demand. While the connection is down, the
+    # last known states are used for at most the given number of seconds.
+    home_assistant_websocket: bool = False
+    home_assistant_max_staleness_seconds: float = Field(60, ge=0)
+    # States fetched over the REST API are reused for this many seconds.
+    home_assistant_state_ttl_seconds: float = Field(5, ge=0)
+    # Live readings added to questions that mention one of an entity's keywords, as
+    # JSON: {"sensor.boiler_pressure": ["pressure", "bar"], "sensor.boiler_fault": []}.
+    # Entities without keywords are added whenever another entity matches. Readings
+    # that take longer than the budget are skipped, so answers are never held up.
+    home_assistant_context_entities: dict[str, list[str]] = Field(default_factory=dict)
+    home_assistant_context_budget_seconds: float = Field(0.3, gt=0)
+    home_assistant_context_max_entities: int = Field(12, ge=1)
+
+    # --- HTTP ---
+    # All integrations share one pooled HTTP client, so connections stay open
+    # between requests. HTTP/2 needs the "http2" extra (the h2 package).
+    http_max_connections: int = Field(20, ge=1)
+    http_max_keepalive_connections: int = Field(10, ge=0)
+    http_keepalive_expiry_seconds: float = Field(30, ge=0)
+    http2: bool = False
+
     # --- Security ---
     # A list of authorized Telegram user IDs. Pydantic will automatically
     # convert a comma-separated string from the .env file into a list of ints.
     allowed_telegram_user_ids: list[int] = Field(..., min_length=1)
+    # Each allowed user may send USER_BURST requests back to back, then
+    # USER_REQUESTS_PER_MINUTE; 0 disables the limit. Send the bot SIGHUP to
+    # re-read the allowlist and these limits from the .env file. Only edits to
+    # .env are picked up: the process environment is fixed while the bot runs
+    # and takes precedence over .env, so set these three in .env only.
+    user_requests_per_minute: float = Field(20, ge=0)
+    user_burst: int = Field(5, ge=1)
+
+    # --- Gemini ---
+    gemini_model: str = "gemini-1.5-flash"
+    # Models asked in turn when the one before has not answered within its usual
+    # latency (GEMINI_HEDGE_QUANTILE of its recent calls) or has failed; the first
+    # answer wins. Until a model has a latency history, it is given
+    # GEMINI_HEDGE_INITIAL_DELAY_SECONDS. Empty disables hedging.
+    gemini_fallback_models: list[str] = []
+    gemini_hedge_quantile: float = Field(0.95, gt=0, le=1)
+    gemini_hedge_initial_delay_seconds: float = Field(2.0, gt=0)
+    gemini_hedge_min_delay_seconds: float = Field(0.25, ge=0)
+    # Store the knowledge base in Gemini's server-side context cache so that each
+    # question only pays for its own tokens. Needs an explicit model version that
+    # supports caching (e.g. "gemini-1.5-flash-002") and a large enough knowledge base.
+    gemini_context_cache: bool = False
+    gemini_context_cache_ttl_seconds: float = Field(60 * 60, gt=0)
+    # Admission control for Gemini calls. Match the rate to your API quota;
+    # 0 disables rate limiting. Rate-limited (429) and 5xx calls are retried.
+    gemini_max_concurrency: int = Field(4, ge=1)
+    gemini_max_queue: int = Field(32, ge=0)
+    gemini_requests_per_minute: float = Field(15, ge=0)
+    gemini_burst: int = Field(5, ge=1)
+    gemini_max_retries: int = Field(3, ge=0)
+
+    # --- Telegram updates ---
+    # "polling" fetches updates with long polling. "webhook" runs an HTTP server
+    # that Telegram posts updates to, e.g. behind a reverse proxy or load balancer.
+    telegram_update_mode: Literal["polling", "webhook"] = "polling"
+    webhook_url: HttpUrl | None = None
+    webhook_listen: str = "0.0.0.0"  # noqa: S104 - the server normally runs in a container
+    webhook_port: int = Field(8443, ge=1, le=65535)
+    webhook_path: str = "telegram"
+    # Telegram sends this in every request so that forged updates can be rejected.
+    webhook_secret_token: str | None = Field(None, pattern=r"^[A-Za-z0-9_-]{1,256}$")
+    # Chats are answered concurrently by up to this many workers, while the
+    # messages of one chat are answered in order. Messages that arrive while a
+    # chat already has a full queue are merged into the last waiting message
+    # ("merge") or push out the oldest one ("drop_oldest"). With "merge", text
+    # messages a user sends within CHAT_MERGE_WINDOW_SECONDS of each other, such
+    # as the parts Telegram splits a long paste into, are answered as one.
+    update_workers: int = Field(8, ge=1)
+    chat_queue_size: int = Field(3, ge=1)
+    chat_queue_overflow: Literal["drop_oldest", "merge"] = "merge"
+    chat_merge_window_seconds: float = Field(0.1, ge=0)
+    # An SQLite database of the updates received but not handled yet. With it,
+    # questions sent while the bot is down or restarting are answered after the
+    # restart, oldest first and with repeated questions of a chat answered once,
+    # unless they are older than UPDATE_BACKLOG_MAX_AGE_SECONDS. A question whose
+    # answer fails is tried again after a restart, up to UPDATE_JOURNAL_MAX_ATTEMPTS
+    # times. Without a journal, updates pending at startup are dropped.
+    update_journal_path: Path | None = None
+    update_journal_max_attempts: int = Field(3, ge=1)
+    update_backlog_max_age_seconds: float = Field(24 * 60 * 60, gt=0)
+
+    # --- Observability ---
+    # Serve Prometheus metrics on http://METRICS_LISTEN:METRICS_PORT/metrics.
+    # A share of updates can also be traced stage by stage; traces are logged.
+    metrics_enabled: bool = False
+    metrics_listen: str = "127.0.0.1"
+    metrics_port: int = Field(9464, ge=1, le=65535)
+    trace_sample_rate: float = Field(0.0, ge=0, le=1)
+
+    # --- Logging ---
+    # Log lines are written as JSON (or "text") by a background thread. User
+    # messages are logged in "full", cut to LOG_MESSAGE_MAX_CHARS ("truncate"), or
+    # replaced by their length and a short hash ("redact"). High-volume loggers can
+    # be sampled by name, e.g. {"aura_telegram_bot.main": 0.1}; warnings and errors
+    # are always kept.
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    log_format: Literal["json", "text"] = "json"
+    log_message_bodies: Literal["full", "truncate", "redact"] = "truncate"
+    log_message_max_chars: int = Field(80, ge=1)
+    log_sample_rates: dict[str, Annotated[float, Field(ge=0, le=1)]] = {}
 
     # --- Application settings ---
+    # A single file, or a directory of *.md and *.txt documents, one per device.
     knowledge_base_path: Path = Path("knowledge_base.txt")
+    # How often to check the knowledge base file for edits. Set to 0 to disable hot-reload.
+    knowledge_base_reload_interval_seconds: float = Field(5.0, ge=0)
+    # A directory is opened by reading only the front matter of each document.
+    # Questions are answered from the documents whose device or keywords they
+    # mention. Loaded documents are kept up to a total file size in megabytes;
+    # their search indexes take a few times that on the heap.
+    knowledge_base_documents_per_question: int = Field(2, ge=1)
+    knowledge_base_max_resident_mb: float = Field(64, gt=0)
+
+    # --- Retrieval ---
+    # Only the most relevant knowledge base sections are sent with each question.
+    retrieval_top_k: int = Field(4, ge=1)
+    retrieval_token_budget: int = Field(2000, ge=1)
 
-    def load_knowledge_base(self) -> str:
+    # --- Intent router ---
+    # Lookup questions such as "what is fault F4?" are answered with the matching
+    # knowledge base entry, without a model call. Every topic word of the question
+    # must belong to the entry; the threshold is the share of them its own label,
+    # rather than its section heading, must name.
+    intent_router_enabled: bool = True
+    intent_router_threshold: float = Field(0.8, ge=0, le=1)
+
+    # --- Answer cache ---
+    # Answers to repeated questions are reused until they expire or the knowledge
+    # base changes. Set the size to 0 to disable the cache.
+    answer_cache_size: int = Field(256, ge=0)
+    answer_cache_ttl_seconds: float = Field(6 * 60 * 60, gt=0)
+    answer_cache_path: Path | None = None
+
+    # --- Semantic cache (optional) ---
+    # Answers are also reused for differently worded questions whose cosine
+    # similarity reaches the threshold. Needs NumPy (the "semantic" extra).
+    semantic_cache_enabled: bool = False
+    semantic_cache_size: int = Field(10_000, ge=1)
+    semantic_cache_threshold: float = Field(0.8, gt=0, le=1)
+
+    # --- Conversation memory ---
+    # The recent turns of each chat are sent along with a follow-up question,
+    # such as "and how do I fix it?", so that it can be answered. Questions that
+    # stand on their own are sent, and cached, without them. Older turns are
+    # dropped to stay within the token budget, keeping only their questions.
+    # Chats idle for longer than the timeout are forgotten. Set the number of
+    # turns to 0 to disable conversation memory.
+    conversation_memory_turns: int = Field(6, ge=0)
+    conversation_memory_token_budget: int = Field(800, ge=1)
+    conversation_idle_seconds: float = Field(30 * 60, gt=0)
+    conversation_max_chats: int = Field(1000, ge=1)
+    # An SQLite database that keeps conversations across restarts.
+    conversation_memory_path: Path | None = None
+
+    # --- Streaming ---
+    # Answers are shown progressively by editing the reply as text arrives.
+    # Telegram allows roughly one edit per second per chat.
+    stream_responses: bool = True
+    stream_edit_interval_seconds: float = Field(1.5, ge=0)
+
+    @model_validator(mode="after")
+    def _check_webhook_settings(self) -> Self:
+        """Ensures webhook mode has a public URL and a secret token."""
+        if self.telegram_update_mode == "webhook" and not (
+            self.webhook_url and self.webhook_secret_token
+        ):
+            raise ValueError("Webhook mode requires WEBHOOK_URL and WEBHOOK_SECRET_TOKEN.")
+        return self
+
+    def load_knowledge_base(self) -> str | Corpus:
         """Loads the knowledge base content from the configured path.
 
         Returns:
-            The content of the knowledge base file as a string.
+            The content of the knowledge base file as a string, or the corpus
+            of documents if the path is a directory.
         """
-        logger.info(f"Loading knowledge base from: {self.knowledge_base_path}")
+        logger.info("Loading knowledge base from: %s", self.knowledge_base_path)
+        if self.knowledge_base_path.is_dir():
+            return Corpus.open(
+                self.knowledge_base_path,
+                max_resident_bytes=int(self.knowledge_base_max_resident_mb * 2**20),
+                documents_per_question=self.knowledge_base_documents_per_question,
+            )
         try:
             return self.knowledge_base_path.read_text(encoding="utf-8")
         except FileNotFoundError:
             logger.error(
-                f"'{self.knowledge_base_path}' not found. Bot will lack specific context.",
+                "'%s' not found. Bot will lack specific context.",
+                self.knowledge_base_path,
             )
             return "No specific boiler information is available."
 
@@ -0,0 +1,154 @@
+"""A bounded answer cache for repeated questions."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Normalizes a question so that trivial variations share a cache entry.
+
+    Case, Unicode representation, punctuation and whitespace are ignored,
+    so "What does F2 mean?" and "what does f2 mean" are the same question.
+    """
+    text = unicodedata.normalize("NFKC", question).casefold()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def fingerprint(text: str) -> str:
+    """Returns a short, stable hash of a text, used to version cached answers."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class AnswerCache:
+    """An LRU cache of answers with a time-to-live and optional persistence.
+
+    Entries are keyed on the normalized question and bound to a fingerprint
+    of the knowledge base, so all answers are dropped when the knowledge
+    base changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 256,
+        ttl: float = 6 * 60 * 60,
+        path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initializes the cache, loading persisted entries if a path is given.
+
+        Args:
+            max_entries: The maximum number of cached answers. Zero disables the cache.
+            ttl: How long an answer stays valid, in seconds.
+            path: An optional JSON file used to persist the cache across restarts.
+            clock: The wall-clock time source, in seconds since the epoch.
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._path = path
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._fingerprint = ""
+        self.hits = 0
+        self.misses = 0
+        if path is not None and max_entries:
+            self._load(path)
+
+    def __len__(self) -> int:
+        """Returns the number of cached answers, including expired ones."""
+        return len(self._entries)
+
+    def bind(self, knowledge_base_fingerprint: str) -> None:
+        """Binds the cache to a knowledge base version, dropping stale answers.
+
+        Args:
+            knowledge_base_fingerprint: The fingerprint of the current knowledge base.
+        """
+        if knowledge_base_fingerprint != self._fingerprint:
+            if self._entries:
+                logger.info("Knowledge base changed, dropping %d cached answers.", len(self))
+            self._entries.clear()
+            self._fingerprint = knowledge_base_fingerprint
+
+    def get(self, question: str) -> str | None:
+        """Returns the cached answer to a question, or None on a miss."""
+        if not self._max_entries:
+            return None
+        key = normalize_question(question)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        answer, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, question: str, answer: str) -> None:
+        """Caches an answer, evicting the least recently used one if full."""
+        if not self._max_entries:
+            return
+        key = normalize_question(question)
+        self._entries[key] = (answer, self._clock() + self._ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Writes the unexpired entries to the persistence file, if configured."""
+        if self._path is None:
+            return
+        now = self._clock()
+        data = {
+            "fingerprint": self._fingerprint,
+            "entries": [
+                [key, answer, expires_at]
+                for key, (answer, expires_at) in self._entries.items()
+                if expires_at > now
+            ],
+        }
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(self._path)
+        except OSError:
+            logger.exception("Failed to save the answer cache to '%s'.", self._path)
+            return
+        logger.info("Saved %d cached answers to '%s'.", len(data["entries"]), self._path)
+
+    def _load(self, path: Path) -> None:
+        """Loads persisted entries; a missing or corrupt file leaves the cache empty."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self._fingerprint = str(data["fingerprint"])
+            now = self._clock()
+            for key, answer, expires_at in data["entries"][-self._max_entries :]:
+                if expires_at > now:
+                    self._entries[key] = (answer, expires_at)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning("Ignoring unreadable answer cache file '%s'.", path)
+            self._entries.clear()
+            return
+        logger.info("Loaded %d cached answers from '%s'.", len(self), path)
@@ -0,0 +1,383 @@
+"""A knowledge base spread over a directory of documents, loaded on demand.
+
+Each document (``*.md`` or ``*.txt``) covers one device and may start with a
+front matter block of ``key: value`` lines::
+
+    ---
+    device: Vitocal 200-S heat pump
+    keywords: heat pump, vitocal, compressor
+    default: true
+    ---
+
+Opening a corpus only reads these headers. Each question is matched against
+the devices and keywords to choose the documents worth searching; questions
+that name no device go to the default documents. Only the chosen documents
+are mapped into memory with ``mmap``, split into a table of section offsets
+and indexed. Sections are decoded from the mapping when they are sent to the
+model, and loaded documents are kept in an LRU cache bounded by their size,
+so resident memory does not grow with the corpus.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import mmap
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+from aura_telegram_bot.core.cache import fingerprint
+from aura_telegram_bot.core.retrieval import (
+    CHARS_PER_TOKEN,
+    KnowledgeIndex,
+    tokenize,
+)
+from aura_telegram_bot.core.router import IntentRouter, RouteMatch
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_SUFFIXES = frozenset({".md", ".txt"})
+# Front matter is only looked for at the start of a document.
+_HEADER_BYTES = 4096
+_FRONT_MATTER_RE = re.compile(
+    rb"\A---[ \t]*\r?\n(.*?)^---[ \t]*(?:\r?\n|\Z)", re.DOTALL | re.MULTILINE
+)
+_HEADING_RE = re.compile(rb"^##[ \t]+(.+?)[ \t]*\r?$", re.MULTILINE)
+_TRUE = frozenset({"true", "yes", "1"})
+
+
+@dataclass(frozen=True, slots=True)
+class DocumentInfo:
+    """What is known about a document without loading it.
+
+    Attributes:
+        path: The document file.
+        device: The device the document covers.
+        keywords: Further words that point a question to this document.
+        default: Whether questions that name no device are answered from it.
+        size: The size of the file in bytes.
+        modified_ns: The modification time of the file.
+        body_offset: Where the text starts, after the front matter.
+    """
+
+    path: Path
+    device: str
+    keywords: tuple[str, ...]
+    default: bool
+    size: int
+    modified_ns: int
+    body_offset: int
+
+    @property
+    def terms(self) -> frozenset[str]:
+        """The words of the device name, keywords and file name that select this document."""
+        text = " ".join((self.device, *self.keywords, self.path.stem.replace("_", " ")))
+        return frozenset(term for term in tokenize(text) if len(term) > 2)
+
+
+def read_document_info(path: Path) -> DocumentInfo:
+    """Reads the front matter of a document, and nothing after it."""
+    stat = path.stat()
+    with path.open("rb") as file:
+        header = file.read(_HEADER_BYTES)
+    fields: dict[str, str] = {}
+    body_offset = 0
+    match = _FRONT_MATTER_RE.match(header)
+    if match is not None:
+        body_offset = match.end()
+        for line in match.group(1).decode("utf-8", errors="replace").splitlines():
+            key, separator, value = line.partition(":")
+            if separator:
+                fields[key.strip().lower()] = value.strip()
+    return DocumentInfo(
+        path=path,
+        device=fields.get("device") or path.stem.replace("_", " "),
+        keywords=tuple(
+            keyword.strip() for keyword in fields.get("keywords", "").split(",") if keyword.strip()
+        ),
+        default=fields.get("default", "").lower() in _TRUE,
+        size=stat.st_size,
+        modified_ns=stat.st_mtime_ns,
+        body_offset=body_offset,
+    )
+
+
+class MappedSection:
+    """A section of a document, read from the document's memory mapping when needed."""
+
+    __slots__ = ("_buffer", "end", "offset", "title", "tokens")
+
+    def __init__(self, buffer: mmap.mmap | bytes, title: str, offset: int, end: int) -> None:
+        """Initializes the section.
+
+        Args:
+            buffer: The mapped document.
+            title: The heading of the section, or an empty string for the preamble.
+            offset: Where the section starts in the document, in bytes.
+            end: Where the section ends in the document, in bytes.
+        """
+        self._buffer = buffer
+        self.title = title
+        self.offset = offset
+        self.end = end
+        self.tokens = -(-(end - offset) // CHARS_PER_TOKEN)
+
+    @property
+    def text(self) -> str:
+        """The text of the section, including its heading line."""
+        return self._buffer[self.offset : self.end].decode("utf-8", errors="replace").strip()
+
+
+class LoadedDocument:
+    """A document mapped into memory, with its section offsets and search index."""
+
+    def __init__(self, info: DocumentInfo) -> None:
+        """Maps the document and indexes its sections.
+
+        Args:
+            info: The document to load.
+        """
+        self.info = info
+        buffer: mmap.mmap | bytes = b""
+        if info.size:
+            with info.path.open("rb") as file:
+                # The mapping stays valid after the file is closed.
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = buffer
+        self.sections = _split_mapped(buffer, info.body_offset)
+        self.index = KnowledgeIndex(self.sections)
+        self._router: IntentRouter | None = None
+
+    def text(self) -> str:
+        """Returns the whole text of the document, without its front matter."""
+        return self._buffer[self.info.body_offset :].decode("utf-8", errors="replace")
+
+    def router(self, threshold: float) -> IntentRouter:
+        """Returns the intent router over this document, compiling it on first use."""
+        if self._router is None:
+            self._router = IntentRouter.from_text(
+                self.text(),
+                threshold=threshold,
+                context=" ".join((self.info.device, *self.info.keywords)),
+            )
+        return self._router
+
+
+def _split_mapped(buffer: mmap.mmap | bytes, start: int) -> list[MappedSection]:
+    """Splits a mapped document on its ``##`` headings, like ``split_sections``."""
+    sections: list[MappedSection] = []
+    matches = list(_HEADING_RE.finditer(buffer, start))
+    preamble_end = matches[0].start() if matches else len(buffer)
+    if buffer[start:preamble_end].strip():
+        sections.append(MappedSection(buffer, "", start, preamble_end))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(buffer)
+        title = match.group(1).decode("utf-8", errors="replace")
+        sections.append(MappedSection(buffer, title, match.start(), end))
+    return sections
+
+
+class Corpus:
+    """A directory of documents, searched a few documents at a time.
+
+    Loaded documents are shared by concurrent requests and evicted least
+    recently used first once their total size exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        documents: list[DocumentInfo],
+        *,
+        max_resident_bytes: int = 64 * 2**20,
+        documents_per_question: int = 2,
+    ) -> None:
+        """Initializes the corpus.
+
+        Args:
+            documents: The documents, in the order they are preferred on a tie.
+            max_resident_bytes: The total size of the documents kept loaded. A
+                document over it is still loaded for the question that needs it.
+            documents_per_question: The maximum number of documents searched
+                for one question.
+        """
+        self.documents = documents
+        self._max_resident_bytes = max_resident_bytes
+        self._documents_per_question = documents_per_question
+        self._terms = [info.terms for info in documents]
+        self._loaded: OrderedDict[Path, LoadedDocument] = OrderedDict()
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+        self.total_tokens = sum(-(-info.size // CHARS_PER_TOKEN) for info in documents)
+        self.fingerprint = fingerprint(
+            "\n".join(f"{info.path.name}:{info.size}:{info.modified_ns}" for info in documents),
+        )
+
+    @classmethod
+    def open(
+        cls,
+        directory: Path,
+        *,
+        max_resident_bytes: int = 64 * 2**20,
+        documents_per_question: int = 2,
+    ) -> Corpus:
+        """Opens the documents of a directory and its subdirectories, reading only their headers.
+
+        Args:
+            directory: The directory of ``*.md`` and ``*.txt`` documents.
+            max_resident_bytes: As in the constructor.
+            documents_per_question: As in the constructor.
+
+        Returns:
+            The corpus, with documents in path order.
+        """
+        documents = [
+            read_document_info(path)
+            for path in sorted(directory.rglob("*"))
+            if path.suffix.lower() in DOCUMENT_SUFFIXES
+            and path.is_file()
+            and not path.name.startswith(".")
+        ]
+        corpus = cls(
+            documents,
+            max_resident_bytes=max_resident_bytes,
+            documents_per_question=documents_per_question,
+        )
+        logger.info(
+            "Knowledge base directory '%s': %d documents, ~%d tokens.",
+            directory,
+            len(corpus),
+            corpus.total_tokens,
+        )
+        return corpus
+
+    def __len__(self) -> int:
+        """Returns the number of documents."""
+        return len(self.documents)
+
+    def read_all(self) -> str:
+        """Returns the text of every document, without front matter, e.g. for a small corpus."""
+        return "\n\n".join(
+            info.path.read_bytes()[info.body_offset :].decode("utf-8", errors="replace").strip()
+            for info in self.documents
+        )
+
+    def select(self, question: str) -> list[DocumentInfo]:
+        """Chooses the documents to search for a question.
+
+        Documents are ranked by how many of their device and keyword terms the
+        question contains. A question that matches none goes to the default
+        documents, or to the first document if none is marked as default.
+        """
+        words = set(tokenize(question))
+        scored = [
+            (len(words & terms), position)
+            for position, terms in enumerate(self._terms)
+            if not words.isdisjoint(terms)
+        ]
+        if scored:
+            best = heapq.nsmallest(
+                self._documents_per_question, scored, key=lambda item: (-item[0], item[1])
+            )
+            return [self.documents[position] for _, position in best]
+        defaults = [info for info in self.documents if info.default] or self.documents[:1]
+        return defaults[: self._documents_per_question]
+
+    def is_loaded(self, question: str) -> bool:
+        """Returns whether every document a question needs is already loaded."""
+        return all(info.path in self._loaded for info in self.select(question))
+
+    def load(self, question: str) -> list[LoadedDocument]:
+        """Returns the documents to search for a question, loading them if needed."""
+        return [self._document(info) for info in self.select(question)]
+
+    def _document(self, info: DocumentInfo) -> LoadedDocument:
+        """Returns a loaded document, evicting the least recently used ones over budget."""
+        with self._lock:
+            document = self._loaded.get(info.path)
+            if document is not None:
+                self._loaded.move_to_end(info.path)
+                return document
+            document = LoadedDocument(info)
+            self.loads += 1
+            self._loaded[info.path] = document
+            self.resident_bytes += info.size
+            while self.resident_bytes > self._max_resident_bytes and len(self._loaded) > 1:
+                _, evicted = self._loaded.popitem(last=False)
+                self.resident_bytes -= evicted.info.size
+                self.evictions += 1
+            logger.info(
+                "Loaded '%s' (%d sections); %d documents resident.",
+                info.path.name,
+                len(document.sections),
+                len(self._loaded),
+            )
+            return document
+
+    def build_context(self, query: str, *, top_k: int, token_budget: int) -> str:
+        """Selects the text to send to the model for a query, like ``KnowledgeIndex``.
+
+        The best sections of the chosen documents are packed into the budget
+        and grouped under the name of their device, in document order.
+        """
+        documents = self.load(query)
+        ranked: list[tuple[float, int, MappedSection]] = []
+        for number, document in enumerate(documents):
+            for section, score in document.index.search(query, top_k):
+                ranked.append((score, number, cast("MappedSection", section)))
+        candidates = [
+            (number, section)
+            for _, number, section in heapq.nlargest(top_k, ranked, key=lambda item: item[0])
+        ]
+        if not candidates and documents:
+            candidates = [(0, section) for section in documents[0].sections[:top_k]]
+
+        chosen: list[tuple[int, MappedSection]] = []
+        remaining = token_budget
+        for number, section in candidates:
+            if section.tokens <= remaining:
+                chosen.append((number, section))
+                remaining -= section.tokens
+        if not chosen and candidates:
+            # Even the best section alone is over budget, so send its beginning.
+            return candidates[0][1].text[: token_budget * CHARS_PER_TOKEN]
+
+        groups: dict[int, list[str]] = {}
+        for number, section in sorted(chosen, key=lambda item: (item[0], item[1].offset)):
+            groups.setdefault(number, []).append(section.text)
+        return "\n\n".join(
+            "\n\n".join([f"# {documents[number].info.device}", *texts])
+            for number, texts in groups.items()
+        )
+
+    def router(self, threshold: float) -> CorpusRouter:
+        """Returns an intent router over the documents chosen for each question."""
+        return CorpusRouter(self, threshold)
+
+
+class CorpusRouter:
+    """Answers lookup questions from the documents a corpus chooses for them."""
+
+    def __init__(self, corpus: Corpus, threshold: float) -> None:
+        """Initializes the router.
+
+        Args:
+            corpus: The documents to route questions to.
+            threshold: As for ``IntentRouter``.
+        """
+        self._corpus = corpus
+        self._threshold = threshold
+
+    def match(self, question: str) -> RouteMatch | None:
+        """Returns the most confident match among the chosen documents, if any."""
+        matches = [
+            match
+            for document in self._corpus.load(question)
+            if (match := document.router(self._threshold).match(question)) is not None
+        ]
+        return max(matches, key=lambda match: match.confidence, default=None)
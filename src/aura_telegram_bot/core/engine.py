@@ -2,13 +2,144 @@
 
 from __future__ import annotations
 
+import asyncio
+import datetime as dt
 import logging
-import textwrap
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
-import google.generativeai as genai
+from aura_telegram_bot.core.cache import AnswerCache, fingerprint, normalize_question
+from aura_telegram_bot.core.corpus import Corpus, CorpusRouter
+from aura_telegram_bot.core.hedging import Hedger
+from aura_telegram_bot.core.live_context import LiveContextProvider
+from aura_telegram_bot.core.memory import ConversationMemory, refers_back
+from aura_telegram_bot.core.prompt import PromptPrefix
+from aura_telegram_bot.core.retrieval import estimate_tokens
+from aura_telegram_bot.core.router import IntentRouter
+from aura_telegram_bot.core.scheduler import Priority, QueueFullError, RequestScheduler
+from aura_telegram_bot.core.singleflight import SingleFlight
+from aura_telegram_bot.core.timing import StageTimings
+from aura_telegram_bot.logs import user_text
+from aura_telegram_bot.metrics import (
+    ERRORS,
+    GEMINI_SECONDS,
+    PROMPT_TOKENS,
+    SYSTEM_INSTRUCTION_TOKENS,
+)
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    from aura_telegram_bot.core.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
+NO_RESPONSE_MESSAGE = "Sorry, I couldn't generate a response at this time. Please try again later."
+ERROR_MESSAGE = (
+    "Sorry, I encountered an error while processing your request. Please try again later."
+)
+BUSY_MESSAGE = "Sorry, I'm answering a lot of questions right now. Please try again in a minute."
+# Marks a stream that ended before its first chunk.
+_END = object()
+
+
+def _sdk() -> ModuleType:
+    """Returns the Gemini SDK, importing it on first use.
+
+    The SDK takes longer to import than the rest of the bot together, so it is
+    only loaded when the first engine is built. A module-level ``genai`` that is
+    already set, e.g. by a test patching it, is used as is.
+    """
+    module = globals().get("genai")
+    if module is None:
+        import google.generativeai as module
+
+        globals()["genai"] = module
+    return module
+
+
+def __getattr__(name: str) -> Any:
+    """Resolves ``genai`` lazily, so that it can be patched like a regular import."""
+    if name == "genai":
+        return _sdk()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _chunk_text(chunk: object) -> str | None:
+    """Returns the text of a streamed chunk, or None if it carries no text.
+
+    The SDK raises ValueError from ``.text`` for chunks without text parts,
+    such as a final chunk that only carries the finish reason.
+    """
+    try:
+        return getattr(chunk, "text", None)
+    except ValueError:
+        return None
+
+
+async def _resumed(first: object, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Yields a chunk already taken from a stream, then the rest of the stream."""
+    if first is _END:
+        return
+    yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+def _cache_key(question: str, live_readings: str, history: str = "") -> str:
+    """Returns the cache key of a question.
+
+    Answers based on live readings or on the conversation so far depend on them.
+    """
+    return "\n".join(part for part in (question, live_readings, history) if part)
+
+
+@dataclass(slots=True)
+class KnowledgeSnapshot:
+    """Everything derived from one version of the knowledge base.
+
+    The engine swaps whole snapshots on reload, so a request always sees a
+    consistent prefix and model.
+
+    Attributes:
+        prefix: The static prompt prefix, including the retrieval index.
+        model: The Gemini model configured with the prefix.
+        cached_content: The Gemini context cache holding the prefix, if used.
+        cache_expires_at: When the context cache expires, on the monotonic clock.
+        router: Answers lookup questions locally, if enabled.
+        corpus: The documents searched per question, for a knowledge base
+            directory too large to send in full.
+        fallbacks: The models asked when the primary one is late or fails,
+            by name, configured with the same prefix.
+    """
+
+    prefix: PromptPrefix
+    model: Any
+    cached_content: Any = None
+    cache_expires_at: float = 0.0
+    router: IntentRouter | CorpusRouter | None = None
+    corpus: Corpus | None = None
+    fallbacks: tuple[tuple[str, Any], ...] = ()
+
+
+@dataclass(slots=True)
+class ResponseStats:
+    """How one question was answered, filled in by ``get_response`` when given one.
+
+    Attributes:
+        source: Where the answer came from: "router", "cache", "model", or
+            "busy" and "error" when no answer could be given.
+        prompt_tokens: The estimated size of the prompt sent to Gemini; 0 when
+            no prompt was sent, including when an identical call was joined.
+        stages: The seconds spent in each stage of the request.
+    """
+
+    source: str = ""
+    prompt_tokens: int = 0
+    stages: dict[str, float] = field(default_factory=dict)
+
 
 class AuraEngine:
     """The core engine of the Aura bot.
@@ -17,71 +148,692 @@ class AuraEngine:
     specific interface like Telegram or a command-line interface.
     """
 
-    def __init__(self, gemini_api_key: str, knowledge_base: str) -> None:
+    def __init__(
+        self,
+        gemini_api_key: str,
+        knowledge_base: str | Corpus,
+        *,
+        top_k: int = 4,
+        token_budget: int = 2000,
+        answer_cache: AnswerCache | None = None,
+        model_name: str = "gemini-1.5-flash",
+        fallback_models: Sequence[str] = (),
+        hedger: Hedger | None = None,
+        context_cache_ttl: float | None = None,
+        scheduler: RequestScheduler | None = None,
+        live_context: LiveContextProvider | None = None,
+        intent_threshold: float | None = 0.8,
+        semantic_cache: SemanticCache | None = None,
+        conversation_memory: ConversationMemory | None = None,
+    ) -> None:
         """Initializes the AuraEngine.
 
         Args:
             gemini_api_key: The API key for the Google Gemini service.
-            knowledge_base: The text content of the knowledge base file.
+            knowledge_base: The text content of the knowledge base file, or a
+                corpus of documents that are loaded as questions need them.
+            top_k: The maximum number of knowledge base sections sent per question.
+            token_budget: The maximum estimated tokens of knowledge base text per question.
+            answer_cache: The cache for repeated questions. A default in-memory cache is
+                used if not provided.
+            model_name: The Gemini model to use.
+            fallback_models: Models asked in turn when the one before is slower
+                than usual or fails; the first answer is used.
+            hedger: Decides when to ask the fallback models. A default one is
+                used if not provided.
+            context_cache_ttl: If set, the knowledge base is stored in Gemini's
+                server-side context cache for this many seconds (and kept alive), so
+                each question only pays for its own tokens. Requires a model version
+                that supports context caching.
+            scheduler: Limits concurrency and rate of Gemini calls. A default
+                scheduler without a rate limit is used if not provided.
+            live_context: Provides live device readings for questions about the
+                boiler's current condition. Can also be set later.
+            intent_threshold: The confidence above which lookup questions, such as
+                "what is fault F4?", are answered with the matching knowledge base
+                entry instead of a Gemini call. None disables the intent router.
+            semantic_cache: Reuses answers to similarly worded questions, if given.
+            conversation_memory: Remembers the recent turns of each chat, so that
+                follow-up questions can be answered, if given.
         """
         logger.info("Initializing AuraEngine...")
-        self._knowledge_base = knowledge_base
+        self._top_k = top_k
+        self._token_budget = token_budget
+        self._model_name = model_name
+        self._fallback_models = tuple(fallback_models)
+        self._hedger = hedger if hedger is not None else Hedger()
+        self._context_cache_ttl = context_cache_ttl
+        self._intent_threshold = intent_threshold
+        self._cache = answer_cache if answer_cache is not None else AnswerCache()
+        self._semantic_cache = semantic_cache
+        self._flights: SingleFlight[str | None] = SingleFlight()
+        self._scheduler = scheduler if scheduler is not None else RequestScheduler()
+        self._live_context = live_context
+        self._memory = conversation_memory
+        self._timings = StageTimings()
+        self.llm_calls_avoided = 0
 
         # Configure the generative AI model
-        genai.configure(api_key=gemini_api_key)
-        self._model = genai.GenerativeModel("gemini-1.5-flash")
+        _sdk().configure(api_key=gemini_api_key)
+        self._snapshot = self._build_snapshot(knowledge_base)
+        self._bind_caches(self._snapshot.prefix)
         logger.info("AuraEngine initialized successfully.")
 
-    async def _get_gemini_answer(self, question: str) -> str:
+    def _build_snapshot(self, knowledge_base: str | Corpus) -> KnowledgeSnapshot:
+        """Builds the static prompt prefix and a model configured with it.
+
+        With context caching enabled, the prefix is uploaded to Gemini's context
+        cache. If that fails, for example because the knowledge base is below the
+        provider's minimum cacheable size, a regular model is used instead.
+
+        A corpus that fits into the token budget is read and treated like a
+        single file. A larger one is never read in full: its documents are
+        searched and routed per question, without context caching.
+        """
+        genai = _sdk()
+        if isinstance(knowledge_base, Corpus):
+            if knowledge_base.total_tokens <= self._token_budget:
+                knowledge_base = knowledge_base.read_all()
+            else:
+                return self._build_corpus_snapshot(knowledge_base)
+        router = None
+        if self._intent_threshold is not None:
+            router = IntentRouter.from_text(knowledge_base, threshold=self._intent_threshold)
+        if self._context_cache_ttl is not None:
+            prefix = PromptPrefix.build(
+                knowledge_base, token_budget=self._token_budget, inline=True
+            )
+            try:
+                cached_content = genai.caching.CachedContent.create(
+                    model=self._model_name,
+                    display_name="aura-knowledge-base",
+                    system_instruction=prefix.system_instruction,
+                    ttl=dt.timedelta(seconds=self._context_cache_ttl),
+                )
+                logger.info("Knowledge base stored in the Gemini context cache.")
+                return KnowledgeSnapshot(
+                    prefix=prefix,
+                    model=genai.GenerativeModel.from_cached_content(cached_content),
+                    cached_content=cached_content,
+                    cache_expires_at=time.monotonic() + self._context_cache_ttl,
+                    router=router,
+                    fallbacks=self._build_fallbacks(prefix),
+                )
+            except Exception as e:
+                logger.warning(f"Context caching unavailable, sending the prompt instead: {e}")
+
+        prefix = PromptPrefix.build(knowledge_base, token_budget=self._token_budget)
+        model = genai.GenerativeModel(
+            self._model_name, system_instruction=prefix.system_instruction
+        )
+        return KnowledgeSnapshot(
+            prefix=prefix, model=model, router=router, fallbacks=self._build_fallbacks(prefix)
+        )
+
+    def _build_corpus_snapshot(self, corpus: Corpus) -> KnowledgeSnapshot:
+        """Builds a snapshot that loads the documents of a corpus on demand."""
+        if self._context_cache_ttl is not None:
+            logger.warning(
+                "Context caching needs the whole knowledge base; not used for a corpus."
+            )
+        prefix = PromptPrefix.from_corpus(corpus)
+        model = _sdk().GenerativeModel(
+            self._model_name, system_instruction=prefix.system_instruction
+        )
+        router = None
+        if self._intent_threshold is not None:
+            router = corpus.router(self._intent_threshold)
+        return KnowledgeSnapshot(
+            prefix=prefix,
+            model=model,
+            router=router,
+            corpus=corpus,
+            fallbacks=self._build_fallbacks(prefix),
+        )
+
+    def _build_fallbacks(self, prefix: PromptPrefix) -> tuple[tuple[str, Any], ...]:
+        """Builds the fallback models, each with the prefix as its system instruction.
+
+        Fallbacks never use the context cache, which belongs to the primary model;
+        the prefix's system instruction holds everything the cache would.
+        """
+        genai = _sdk()
+        return tuple(
+            (name, genai.GenerativeModel(name, system_instruction=prefix.system_instruction))
+            for name in self._fallback_models
+        )
+
+    def _bind_caches(self, prefix: PromptPrefix) -> None:
+        """Binds the answer caches to a knowledge base version."""
+        self._cache.bind(prefix.fingerprint)
+        if self._semantic_cache is not None:
+            self._semantic_cache.bind(prefix.fingerprint)
+        SYSTEM_INSTRUCTION_TOKENS.set(estimate_tokens(prefix.system_instruction))
+
+    async def reload_knowledge_base(self, knowledge_base: str | Corpus) -> bool:
+        """Swaps in a new version of the knowledge base without a restart.
+
+        The new snapshot (index, prompt prefix and model) is built in a worker
+        thread and then swapped in with a single assignment. Requests already in
+        flight finish with the snapshot they started with; cached answers for the
+        old version are dropped.
+
+        Args:
+            knowledge_base: The new text content of the knowledge base, or a
+                new corpus of documents.
+
+        Returns:
+            True if the knowledge base changed, False if it was identical.
+        """
+        version = (
+            knowledge_base.fingerprint
+            if isinstance(knowledge_base, Corpus)
+            else fingerprint(knowledge_base)
+        )
+        if version == self._snapshot.prefix.fingerprint:
+            return False
+        snapshot = await asyncio.to_thread(self._build_snapshot, knowledge_base)
+        self._snapshot = snapshot
+        self._bind_caches(snapshot.prefix)
+        # The previous context cache, if any, is left to expire on its own TTL so
+        # that requests still using it are not cut off.
+        logger.info(
+            "Knowledge base reloaded (version %s, ~%d tokens).",
+            snapshot.prefix.fingerprint,
+            snapshot.prefix.index.total_tokens,
+        )
+        return True
+
+    async def _keep_context_cache_alive(self, snapshot: KnowledgeSnapshot) -> None:
+        """Extends the context cache's TTL once half of it has elapsed."""
+        if snapshot.cached_content is None or self._context_cache_ttl is None:
+            return
+        ttl = self._context_cache_ttl
+        if snapshot.cache_expires_at - time.monotonic() > ttl / 2:
+            return
+        snapshot.cache_expires_at = time.monotonic() + ttl
+        try:
+            await asyncio.to_thread(snapshot.cached_content.update, ttl=dt.timedelta(seconds=ttl))
+        except Exception as e:
+            logger.warning(f"Failed to extend the Gemini context cache: {e}")
+
+    @property
+    def answer_cache(self) -> AnswerCache:
+        """The cache of answers to repeated questions."""
+        return self._cache
+
+    @property
+    def semantic_cache(self) -> SemanticCache | None:
+        """The cache of answers to similarly worded questions, if enabled."""
+        return self._semantic_cache
+
+    @property
+    def conversation_memory(self) -> ConversationMemory | None:
+        """The per-chat conversation histories, if enabled."""
+        return self._memory
+
+    @property
+    def knowledge_base_version(self) -> str:
+        """The fingerprint of the knowledge base currently in use."""
+        return self._snapshot.prefix.fingerprint
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """The scheduler of Gemini calls, with queue depth and wait time counters."""
+        return self._scheduler
+
+    @property
+    def hedger(self) -> Hedger:
+        """Decides when a Gemini call is also sent to a fallback model."""
+        return self._hedger
+
+    @property
+    def live_context(self) -> LiveContextProvider | None:
+        """The provider of live device readings, if any."""
+        return self._live_context
+
+    @live_context.setter
+    def live_context(self, provider: LiveContextProvider | None) -> None:
+        """Sets the provider, e.g. once the integrations have been started."""
+        self._live_context = provider
+
+    @property
+    def timings(self) -> StageTimings:
+        """How long each stage of answering takes: live readings, caches and model."""
+        return self._timings
+
+    @property
+    def single_flight(self) -> SingleFlight[str | None]:
+        """The coalescer of concurrent identical questions.
+
+        Its ``shared`` counter is the number of Gemini calls saved.
+        """
+        return self._flights
+
+    def close(self) -> None:
+        """Releases engine resources, persisting the caches and conversations if configured."""
+        self._cache.save()
+        if self._memory is not None:
+            self._memory.save()
+        cached_content = self._snapshot.cached_content
+        if cached_content is not None:
+            try:
+                cached_content.delete()
+            except Exception as e:
+                logger.warning(f"Failed to delete the Gemini context cache: {e}")
+            self._snapshot.cached_content = None
+
+    def _build_prompt(
+        self,
+        question: str,
+        snapshot: KnowledgeSnapshot,
+        live_readings: str = "",
+        history: str = "",
+    ) -> str:
+        """Builds the per-request part of the prompt for a question."""
+        return snapshot.prefix.render(
+            question,
+            top_k=self._top_k,
+            token_budget=self._token_budget,
+            live_readings=live_readings,
+            history=history,
+        )
+
+    def _attempts[T](
+        self, snapshot: KnowledgeSnapshot, request: Callable[[Any], Awaitable[T]]
+    ) -> list[tuple[str, Callable[[], Awaitable[T]]]]:
+        """Returns a hedged call's attempts: the request to each model of the chain.
+
+        Every attempt is rate limited and retried by the scheduler, but all of
+        them share the scheduler slot of the call.
+        """
+
+        def attempt(model: Any) -> Callable[[], Awaitable[T]]:
+            return lambda: self._scheduler.call(lambda: request(model))
+
+        models = [(self._model_name, snapshot.model), *snapshot.fallbacks]
+        return [(name, attempt(model)) for name, model in models]
+
+    def _route(self, question: str, trace: dict[str, float]) -> str | None:
+        """Returns the knowledge base entry that answers a lookup question, if any.
+
+        Questions about the boiler's current condition are left to the model,
+        which sees the live readings.
+        """
+        router = self._snapshot.router
+        if router is None:
+            return None
+        with self._timings.measure("router", trace):
+            match = router.match(question)
+        if match is None:
+            return None
+        if self._live_context is not None and self._live_context.select(question):
+            return None
+        self.llm_calls_avoided += 1
+        logger.info(
+            "Answered locally from '%s' (confidence %.2f).",
+            match.route.title,
+            match.confidence,
+        )
+        return match.route.answer
+
+    def _lookup(
+        self,
+        question: str,
+        live_readings: str,
+        history: str,
+        trace: dict[str, float],
+    ) -> str | None:
+        """Returns a cached answer to the question or, failing that, to a similar one.
+
+        Answers based on live readings or on a conversation are only reused for
+        identical ones, so they are never looked up by similarity.
+        """
+        with self._timings.measure("cache", trace):
+            cached = self._cache.get(_cache_key(question, live_readings, history))
+        if cached is not None:
+            logger.info("Answer served from cache.")
+            return cached
+        if self._semantic_cache is None or live_readings or history:
+            return None
+        with self._timings.measure("semantic_cache", trace):
+            cached = self._semantic_cache.get(question)
+        if cached is not None:
+            self.llm_calls_avoided += 1
+            logger.info("Answer served from the semantic cache.")
+        return cached
+
+    def _store(self, question: str, live_readings: str, history: str, answer: str) -> None:
+        """Caches a fresh answer for identical and, without any context, similar questions."""
+        self._cache.put(_cache_key(question, live_readings, history), answer)
+        if self._semantic_cache is not None and not live_readings and not history:
+            self._semantic_cache.put(question, answer)
+
+    def _history(self, chat_id: int | None, question: str) -> str:
+        """Returns the earlier turns of the chat's conversation a question needs.
+
+        A question that stands on its own gets "", so that it shares the answer
+        caches with every other chat.
+        """
+        if self._memory is None or chat_id is None or not refers_back(question):
+            return ""
+        return self._memory.history(chat_id)
+
+    def _remember(self, chat_id: int | None, question: str, answer: str) -> None:
+        """Adds a genuine answer to the chat's conversation."""
+        if self._memory is not None and chat_id is not None:
+            self._memory.record(chat_id, question, answer)
+
+    async def _load_documents(self, question: str, history: str, trace: dict[str, float]) -> None:
+        """Loads the corpus documents a question needs in a worker thread.
+
+        Mapping and indexing a large document takes a while, so it is kept off
+        the event loop; the router and the prompt then find the documents loaded.
+        """
+        corpus = self._snapshot.corpus
+        if corpus is None:
+            return
+        queries = [question, f"{history}\n{question}"] if history else [question]
+        if all(corpus.is_loaded(query) for query in queries):
+            return
+        with self._timings.measure("documents", trace):
+            for query in queries:
+                await asyncio.to_thread(corpus.load, query)
+
+    async def _fetch_live_readings(self, question: str, trace: dict[str, float]) -> str:
+        """Returns the live readings relevant to a question, or "" if there are none."""
+        if self._live_context is None:
+            return ""
+        with self._timings.measure("live_context", trace):
+            return await self._live_context.fetch(question)
+
+    def _log_trace(self, trace: dict[str, float]) -> None:
+        """Logs the per-stage timings of one request."""
+        logger.debug(
+            "Stage timings: %s",
+            ", ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in trace.items()),
+        )
+
+    async def _get_gemini_answer(
+        self,
+        question: str,
+        snapshot: KnowledgeSnapshot,
+        priority: Priority = Priority.NORMAL,
+        live_readings: str = "",
+        history: str = "",
+        stats: ResponseStats | None = None,
+    ) -> str | None:
         """Sends a structured prompt to the Gemini API and returns the answer.
 
         This is a private method responsible for the direct interaction with the AI model.
 
         Args:
             question: The user's question.
+            snapshot: The knowledge base version to answer from.
+            priority: The scheduling class of the call.
+            live_readings: Current device states to include in the prompt.
+            history: The earlier turns of the conversation to include in the prompt.
+            stats: Receives the size of the prompt, if given.
 
         Returns:
-            The generated answer from the Gemini API.
+            The generated answer from the Gemini API, or None if the response has no text.
+        """
+        await self._keep_context_cache_alive(snapshot)
+        prompt = self._build_prompt(question, snapshot, live_readings, history)
+        tokens = estimate_tokens(prompt)
+        PROMPT_TOKENS.set(tokens)
+        if stats is not None:
+            stats.prompt_tokens = tokens
+        async with self._scheduler.slot(priority, cost=tokens):
+            with GEMINI_SECONDS.time(("complete",)):
+                response = await self._hedger.race(
+                    self._attempts(snapshot, lambda model: model.generate_content_async(prompt)),
+                )
+        text = getattr(response, "text", None)
+        return None if text is None else str(text)
+
+    async def _answer_and_cache(
+        self,
+        question: str,
+        snapshot: KnowledgeSnapshot,
+        priority: Priority,
+        live_readings: str = "",
+        history: str = "",
+        stats: ResponseStats | None = None,
+    ) -> str | None:
+        """Asks Gemini and caches the answer.
+
+        Only genuine answers are cached, so a transient failure is retried next time.
+        Answers from a knowledge base version that was replaced meanwhile are not
+        cached either.
         """
-        prompt = textwrap.dedent(f"""
-            You are a helpful and polite expert assistant for the Viessmann Vitodens 111-F gas
-            boiler. Your task is to answer user questions based ONLY on the technical
-            information provided below. If the answer cannot be found in the provided text,
-            you must clearly state that you do not have that information.
-            Do not invent any information. Answer in the same language as the user's question.
+        answer = await self._get_gemini_answer(
+            question, snapshot, priority, live_readings, history, stats
+        )
+        if answer is not None and snapshot is self._snapshot:
+            self._store(question, live_readings, history, answer)
+        return answer
+
+    async def get_response(
+        self,
+        user_input: str,
+        priority: Priority = Priority.NORMAL,
+        *,
+        chat_id: int | None = None,
+        stats: ResponseStats | None = None,
+    ) -> str:
+        """Processes the user's input and returns a response.
 
-            --- Knowledge Base Start ---
-            {self._knowledge_base}
-            --- Knowledge Base End ---
+        This is the main public entry point for the engine. Lookup questions the
+        intent router can answer with confidence are answered without Gemini.
 
-            User Question: "{question}"
-            """).strip()
+        Args:
+            user_input: The text message from the user.
+            priority: The scheduling class if a Gemini call is needed.
+            chat_id: The chat the message belongs to. With conversation memory
+                enabled, the chat's earlier turns are sent along with a question
+                that refers back to them.
+            stats: Receives where the answer came from, the prompt size and
+                the stage timings, if given.
 
+        Returns:
+            A string containing the bot's response.
+        """
+        logger.debug("Engine received input: %r", user_text(user_input))
+        if stats is None:
+            stats = ResponseStats()
+        trace = stats.stages
+        history = self._history(chat_id, user_input)
+        await self._load_documents(user_input, history, trace)
+        routed = self._route(user_input, trace)
+        if routed is not None:
+            stats.source = "router"
+            self._log_trace(trace)
+            self._remember(chat_id, user_input, routed)
+            return routed
+        live_readings = await self._fetch_live_readings(user_input, trace)
+        cached = self._lookup(user_input, live_readings, history, trace)
+        if cached is not None:
+            stats.source = "cache"
+            self._log_trace(trace)
+            self._remember(chat_id, user_input, cached)
+            return cached
+
+        snapshot = self._snapshot
+        flight_key = normalize_question(_cache_key(user_input, live_readings, history))
         try:
-            response = await self._model.generate_content_async(prompt)
-            text = getattr(response, "text", None)
-            if text is None:
-                return (
-                    "Sorry, I couldn't generate a response at this time. Please try again later."
+            with self._timings.measure("model", trace):
+                answer = await self._flights.do(
+                    (snapshot.prefix.fingerprint, flight_key),
+                    lambda: self._answer_and_cache(
+                        user_input, snapshot, priority, live_readings, history, stats
+                    ),
                 )
-            return str(text)
+        except QueueFullError:
+            stats.source = "busy"
+            logger.warning("Gemini call queue is full, shedding the request.")
+            return BUSY_MESSAGE
         except Exception as e:
+            stats.source = "error"
+            ERRORS.inc(labels=("gemini",))
             logger.error(f"An error occurred with the Gemini API: {e}")
-            return (
-                "Sorry, I encountered an error while processing your request. "
-                "Please try again later."
-            )
+            return ERROR_MESSAGE
+        stats.source = "model"
+        self._log_trace(trace)
+        if answer is None:
+            return NO_RESPONSE_MESSAGE
+        self._remember(chat_id, user_input, answer)
+        return answer
 
-    async def get_response(self, user_input: str) -> str:
-        """Processes the user's input and returns a response.
+    async def stream_response(
+        self,
+        user_input: str,
+        priority: Priority = Priority.NORMAL,
+        *,
+        chat_id: int | None = None,
+    ) -> AsyncIterator[str]:
+        """Processes the user's input and yields the response as it is generated.
 
-        This is the main public entry point for the engine.
+        Cached and locally routed answers are yielded in one piece. Errors are reported as a final
+        chunk with the same polite message as ``get_response`` uses. The stream
+        holds a scheduler slot until it ends; only starting it is retried. An
+        identical question asked while one is being answered waits for that
+        answer and gets it in one piece, instead of starting another stream.
 
         Args:
             user_input: The text message from the user.
+            priority: The scheduling class if a Gemini call is needed.
+            chat_id: The chat the message belongs to, as in ``get_response``.
 
-        Returns:
-            A string containing the bot's response.
+        Yields:
+            Consecutive pieces of the bot's response.
         """
-        logger.info(f"Engine received input: '{user_input}'")
-        return await self._get_gemini_answer(user_input)
+        logger.debug("Engine received input for streaming: %r", user_text(user_input))
+        trace: dict[str, float] = {}
+        history = self._history(chat_id, user_input)
+        await self._load_documents(user_input, history, trace)
+        routed = self._route(user_input, trace)
+        if routed is not None:
+            self._log_trace(trace)
+            self._remember(chat_id, user_input, routed)
+            yield routed
+            return
+        live_readings = await self._fetch_live_readings(user_input, trace)
+        cached = self._lookup(user_input, live_readings, history, trace)
+        if cached is not None:
+            self._log_trace(trace)
+            self._remember(chat_id, user_input, cached)
+            yield cached
+            return
+
+        snapshot = self._snapshot
+        flight_key = (
+            snapshot.prefix.fingerprint,
+            normalize_question(_cache_key(user_input, live_readings, history)),
+        )
+        shared = self._flights.join(flight_key)
+        if shared is not None:
+            # The same question is being answered; wait for the whole answer.
+            async for chunk in self._follow(shared, chat_id, user_input, trace):
+                yield chunk
+            return
+
+        flight = self._flights.start(flight_key)
+        try:
+            async for chunk in self._stream_and_cache(
+                user_input, snapshot, priority, live_readings, history, chat_id, trace, flight
+            ):
+                yield chunk
+        finally:
+            if not flight.done():
+                # The consumer stopped reading, so the answer will not be complete.
+                flight.set_exception(RuntimeError("The streamed answer was abandoned."))
+
+    async def _follow(
+        self,
+        shared: Awaitable[str | None],
+        chat_id: int | None,
+        user_input: str,
+        trace: dict[str, float],
+    ) -> AsyncIterator[str]:
+        """Yields, in one piece, the answer of an identical question being streamed or asked."""
+        try:
+            with self._timings.measure("model", trace):
+                answer = await shared
+        except QueueFullError:
+            yield BUSY_MESSAGE
+            return
+        except Exception:
+            yield ERROR_MESSAGE
+            return
+        self._log_trace(trace)
+        if answer is None:
+            yield NO_RESPONSE_MESSAGE
+            return
+        self._remember(chat_id, user_input, answer)
+        yield answer
+
+    async def _stream_and_cache(
+        self,
+        user_input: str,
+        snapshot: KnowledgeSnapshot,
+        priority: Priority,
+        live_readings: str,
+        history: str,
+        chat_id: int | None,
+        trace: dict[str, float],
+        flight: asyncio.Future[str | None],
+    ) -> AsyncIterator[str]:
+        """Streams Gemini's answer, caches it and shares it with identical questions.
+
+        The answer, or the error, is set on ``flight`` for the callers waiting for it.
+        """
+        parts: list[str] = []
+        started = time.perf_counter()
+        try:
+            await self._keep_context_cache_alive(snapshot)
+            prompt = self._build_prompt(user_input, snapshot, live_readings, history)
+            tokens = estimate_tokens(prompt)
+            PROMPT_TOKENS.set(tokens)
+
+            async def open_stream(model: Any) -> AsyncIterator[Any]:
+                # Hedging races the streams to their first chunk.
+                chunks = aiter(await model.generate_content_async(prompt, stream=True))
+                return _resumed(await anext(chunks, _END), chunks)
+
+            async with self._scheduler.slot(priority, cost=tokens):
+                called = time.perf_counter()
+                response = await self._hedger.race(
+                    self._attempts(snapshot, open_stream), mode="stream"
+                )
+                async for chunk in response:
+                    text = _chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+                GEMINI_SECONDS.observe(time.perf_counter() - called, ("stream",))
+        except QueueFullError as e:
+            logger.warning("Gemini call queue is full, shedding the request.")
+            flight.set_exception(e)
+            yield BUSY_MESSAGE
+            return
+        except Exception as e:
+            ERRORS.inc(labels=("gemini",))
+            logger.error(f"An error occurred with the Gemini API: {e}")
+            flight.set_exception(e)
+            yield f"\n\n{ERROR_MESSAGE}" if parts else ERROR_MESSAGE
+            return
+
+        # Time spent by the consumer between chunks counts as model time here.
+        trace["model"] = time.perf_counter() - started
+        self._timings.record("model", trace["model"])
+        self._log_trace(trace)
+        if not parts:
+            flight.set_result(None)
+            yield NO_RESPONSE_MESSAGE
+            return
+        answer = "".join(parts)
+        self._remember(chat_id, user_input, answer)
+        if snapshot is self._snapshot:
+            self._store(user_input, live_readings, history, answer)
+        flight.set_result(answer)
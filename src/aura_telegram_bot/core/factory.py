@@ -0,0 +1,79 @@
+"""Builds a fully configured AuraEngine from the application settings."""
+
+from __future__ import annotations
+
+from aura_telegram_bot.config import Settings
+from aura_telegram_bot.core.cache import AnswerCache
+from aura_telegram_bot.core.engine import AuraEngine
+from aura_telegram_bot.core.hedging import Hedger
+from aura_telegram_bot.core.memory import ConversationMemory
+from aura_telegram_bot.core.scheduler import RequestScheduler
+
+
+def create_engine(settings: Settings) -> AuraEngine:
+    """Creates an AuraEngine wired up according to the settings.
+
+    This keeps the Telegram bot and the CLI configured identically.
+
+    Args:
+        settings: The application settings.
+
+    Returns:
+        A ready-to-use engine.
+    """
+    knowledge_base = settings.load_knowledge_base()
+    answer_cache = AnswerCache(
+        max_entries=settings.answer_cache_size,
+        ttl=settings.answer_cache_ttl_seconds,
+        path=settings.answer_cache_path,
+    )
+    semantic_cache = None
+    if settings.semantic_cache_enabled:
+        # NumPy is an optional dependency, so it is only imported when needed.
+        from aura_telegram_bot.core.semantic_cache import SemanticCache
+
+        semantic_cache = SemanticCache(
+            max_entries=settings.semantic_cache_size,
+            threshold=settings.semantic_cache_threshold,
+            ttl=settings.answer_cache_ttl_seconds,
+        )
+    conversation_memory = None
+    if settings.conversation_memory_turns:
+        conversation_memory = ConversationMemory(
+            max_turns=settings.conversation_memory_turns,
+            token_budget=settings.conversation_memory_token_budget,
+            idle_ttl=settings.conversation_idle_seconds,
+            max_chats=settings.conversation_max_chats,
+            path=settings.conversation_memory_path,
+        )
+    scheduler = RequestScheduler(
+        max_concurrency=settings.gemini_max_concurrency,
+        max_queue=settings.gemini_max_queue,
+        requests_per_minute=settings.gemini_requests_per_minute or None,
+        burst=settings.gemini_burst,
+        max_retries=settings.gemini_max_retries,
+    )
+    hedger = Hedger(
+        quantile=settings.gemini_hedge_quantile,
+        initial_delay=settings.gemini_hedge_initial_delay_seconds,
+        min_delay=settings.gemini_hedge_min_delay_seconds,
+    )
+    return AuraEngine(
+        gemini_api_key=settings.gemini_api_key,
+        knowledge_base=knowledge_base,
+        top_k=settings.retrieval_top_k,
+        token_budget=settings.retrieval_token_budget,
+        answer_cache=answer_cache,
+        model_name=settings.gemini_model,
+        fallback_models=settings.gemini_fallback_models,
+        hedger=hedger,
+        context_cache_ttl=(
+            settings.gemini_context_cache_ttl_seconds if settings.gemini_context_cache else None
+        ),
+        scheduler=scheduler,
+        intent_threshold=(
+            settings.intent_router_threshold if settings.intent_router_enabled else None
+        ),
+        semantic_cache=semantic_cache,
+        conversation_memory=conversation_memory,
+    )
@@ -0,0 +1,194 @@
+"""Hedged upstream calls for a shorter latency tail.
+
+A call goes to the primary model first. If it has not answered by a deadline
+derived from the primary's recent latency (its 95th percentile by default),
+the same request is sent to the next model of the chain; the first answer
+wins and the other calls are cancelled. A failed call hands over to the next
+model right away, so the chain doubles as a fallback.
+
+Deadlines adapt as each model's latency window fills. Until a model has
+enough samples, a fixed initial delay is used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+
+from aura_telegram_bot.metrics import MODEL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# One attempt of a hedged call: the model's name and a function that starts the call.
+type Attempt[T] = tuple[str, Callable[[], Awaitable[T]]]
+
+
+class LatencyWindow:
+    """The most recent latencies of one model, for percentile estimates."""
+
+    __slots__ = ("_samples",)
+
+    def __init__(self, size: int = 200) -> None:
+        """Initializes an empty window.
+
+        Args:
+            size: How many of the latest samples are kept.
+        """
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Returns the number of samples in the window."""
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        """Adds a latency, pushing out the oldest one if the window is full."""
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        """Returns the nearest-rank ``q`` quantile of the samples, or 0 if there are none."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class Hedger:
+    """Races a chain of models, starting each one when the previous is late or fails."""
+
+    def __init__(
+        self,
+        *,
+        quantile: float = 0.95,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.25,
+        min_samples: int = 20,
+        window: int = 200,
+    ) -> None:
+        """Initializes the hedger.
+
+        Args:
+            quantile: The latency quantile of a model after which the next one is started.
+            initial_delay: The delay used while a model has too few samples, in seconds.
+            min_delay: The lower bound of a derived delay, so that a model that
+                is fast for a while does not trigger a hedge for every call.
+            min_samples: How many latencies a model needs before its own delay is used.
+            window: How many recent latencies are kept per model and mode.
+        """
+        self._quantile = quantile
+        self._initial_delay = initial_delay
+        self._min_delay = min_delay
+        self._min_samples = min_samples
+        self._window = window
+        self._latencies: dict[tuple[str, str], LatencyWindow] = {}
+        self.calls = 0
+        self.hedges = 0
+        self.fallbacks = 0
+        self.hedge_wins = 0
+
+    def latencies(self, model: str, mode: str = "complete") -> LatencyWindow:
+        """Returns the latency window of a model in one mode, e.g. "complete" or "stream"."""
+        key = (model, mode)
+        window = self._latencies.get(key)
+        if window is None:
+            window = self._latencies[key] = LatencyWindow(self._window)
+        return window
+
+    def delay(self, model: str, mode: str = "complete") -> float:
+        """Returns how long to wait for a model before starting the next one, in seconds."""
+        window = self.latencies(model, mode)
+        if len(window) < self._min_samples:
+            return self._initial_delay
+        return max(self._min_delay, window.quantile(self._quantile))
+
+    async def _timed[T](self, model: str, mode: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Runs one attempt, recording its latency if it succeeds or is cut short."""
+        started = time.perf_counter()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            # The loser's latency is at least this long; recording it keeps the
+            # slow tail in the window, which would otherwise only see winners.
+            self.latencies(model, mode).observe(time.perf_counter() - started)
+            raise
+        seconds = time.perf_counter() - started
+        self.latencies(model, mode).observe(seconds)
+        MODEL_SECONDS.observe(seconds, (model, mode))
+        return result
+
+    async def race[T](self, attempts: Sequence[Attempt[T]], mode: str = "complete") -> T:
+        """Returns the first successful result of a chain of attempts.
+
+        The first attempt starts at once. Each further attempt starts when the
+        one before it has outlived its delay or has failed. Once one succeeds,
+        the others are cancelled.
+
+        Args:
+            attempts: The models to try, primary first.
+            mode: Which latency distribution the attempts belong to.
+
+        Returns:
+            The result of the first attempt to succeed.
+
+        Raises:
+            Exception: The first error, if every attempt fails.
+        """
+        self.calls += 1
+        if len(attempts) == 1:
+            model, func = attempts[0]
+            return await self._timed(model, mode, func)
+
+        loop = asyncio.get_running_loop()
+        running: dict[asyncio.Task[T], int] = {}
+        errors: list[BaseException] = []
+        started = 0
+        hedge_at = 0.0
+
+        def start_next() -> None:
+            nonlocal started, hedge_at
+            model, func = attempts[started]
+            running[asyncio.create_task(self._timed(model, mode, func))] = started
+            hedge_at = loop.time() + self.delay(model, mode)
+            started += 1
+
+        start_next()
+        try:
+            while running:
+                timeout = None
+                if started < len(attempts):
+                    timeout = max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self.hedges += 1
+                    logger.info(
+                        "%s is late, also asking %s.",
+                        attempts[started - 1][0],
+                        attempts[started][0],
+                    )
+                    start_next()
+                    continue
+                for task in done:
+                    index = running.pop(task)
+                    if task.exception() is None:
+                        if index:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append(task.exception())
+                if not running and started < len(attempts):
+                    self.fallbacks += 1
+                    logger.warning(
+                        "%s failed (%s), falling back to %s.",
+                        attempts[started - 1][0],
+                        errors[-1],
+                        attempts[started][0],
+                    )
+                    start_next()
+            raise errors[0]
+        finally:
+            for task in running:
+                task.cancel()
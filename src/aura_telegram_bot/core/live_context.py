@@ -0,0 +1,152 @@
+"""Live device readings from Home Assistant, injected into prompts.
+
+Questions about the boiler's current condition ("what is the pressure now?")
+need live sensor values that the static knowledge base cannot provide. The
+provider picks the entities relevant to a question by keyword, fetches their
+states within a strict latency budget, and renders them as a few compact
+lines. When the budget is exceeded or Home Assistant fails, the question is
+answered without live data rather than late.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, Protocol
+
+from aura_telegram_bot.core.retrieval import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class StateSource(Protocol):
+    """Anything that returns entity states in bulk, e.g. the REST client or the mirror."""
+
+    async def get_states(self, entity_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Returns the states of the entities, omitting unknown ones."""
+        ...
+
+
+class FallbackStateSource:
+    """Reads from a primary source, falling back to a second one if it fails.
+
+    Typically the primary is the in-memory WebSocket mirror and the fallback
+    is the REST client, used while the mirror is out of sync.
+    """
+
+    def __init__(self, primary: StateSource, fallback: StateSource) -> None:
+        """Initializes the source.
+
+        Args:
+            primary: The source tried first.
+            fallback: The source used when the primary raises.
+        """
+        self._primary = primary
+        self._fallback = fallback
+        self.fallbacks = 0
+
+    async def get_states(self, entity_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Returns the states from the primary source, or from the fallback."""
+        entity_ids = list(entity_ids)
+        try:
+            return await self._primary.get_states(entity_ids)
+        except Exception as e:
+            self.fallbacks += 1
+            logger.debug("Primary state source failed (%s), using the fallback.", e)
+            return await self._fallback.get_states(entity_ids)
+
+
+def format_states(states: Mapping[str, Mapping[str, Any]]) -> str:
+    """Renders entity states as one short line each, e.g. "- Boiler pressure: 1.5 bar"."""
+    lines = []
+    for entity_id, state in states.items():
+        attributes = state.get("attributes") or {}
+        name = attributes.get("friendly_name") or entity_id
+        unit = attributes.get("unit_of_measurement")
+        value = state.get("state")
+        lines.append(f"- {name}: {value} {unit}" if unit else f"- {name}: {value}")
+    return "\n".join(lines)
+
+
+class LiveContextProvider:
+    """Selects and fetches the live entity states relevant to a question."""
+
+    def __init__(
+        self,
+        source: StateSource,
+        entities: Mapping[str, Iterable[str]],
+        *,
+        budget: float = 0.3,
+        max_entities: int = 12,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Initializes the provider.
+
+        Args:
+            source: Where entity states are read from.
+            entities: The keywords that make each entity relevant, by entity ID.
+                An entity without keywords is relevant to every question that
+                selects at least one other entity.
+            budget: The maximum time to wait for the states, in seconds.
+            max_entities: The maximum number of entities per question.
+            clock: The monotonic time source.
+        """
+        self._source = source
+        self._keywords = {
+            entity_id: frozenset(token for keyword in keywords for token in tokenize(keyword))
+            for entity_id, keywords in entities.items()
+        }
+        self._budget = budget
+        self._max_entities = max_entities
+        self._clock = clock
+        self.fetches = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def select(self, question: str) -> list[str]:
+        """Returns the entities relevant to a question, most keyword matches first."""
+        words = set(tokenize(question))
+        matches = {
+            entity_id: len(keywords & words)
+            for entity_id, keywords in self._keywords.items()
+            if keywords & words
+        }
+        if not matches:
+            return []
+        selected = sorted(matches, key=matches.__getitem__, reverse=True)
+        selected += [entity_id for entity_id, keywords in self._keywords.items() if not keywords]
+        return selected[: self._max_entities]
+
+    async def fetch(self, question: str) -> str:
+        """Returns the relevant live states as prompt text, or "" if none are available.
+
+        Never raises and never takes much longer than the budget: a slow or
+        failing state source only costs the live readings, not the answer.
+        """
+        entity_ids = self.select(question)
+        if not entity_ids:
+            return ""
+        self.fetches += 1
+        started = self._clock()
+        try:
+            async with asyncio.timeout(self._budget):
+                states = await self._source.get_states(entity_ids)
+        except TimeoutError:
+            self.timeouts += 1
+            logger.warning(
+                "Home Assistant did not answer within %.0f ms; answering without live data.",
+                self._budget * 1000,
+            )
+            return ""
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Failed to read live states, answering without them: {e}")
+            return ""
+        logger.debug(
+            "Fetched %d live states in %.1f ms.",
+            len(states),
+            (self._clock() - started) * 1000,
+        )
+        return format_states(states)
@@ -0,0 +1,252 @@
+"""Per-chat conversation memory, so that follow-up questions can be answered.
+
+Each chat keeps its most recent turns in a small ring buffer. The turns sent
+with a question are bounded by a token budget: when it is exceeded, the
+oldest turns are dropped and only their questions are kept, in a short
+summary. Chats that stay idle are evicted, and the number of chats kept is
+capped, so memory stays flat no matter how many chats the bot has seen.
+Conversations can optionally be persisted to SQLite across restarts.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from contextlib import closing
+from pathlib import Path
+
+from aura_telegram_bot.core.retrieval import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_SUMMARY_PREFIX = "Earlier questions: "
+_SUMMARY_SEPARATOR = "; "
+_WORD_RE = re.compile(r"\w+")
+# Words that point back at earlier turns, as in "and how do I fix it?".
+_REFERRING_WORDS = frozenset(
+    "it its this that these those they them their he she him her one ones "
+    "same other else also again more then previous above earlier before".split()
+)
+# Openings that continue the conversation, as in "and the filter?" or "why not?".
+_CONTINUING_WORDS = frozenset("and but so or also why".split())
+_CONTINUING_PHRASES = frozenset({("what", "about"), ("how", "about")})
+# Questions this short are follow-ups more often than not.
+_MIN_STANDALONE_WORDS = 3
+
+
+def refers_back(question: str) -> bool:
+    """Tells whether a question may need the earlier turns of the conversation.
+
+    Questions that stand on their own are answered without the history, so
+    that their answers can be cached and shared across chats.
+    """
+    words = _WORD_RE.findall(question.casefold())
+    if len(words) < _MIN_STANDALONE_WORDS:
+        return True
+    return (
+        words[0] in _CONTINUING_WORDS
+        or tuple(words[:2]) in _CONTINUING_PHRASES
+        or not _REFERRING_WORDS.isdisjoint(words)
+    )
+
+
+class Turn:
+    """One question and its answer."""
+
+    __slots__ = ("answer", "question", "tokens")
+
+    def __init__(self, question: str, answer: str) -> None:
+        """Initializes the turn and estimates its size in tokens."""
+        self.question = question
+        self.answer = answer
+        self.tokens = estimate_tokens(question) + estimate_tokens(answer)
+
+
+class _Conversation:
+    """The remembered turns of one chat."""
+
+    __slots__ = ("last_active", "summary", "tokens", "turns")
+
+    def __init__(self, max_turns: int, last_active: float) -> None:
+        """Initializes an empty conversation."""
+        self.turns: deque[Turn] = deque(maxlen=max_turns)
+        self.summary = ""
+        self.tokens = 0
+        self.last_active = last_active
+
+
+class ConversationMemory:
+    """Bounded, token-budgeted conversation histories keyed by chat.
+
+    Conversations are kept in least recently active order, so idle ones are
+    evicted from the front in amortized constant time on every access.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_turns: int = 6,
+        token_budget: int = 800,
+        idle_ttl: float = 30 * 60,
+        max_chats: int = 1000,
+        path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initializes the memory, loading persisted conversations if a path is given.
+
+        Args:
+            max_turns: The maximum number of turns remembered per chat.
+            token_budget: The maximum estimated tokens of history sent with a
+                question, including the summary of dropped turns.
+            idle_ttl: How long a chat is remembered after its last message, in seconds.
+            max_chats: The maximum number of chats remembered at once; the least
+                recently active chat is forgotten first.
+            path: An optional SQLite database used to persist conversations across restarts.
+            clock: The wall-clock time source, in seconds since the epoch.
+        """
+        self._max_turns = max_turns
+        self._token_budget = token_budget
+        # Questions of dropped turns may take up at most a quarter of the budget.
+        self._summary_budget = token_budget // 4
+        self._idle_ttl = idle_ttl
+        self._max_chats = max_chats
+        self._path = path
+        self._clock = clock
+        self._chats: OrderedDict[int, _Conversation] = OrderedDict()
+        self.evicted = 0
+        if path is not None:
+            self._load(path)
+
+    def __len__(self) -> int:
+        """Returns the number of chats remembered."""
+        return len(self._chats)
+
+    def history(self, chat_id: int) -> str:
+        """Returns the chat's earlier turns rendered for a prompt, or "" if there are none."""
+        self._evict_idle()
+        conversation = self._chats.get(chat_id)
+        if conversation is None:
+            return ""
+        lines = [conversation.summary] if conversation.summary else []
+        for turn in conversation.turns:
+            lines.append(f"User: {turn.question}")
+            lines.append(f"Assistant: {turn.answer}")
+        return "\n".join(lines)
+
+    def record(self, chat_id: int, question: str, answer: str) -> None:
+        """Remembers a turn, dropping the oldest ones that no longer fit the budget."""
+        now = self._clock()
+        self._evict_idle(now)
+        conversation = self._chats.get(chat_id)
+        if conversation is None:
+            conversation = _Conversation(self._max_turns, now)
+            self._chats[chat_id] = conversation
+            while len(self._chats) > self._max_chats:
+                self._chats.popitem(last=False)
+                self.evicted += 1
+        else:
+            self._chats.move_to_end(chat_id)
+            conversation.last_active = now
+        if len(conversation.turns) == self._max_turns:
+            self._drop_oldest(conversation)
+        turn = Turn(question, answer)
+        conversation.turns.append(turn)
+        conversation.tokens += turn.tokens
+        while conversation.turns and (
+            conversation.tokens + estimate_tokens(conversation.summary) > self._token_budget
+        ):
+            self._drop_oldest(conversation)
+
+    def forget(self, chat_id: int) -> None:
+        """Forgets a chat's conversation, e.g. when the user starts over."""
+        self._chats.pop(chat_id, None)
+
+    def _drop_oldest(self, conversation: _Conversation) -> None:
+        """Drops the oldest turn, keeping its question in the summary."""
+        turn = conversation.turns.popleft()
+        conversation.tokens -= turn.tokens
+        earlier = conversation.summary.removeprefix(_SUMMARY_PREFIX)
+        questions = f"{earlier}{_SUMMARY_SEPARATOR}{turn.question}" if earlier else turn.question
+        # Forget the oldest questions first once the summary outgrows its budget.
+        while questions and estimate_tokens(_SUMMARY_PREFIX + questions) > self._summary_budget:
+            _, _, questions = questions.partition(_SUMMARY_SEPARATOR)
+        conversation.summary = f"{_SUMMARY_PREFIX}{questions}" if questions else ""
+
+    def _evict_idle(self, now: float | None = None) -> None:
+        """Forgets the chats that have been idle for longer than the TTL."""
+        deadline = (self._clock() if now is None else now) - self._idle_ttl
+        while self._chats:
+            chat_id, conversation = next(iter(self._chats.items()))
+            if conversation.last_active > deadline:
+                break
+            del self._chats[chat_id]
+            self.evicted += 1
+
+    def save(self) -> None:
+        """Writes the conversations to the persistence database, if configured."""
+        if self._path is None:
+            return
+        self._evict_idle()
+        rows = [
+            (
+                chat_id,
+                conversation.summary,
+                json.dumps(
+                    [[turn.question, turn.answer] for turn in conversation.turns],
+                    ensure_ascii=False,
+                ),
+                conversation.last_active,
+            )
+            for chat_id, conversation in self._chats.items()
+        ]
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(self._path)) as connection, connection:
+                _create_table(connection)
+                connection.execute("DELETE FROM conversations")
+                connection.executemany("INSERT INTO conversations VALUES (?, ?, ?, ?)", rows)
+        except (OSError, sqlite3.Error):
+            logger.exception("Failed to save conversations to '%s'.", self._path)
+            return
+        logger.info("Saved %d conversations to '%s'.", len(rows), self._path)
+
+    def _load(self, path: Path) -> None:
+        """Loads persisted conversations; a missing or corrupt database leaves the memory empty."""
+        if not path.exists():
+            return
+        deadline = self._clock() - self._idle_ttl
+        try:
+            with closing(sqlite3.connect(path)) as connection:
+                _create_table(connection)
+                rows = connection.execute(
+                    "SELECT chat_id, summary, turns, last_active FROM conversations "
+                    "WHERE last_active > ? ORDER BY last_active DESC LIMIT ?",
+                    (deadline, self._max_chats),
+                ).fetchall()
+            for chat_id, summary, turns, last_active in reversed(rows):
+                conversation = _Conversation(self._max_turns, last_active)
+                conversation.summary = summary
+                for question, answer in json.loads(turns)[-self._max_turns :]:
+                    turn = Turn(question, answer)
+                    conversation.turns.append(turn)
+                    conversation.tokens += turn.tokens
+                self._chats[chat_id] = conversation
+        except (OSError, sqlite3.Error, ValueError, TypeError):
+            logger.warning("Ignoring unreadable conversation database '%s'.", path)
+            self._chats.clear()
+            return
+        logger.info("Loaded %d conversations from '%s'.", len(self), path)
+
+
+def _create_table(connection: sqlite3.Connection) -> None:
+    """Creates the conversations table if it does not exist yet."""
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS conversations ("
+        "chat_id INTEGER PRIMARY KEY, summary TEXT NOT NULL, "
+        "turns TEXT NOT NULL, last_active REAL NOT NULL)",
+    )
@@ -0,0 +1,135 @@
+"""Prompt construction for the Gemini model.
+
+Everything that does not depend on the question (the assistant's rules and,
+when it is small enough, the whole knowledge base) is assembled once into a
+system instruction. Each request then only renders the question, plus the
+retrieved sections when the knowledge base is too large to send in full.
+"""
+
+from __future__ import annotations
+
+import textwrap
+from dataclasses import dataclass
+
+from aura_telegram_bot.core.cache import fingerprint
+from aura_telegram_bot.core.corpus import Corpus
+from aura_telegram_bot.core.retrieval import KnowledgeIndex
+
+SYSTEM_INSTRUCTION = textwrap.dedent("""
+    You are a helpful and polite expert assistant for the Viessmann Vitodens 111-F gas
+    boiler. Your task is to answer user questions based ONLY on the technical
+    information provided in the knowledge base. If the answer cannot be found in the
+    provided text, you must clearly state that you do not have that information.
+    Do not invent any information. Answer in the same language as the user's question.
+    Live readings from the boiler's sensors may accompany a question; use them to
+    describe the boiler's current condition. The conversation so far may accompany a
+    question; use it to understand follow-up questions.
+    """).strip()
+
+_KNOWLEDGE_BASE_TEMPLATE = "--- Knowledge Base Start ---\n{}\n--- Knowledge Base End ---"
+_LIVE_READINGS_TEMPLATE = "--- Live Readings Start ---\n{}\n--- Live Readings End ---"
+_HISTORY_TEMPLATE = "--- Conversation Start ---\n{}\n--- Conversation End ---"
+_QUESTION_TEMPLATE = 'User Question: "{}"'
+
+
+def wrap_knowledge_base(text: str) -> str:
+    """Wraps knowledge base text in the markers the system instruction refers to."""
+    return _KNOWLEDGE_BASE_TEMPLATE.format(text.strip())
+
+
+@dataclass(frozen=True, slots=True)
+class PromptPrefix:
+    """The static part of every prompt, built once per knowledge base version.
+
+    Attributes:
+        system_instruction: The instruction to configure the model with.
+        index: The retrieval index over the knowledge base, or the corpus of
+            documents that is searched for each question.
+        fingerprint: A hash identifying the knowledge base version.
+        inline: Whether the whole knowledge base is already part of the model's
+            prefix, so requests only need to carry the question.
+    """
+
+    system_instruction: str
+    index: KnowledgeIndex | Corpus
+    fingerprint: str
+    inline: bool
+
+    @classmethod
+    def build(
+        cls,
+        knowledge_base: str,
+        *,
+        token_budget: int,
+        inline: bool | None = None,
+    ) -> PromptPrefix:
+        """Builds the prefix for a knowledge base.
+
+        By default, a knowledge base that fits into the token budget is embedded
+        in the system instruction; a larger one is left to per-question retrieval.
+
+        Args:
+            knowledge_base: The text content of the knowledge base.
+            token_budget: The maximum estimated tokens of knowledge base text per question.
+            inline: Forces the knowledge base into (True) or out of (False) the
+                system instruction, regardless of its size.
+
+        Returns:
+            The prefix for this knowledge base version.
+        """
+        index = KnowledgeIndex.from_text(knowledge_base)
+        if inline is None:
+            inline = index.total_tokens <= token_budget
+        system_instruction = SYSTEM_INSTRUCTION
+        if inline:
+            system_instruction = f"{SYSTEM_INSTRUCTION}\n\n{wrap_knowledge_base(knowledge_base)}"
+        return cls(
+            system_instruction=system_instruction,
+            index=index,
+            fingerprint=fingerprint(knowledge_base),
+            inline=inline,
+        )
+
+    @classmethod
+    def from_corpus(cls, corpus: Corpus) -> PromptPrefix:
+        """Builds the prefix for a corpus of documents, which is always retrieved per question."""
+        return cls(
+            system_instruction=SYSTEM_INSTRUCTION,
+            index=corpus,
+            fingerprint=corpus.fingerprint,
+            inline=False,
+        )
+
+    def render(
+        self,
+        question: str,
+        *,
+        top_k: int,
+        token_budget: int,
+        live_readings: str = "",
+        history: str = "",
+    ) -> str:
+        """Renders the per-request part of the prompt.
+
+        Args:
+            question: The user's question.
+            top_k: The maximum number of knowledge base sections to include.
+            token_budget: The maximum estimated tokens of knowledge base text to include.
+            live_readings: Current device states to include, if any.
+            history: The earlier turns of the conversation, if any.
+
+        Returns:
+            The text to send to the model along with its system instruction.
+        """
+        parts = []
+        if not self.inline:
+            # Follow-up questions ("how do I fix it?") are retrieved along with their context.
+            query = f"{history}\n{question}" if history else question
+            context = self.index.build_context(query, top_k=top_k, token_budget=token_budget)
+            parts.append(wrap_knowledge_base(context))
+        if history:
+            parts.append(_HISTORY_TEMPLATE.format(history))
+        if live_readings:
+            parts.append(_LIVE_READINGS_TEMPLATE.format(live_readings))
+        parts.append(_QUESTION_TEMPLATE.format(question))
+        return "\n\n".join(parts)
@@ -0,0 +1,203 @@
+"""Section-level retrieval over the knowledge base.
+
+The knowledge base is split on its ``##`` headings and indexed once with an
+inverted index. Each question is then scored with BM25 so that only the most
+relevant sections, within a token budget, are sent to the model.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import re
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+# A rough but stable estimate used for budgeting; Gemini averages ~4 chars per token.
+CHARS_PER_TOKEN = 4
+
+_HEADING_RE = re.compile(r"^##\s+(.+?)\s*$", re.MULTILINE)
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of model tokens in a piece of text."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def tokenize(text: str) -> list[str]:
+    """Splits text into lowercase word tokens for indexing and querying."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+@dataclass(frozen=True, slots=True)
+class Section:
+    """A single section of the knowledge base.
+
+    Attributes:
+        title: The heading of the section, or an empty string for the preamble.
+        text: The full text of the section, including its heading line.
+        tokens: The estimated token count of ``text``.
+    """
+
+    title: str
+    text: str
+    tokens: int
+
+
+class Passage(Protocol):
+    """A searchable piece of a knowledge base, held in memory or mapped from a file."""
+
+    @property
+    def title(self) -> str:
+        """The heading of the passage, or an empty string."""
+        ...
+
+    @property
+    def text(self) -> str:
+        """The full text of the passage."""
+        ...
+
+    @property
+    def tokens(self) -> int:
+        """The estimated token count of the text."""
+        ...
+
+
+def split_sections(text: str) -> list[Section]:
+    """Splits the knowledge base into sections on its ``##`` headings.
+
+    Any text before the first heading becomes a preamble section without a title.
+
+    Args:
+        text: The raw knowledge base text.
+
+    Returns:
+        The non-empty sections in document order.
+    """
+    sections: list[Section] = []
+    matches = list(_HEADING_RE.finditer(text))
+    preamble = text[: matches[0].start()] if matches else text
+    if preamble.strip():
+        body = preamble.strip()
+        sections.append(Section(title="", text=body, tokens=estimate_tokens(body)))
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.start() : end].strip()
+        sections.append(Section(title=match.group(1), text=body, tokens=estimate_tokens(body)))
+    return sections
+
+
+class KnowledgeIndex:
+    """An in-memory BM25 index over the sections of a knowledge base."""
+
+    def __init__(self, sections: Sequence[Passage], *, k1: float = 1.5, b: float = 0.75) -> None:
+        """Builds the inverted index.
+
+        Args:
+            sections: The sections to index, in document order. Their text is
+                only read here and when selected, so it may be loaded lazily.
+            k1: The BM25 term-frequency saturation parameter.
+            b: The BM25 length-normalization parameter.
+        """
+        self.sections = sections
+        self.total_tokens = sum(section.tokens for section in sections)
+        self._k1 = k1
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths: list[int] = []
+
+        for doc_id, section in enumerate(sections):
+            # Headings are short but highly descriptive, so they count twice.
+            terms = tokenize(section.text) + tokenize(section.title)
+            self._lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+
+        count = len(sections)
+        # Sections without any terms, e.g. only punctuation, would make the average 0.
+        avg_length = (sum(self._lengths) / count if count else 0.0) or 1.0
+        # The length normalization only depends on the section, so it is computed once.
+        self._norms = [k1 * (1 - b + b * length / avg_length) for length in self._lengths]
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+        logger.info(
+            "Knowledge index built: %d sections, %d terms, ~%d tokens.",
+            count,
+            len(self._postings),
+            self.total_tokens,
+        )
+
+    @classmethod
+    def from_text(cls, text: str) -> KnowledgeIndex:
+        """Builds an index directly from raw knowledge base text."""
+        return cls(split_sections(text))
+
+    def search(self, query: str, top_k: int) -> list[tuple[Passage, float]]:
+        """Returns the ``top_k`` best matching sections for a query.
+
+        Args:
+            query: The user's question.
+            top_k: The maximum number of sections to return.
+
+        Returns:
+            Pairs of (section, score), best first. Sections with no matching
+            terms are never returned.
+        """
+        return [(self.sections[doc_id], score) for doc_id, score in self._rank(query, top_k)]
+
+    def build_context(self, query: str, *, top_k: int, token_budget: int) -> str:
+        """Selects the knowledge base text to send to the model for a query.
+
+        If the whole knowledge base fits into the budget it is returned as-is.
+        Otherwise, the best matching sections are packed greedily into the
+        budget and returned in document order. When nothing matches, the
+        leading sections are used so the model still gets some grounding.
+
+        Args:
+            query: The user's question.
+            top_k: The maximum number of sections to include.
+            token_budget: The maximum estimated number of tokens to include.
+
+        Returns:
+            The selected knowledge base text.
+        """
+        if self.total_tokens <= token_budget:
+            return "\n\n".join(section.text for section in self.sections)
+
+        candidates = [doc_id for doc_id, _ in self._rank(query, top_k)]
+        if not candidates:
+            candidates = list(range(min(top_k, len(self.sections))))
+
+        chosen: list[int] = []
+        remaining = token_budget
+        for doc_id in candidates:
+            if self.sections[doc_id].tokens <= remaining:
+                chosen.append(doc_id)
+                remaining -= self.sections[doc_id].tokens
+        if not chosen and candidates:
+            # Even the best section alone is over budget, so send its beginning.
+            return self.sections[candidates[0]].text[: token_budget * CHARS_PER_TOKEN]
+
+        return "\n\n".join(self.sections[doc_id].text for doc_id in sorted(chosen))
+
+    def _rank(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """Scores all sections matching the query and returns the best ``top_k`` ids."""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            boost = idf * (self._k1 + 1)
+            norms = self._norms
+            for doc_id, tf in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + boost * tf / (tf + norms[doc_id])
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
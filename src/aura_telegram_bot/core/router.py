@@ -0,0 +1,193 @@
+"""A local intent router that answers lookup questions straight from the knowledge base.
+
+Questions like "what is fault F4?" or "how do I change mode?" map to a single
+entry of the knowledge base. The router compiles the fault codes, bold item
+labels and ``##`` headings of the knowledge base into a keyword index once,
+and answers such questions with the matching entry in microseconds, leaving
+everything else to the model.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from aura_telegram_bot.core.retrieval import split_sections, tokenize
+
+logger = logging.getLogger(__name__)
+
+# A top-level list item with a bold label, e.g. "- **Fault Code F2:** This indicates ...".
+_ITEM_RE = re.compile(r"^-\s+\*\*(?P<label>[^*]+?):?\*\*:?\s*(?P<body>.*)$")
+_FAULT_CODE_RE = re.compile(r"\bfault\s+code\s+(?P<code>[a-z]\d{1,3})\b", re.IGNORECASE)
+# "F 4", "F-4" and "f4" all name the same code.
+_CODE_IN_QUESTION_RE = re.compile(r"\b([a-z])[\s-]?(\d{1,3})\b", re.IGNORECASE)
+_SUFFIXES = ("ing", "es", "ed", "s", "e")
+
+# Words that carry no topic of their own in a lookup question.
+_QUESTION_WORDS = frozenset(
+    """
+    a about an and are can code display do does error explain fault for how i in is it me
+    mean means meaning my of on please say shows should tell the this to what when which
+    why with
+    """.split(),
+)
+
+
+def _stem(token: str) -> str:
+    """Strips common English suffixes so that "changing" and "change" match."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def _stems(text: str) -> frozenset[str]:
+    """Returns the stemmed word tokens of a text, with fault codes joined ("f 4" -> "f4")."""
+    text = _CODE_IN_QUESTION_RE.sub(r"\1\2", text)
+    return frozenset(_stem(token) for token in tokenize(text))
+
+
+_GENERIC_STEMS = frozenset(_stem(word) for word in _QUESTION_WORDS)
+
+
+def _plain(text: str) -> str:
+    """Removes Markdown emphasis and list indentation for a plain-text reply."""
+    lines = [line.strip().replace("**", "") for line in text.strip().splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """A knowledge base entry that can answer a lookup question on its own.
+
+    Attributes:
+        title: The label or heading of the entry.
+        answer: The reply sent for a match.
+        required: The stems a question must contain to match the entry.
+        vocabulary: The stems of the question the entry accounts for.
+    """
+
+    title: str
+    answer: str
+    required: frozenset[str]
+    vocabulary: frozenset[str]
+
+
+@dataclass(frozen=True, slots=True)
+class RouteMatch:
+    """A route chosen for a question, with how much of the question it explains."""
+
+    route: Route
+    confidence: float
+
+
+def _parse_routes(knowledge_base: str) -> list[Route]:
+    """Extracts a route for each fault code, labelled item and section."""
+    routes: list[Route] = []
+    for section in split_sections(knowledge_base):
+        if not section.title:
+            continue
+        heading = _stems(section.title)
+        routes.append(Route(section.title, _plain(section.text.lstrip("#")), heading, heading))
+
+        items: list[list[str]] = []
+        for line in section.text.splitlines()[1:]:
+            if _ITEM_RE.match(line):
+                items.append([line])
+            elif items and line.strip() and not line.startswith("-"):
+                items[-1].append(line)
+        for lines in items:
+            match = _ITEM_RE.match(lines[0])
+            if match is None:
+                continue
+            label = match.group("label").strip()
+            body = _plain("\n".join([match.group("body"), *lines[1:]]))
+            answer = f"{label}: {body}"
+            fault = _FAULT_CODE_RE.search(label)
+            # A fault code alone identifies its entry; other items need their whole label.
+            required = frozenset({fault.group("code").lower()}) if fault else _stems(label)
+            routes.append(Route(label, answer, required, _stems(label) | heading))
+    return routes
+
+
+class IntentRouter:
+    """Matches questions against the fault codes, items and headings of a knowledge base."""
+
+    def __init__(
+        self,
+        routes: list[Route],
+        *,
+        threshold: float = 0.8,
+        context: frozenset[str] = frozenset(),
+    ) -> None:
+        """Indexes the routes.
+
+        Args:
+            routes: The entries that can be answered locally.
+            threshold: The minimum share of the question's topic words an entry
+                must name in its own label rather than only in its section
+                heading, between 0 and 1. Lower values answer more questions
+                locally, at the risk of answering a broader entry.
+            context: Stems that name the knowledge base as a whole, such as its
+                device, which a question may mention without changing its topic.
+        """
+        self._routes = routes
+        self._threshold = threshold
+        self._context = context
+        self._by_stem: dict[str, list[Route]] = defaultdict(list)
+        for route in routes:
+            for stem in route.required:
+                self._by_stem[stem].append(route)
+
+    @classmethod
+    def from_text(
+        cls, knowledge_base: str, *, threshold: float = 0.8, context: str = ""
+    ) -> IntentRouter:
+        """Builds a router from the text of a knowledge base and the words naming it."""
+        routes = _parse_routes(knowledge_base)
+        logger.info("Intent router compiled %d routes from the knowledge base.", len(routes))
+        return cls(routes, threshold=threshold, context=_stems(context))
+
+    def __len__(self) -> int:
+        """Returns the number of routes."""
+        return len(self._routes)
+
+    def match(self, question: str) -> RouteMatch | None:
+        """Finds the route that answers a question, if one does so with confidence.
+
+        A route matches if the question contains all of its required stems and
+        every topic word of the question, i.e. every word but generic question
+        words and the words of the context, belongs to the route. The most
+        specific matching route wins; a tie between different entries is
+        ambiguous and left to the model. The confidence is the share of the
+        topic words the route's label names.
+
+        Args:
+            question: The user's question.
+
+        Returns:
+            The match, or None if no route reaches the confidence threshold.
+        """
+        stems = _stems(question)
+        topic = stems - _GENERIC_STEMS - self._context
+        if not topic:
+            return None
+        candidates = {
+            route
+            for stem in stems
+            for route in self._by_stem.get(stem, ())
+            if route.required <= stems and topic <= route.vocabulary
+        }
+        if not candidates:
+            return None
+        best = max(len(route.required) for route in candidates)
+        best_routes = {route.answer: route for route in candidates if len(route.required) == best}
+        if len(best_routes) > 1:
+            return None
+        route = next(iter(best_routes.values()))
+        confidence = len(topic & route.required) / len(topic)
+        if confidence < self._threshold:
+            return None
+        return RouteMatch(route, confidence)
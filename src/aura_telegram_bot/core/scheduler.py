@@ -0,0 +1,249 @@
+"""Admission control for upstream model calls.
+
+The scheduler bounds how many calls run at once, queues the rest by priority
+up to a limit, spaces calls out with a token bucket that matches the API
+quota, and retries rate-limit and server errors with jittered backoff.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from enum import IntEnum
+
+from aura_telegram_bot.metrics import QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying: rate limiting and transient server errors.
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class Priority(IntEnum):
+    """Scheduling classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+
+class QueueFullError(Exception):
+    """Raised when a call cannot be queued because the queue is at capacity."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Tells whether an upstream error is a rate limit or a transient server error.
+
+    Google API errors carry their HTTP status in a ``code`` attribute.
+    """
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """A token bucket rate limiter."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes a full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            capacity: The maximum number of tokens, i.e. the allowed burst.
+            clock: The monotonic time source.
+        """
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        """Adds the tokens accumulated since the last update."""
+        now = self._clock()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Takes tokens if available, without waiting.
+
+        Returns:
+            True if the tokens were taken.
+        """
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Waits until tokens are available and takes them."""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep((tokens - self._tokens) / self._rate)
+
+
+class RequestScheduler:
+    """Runs upstream calls with bounded concurrency, a priority queue and retries."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 4,
+        max_queue: int = 32,
+        requests_per_minute: float | None = None,
+        burst: int = 5,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes the scheduler.
+
+        Args:
+            max_concurrency: The maximum number of calls running at once.
+            max_queue: The maximum number of calls waiting for a slot.
+            requests_per_minute: The API quota to stay within, or None for no limit.
+            burst: How many calls may start back to back before the rate applies.
+            max_retries: How many times a retryable failure is retried.
+            base_delay: The backoff before the first retry, in seconds.
+            max_delay: The upper bound of the backoff, in seconds.
+            clock: The monotonic time source.
+        """
+        self._max_concurrency = max_concurrency
+        self._max_queue = max_queue
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._clock = clock
+        self._bucket = (
+            TokenBucket(requests_per_minute / 60, burst, clock=clock)
+            if requests_per_minute
+            else None
+        )
+        self._waiters: list[tuple[int, int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.retries = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.NORMAL,
+        cost: int = 0,
+    ) -> AsyncIterator[None]:
+        """Holds one of the concurrency slots, queueing by priority if none is free.
+
+        Within a priority class, cheaper calls (e.g. shorter prompts) go first.
+
+        Args:
+            priority: The scheduling class of the call.
+            cost: The expected cost of the call, such as its prompt tokens.
+
+        Raises:
+            QueueFullError: If no slot is free and the queue is at capacity.
+        """
+        enqueued_at = self._clock()
+        if self.active < self._max_concurrency and not self.queued:
+            self.active += 1
+        else:
+            if self.queued >= self._max_queue:
+                self.rejected += 1
+                raise QueueFullError(f"{self.queued} calls are already waiting.")
+            future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, cost, next(self._sequence), future))
+            self.queued += 1
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over just as we were cancelled; pass it on.
+                    self._release()
+                else:
+                    self.queued -= 1
+                raise
+
+        waited = self._clock() - enqueued_at
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        QUEUE_WAIT_SECONDS.observe(waited)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hands the slot to the best waiting call, or frees it."""
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.queued -= 1
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    async def call[T](self, func: Callable[[], Awaitable[T]]) -> T:
+        """Runs a call within the rate limit, retrying retryable failures.
+
+        Args:
+            func: Starts the upstream call; invoked once per attempt.
+
+        Returns:
+            The result of the first successful attempt.
+        """
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                return await func()
+            except Exception as e:
+                if attempt >= self._max_retries or not is_retryable(e):
+                    raise
+                # Full jitter spreads out the retries of calls that failed together.
+                backoff = min(self._max_delay, self._base_delay * 2**attempt)
+                delay = random.uniform(0, backoff)  # noqa: S311
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    "Upstream call failed (%s), retry %d/%d in %.1fs.",
+                    e,
+                    attempt,
+                    self._max_retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def run[T](
+        self,
+        func: Callable[[], Awaitable[T]],
+        priority: Priority = Priority.NORMAL,
+        cost: int = 0,
+    ) -> T:
+        """Waits for a slot and then runs the call with rate limiting and retries.
+
+        Args:
+            func: Starts the upstream call; invoked once per attempt.
+            priority: The scheduling class of the call.
+            cost: The expected cost of the call, such as its prompt tokens.
+
+        Returns:
+            The result of the call.
+        """
+        async with self.slot(priority, cost):
+            return await self.call(func)
@@ -0,0 +1,230 @@
+"""A semantic answer cache that reuses answers to differently worded questions.
+
+The exact answer cache only matches questions that normalize to the same
+text. This cache embeds every answered question as a vector and serves a
+cached answer when a new question is similar enough, so "How do I top up
+the pressure?" can reuse the answer to "How to top up boiler pressure".
+
+Vectors are computed locally by hashing words and character n-grams into a
+fixed number of dimensions, which needs no model, no network and no
+vocabulary, and tolerates typos and inflections. A multilingual embedding
+model can be plugged in instead, e.g. to match paraphrases across languages.
+Needs NumPy (``pip install aura-telegram-bot[semantic]``).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+
+import numpy as np
+import numpy.typing as npt
+
+from aura_telegram_bot.core.cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+type Vector = npt.NDArray[np.float32]
+type Vectorizer = Callable[[str], Vector]
+
+# Words that appear in almost every question and would make unrelated questions look alike.
+_STOP_WORDS = frozenset(
+    """
+    a an are be can could do does for how i in is it me my of on should that the this to too
+    what why with would
+    """.split(),
+)
+_NGRAM_SIZES = (3, 4, 5)
+# The number of most similar entries checked against the salient tokens of a question.
+_CANDIDATES = 8
+
+
+def _salient_tokens(text: str) -> frozenset[str]:
+    """Returns the tokens a similar question must share exactly, such as fault codes.
+
+    "What is F2?" and "What is F4?" are almost identical as text, but ask
+    about different things.
+    """
+    return frozenset(token for token in text.split() if any(char.isdigit() for char in token))
+
+
+class HashingVectorizer:
+    """Embeds text as a normalized vector of hashed words and character n-grams."""
+
+    def __init__(self, dim: int = 256) -> None:
+        """Initializes the vectorizer.
+
+        Args:
+            dim: The number of dimensions. More dimensions mean fewer hash
+                collisions, at the cost of memory and lookup time.
+        """
+        self.dim = dim
+
+    def __call__(self, text: str) -> Vector:
+        """Returns the unit-length vector of a normalized text, or zeros if it has no words."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.split():
+            if word in _STOP_WORDS:
+                continue
+            self._add(vector, f"w:{word}")
+            padded = f"<{word}>"
+            for size in _NGRAM_SIZES:
+                for start in range(len(padded) - size + 1):
+                    self._add(vector, padded[start : start + size])
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+    def _add(self, vector: Vector, feature: str) -> None:
+        """Adds a feature to its hashed dimension, with a hashed sign to offset collisions."""
+        digest = zlib.crc32(feature.encode("utf-8"))
+        vector[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+
+
+class SemanticCache:
+    """An LRU cache of answers looked up by the cosine similarity of their questions.
+
+    The question vectors are rows of one preallocated float32 matrix, so a
+    lookup is a single matrix-vector product. The matrix grows by doubling up
+    to ``max_entries`` rows; after that, the least recently used entry gives
+    up its row. Like :class:`~aura_telegram_bot.core.cache.AnswerCache`,
+    entries are bound to a fingerprint of the knowledge base.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        threshold: float = 0.8,
+        ttl: float = 6 * 60 * 60,
+        vectorizer: Vectorizer | None = None,
+        dim: int = 256,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            max_entries: The maximum number of cached answers.
+            threshold: The minimum cosine similarity, between 0 and 1, for a
+                cached answer to be reused. Lower values reuse more answers, at
+                the risk of answering a different question.
+            ttl: How long an answer stays valid, in seconds.
+            vectorizer: Embeds a normalized question as a unit-length vector of
+                ``dim`` dimensions. Defaults to a :class:`HashingVectorizer`.
+            dim: The number of dimensions of the vectors.
+            clock: The wall-clock time source, in seconds since the epoch.
+        """
+        self._max_entries = max_entries
+        self._threshold = threshold
+        self._ttl = ttl
+        self._vectorize = vectorizer if vectorizer is not None else HashingVectorizer(dim)
+        self._dim = dim
+        self._clock = clock
+        self._fingerprint = ""
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        """Drops all entries and releases the matrix."""
+        capacity = min(self._max_entries, 64)
+        self._matrix = np.zeros((capacity, self._dim), dtype=np.float32)
+        self._expires_at = np.zeros(capacity, dtype=np.float64)
+        self._answers: list[str] = []
+        self._salient: list[frozenset[str]] = []
+        # Normalized question -> row, in least recently used order.
+        self._rows: OrderedDict[str, int] = OrderedDict()
+        self._row_keys: list[str] = []
+
+    def __len__(self) -> int:
+        """Returns the number of cached answers, including expired ones."""
+        return len(self._rows)
+
+    @property
+    def memory_bytes(self) -> int:
+        """The size of the vector matrix, in bytes."""
+        return self._matrix.nbytes + self._expires_at.nbytes
+
+    def bind(self, knowledge_base_fingerprint: str) -> None:
+        """Binds the cache to a knowledge base version, dropping stale answers.
+
+        Args:
+            knowledge_base_fingerprint: The fingerprint of the current knowledge base.
+        """
+        if knowledge_base_fingerprint != self._fingerprint:
+            if self._rows:
+                logger.info("Knowledge base changed, dropping %d similar answers.", len(self))
+            self._reset()
+            self._fingerprint = knowledge_base_fingerprint
+
+    def get(self, question: str) -> str | None:
+        """Returns the answer to the most similar cached question, or None on a miss.
+
+        A cached question must reach the similarity threshold and contain the
+        same salient tokens, such as fault codes, as the question asked.
+        """
+        text = normalize_question(question)
+        vector = self._vectorize(text)
+        size = len(self._answers)
+        if not size or not vector.any():
+            self.misses += 1
+            return None
+        similarities = self._matrix[:size] @ vector
+        similarities[self._expires_at[:size] <= self._clock()] = -1.0
+        if size > _CANDIDATES:
+            candidates = np.argpartition(similarities, -_CANDIDATES)[-_CANDIDATES:]
+        else:
+            candidates = np.arange(size)
+        salient = _salient_tokens(text)
+        for row in candidates[np.argsort(similarities[candidates])[::-1]]:
+            if similarities[row] < self._threshold:
+                break
+            if self._salient[row] == salient:
+                self._rows.move_to_end(self._row_keys[row])
+                self.hits += 1
+                return self._answers[row]
+        self.misses += 1
+        return None
+
+    def put(self, question: str, answer: str) -> None:
+        """Caches an answer, reusing the row of the least recently used one if full."""
+        if not self._max_entries:
+            return
+        text = normalize_question(question)
+        vector = self._vectorize(text)
+        if not vector.any():
+            return
+        row = self._rows.get(text)
+        if row is not None:
+            self._rows.move_to_end(text)
+        elif len(self._rows) >= self._max_entries:
+            _, row = self._rows.popitem(last=False)
+        else:
+            row = len(self._answers)
+            self._answers.append(answer)
+            self._salient.append(frozenset())
+            self._row_keys.append(text)
+            self._ensure_capacity(row + 1)
+        self._rows[text] = row
+        self._row_keys[row] = text
+        self._answers[row] = answer
+        self._salient[row] = _salient_tokens(text)
+        self._matrix[row] = vector
+        self._expires_at[row] = self._clock() + self._ttl
+
+    def _ensure_capacity(self, rows: int) -> None:
+        """Grows the matrix by doubling, up to the maximum number of entries."""
+        capacity = len(self._matrix)
+        if rows <= capacity:
+            return
+        capacity = min(self._max_entries, max(rows, capacity * 2))
+        matrix = np.zeros((capacity, self._dim), dtype=np.float32)
+        matrix[: len(self._matrix)] = self._matrix
+        expires_at = np.zeros(capacity, dtype=np.float64)
+        expires_at[: len(self._expires_at)] = self._expires_at
+        self._matrix = matrix
+        self._expires_at = expires_at
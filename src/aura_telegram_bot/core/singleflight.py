@@ -0,0 +1,77 @@
+"""Coalescing of concurrent identical calls into a single upstream call."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight[T]:
+    """Runs at most one call per key at a time and shares its result with all callers.
+
+    The shared call runs as its own task: if one caller is cancelled, the call
+    keeps running for the others. Exceptions are propagated to every caller.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty set of in-flight calls."""
+        self._in_flight: dict[Hashable, asyncio.Future[T]] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def __len__(self) -> int:
+        """Returns the number of calls currently in flight."""
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of ``func``, joining an identical call if one is in flight.
+
+        Args:
+            key: Identifies calls that are interchangeable.
+            func: Starts the upstream call. Only invoked if no call for ``key`` is running.
+
+        Returns:
+            The result of the shared call.
+        """
+        shared = self.join(key)
+        if shared is not None:
+            return await shared
+        task = asyncio.ensure_future(func())
+        self._register(key, task)
+        return await asyncio.shield(task)
+
+    def join(self, key: Hashable) -> Awaitable[T] | None:
+        """Returns the result of the call in flight for ``key``, or None if there is none."""
+        task = self._in_flight.get(key)
+        if task is None:
+            return None
+        self.shared += 1
+        logger.debug("Joined an in-flight call; %d upstream calls saved so far.", self.shared)
+        return asyncio.shield(task)
+
+    def start(self, key: Hashable) -> asyncio.Future[T]:
+        """Registers a call whose result the caller sets itself, e.g. when it streams it.
+
+        The caller must resolve the returned future; until then, other callers
+        for ``key`` wait for it.
+        """
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._register(key, future)
+        return future
+
+    def _register(self, key: Hashable, task: asyncio.Future[T]) -> None:
+        """Makes a call the one in flight for ``key`` until it finishes."""
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        self.calls += 1
+
+    def _forget(self, key: Hashable, task: asyncio.Future[T]) -> None:
+        """Removes a finished call so the next caller starts a fresh one."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,60 @@
+"""Per-stage latency accounting for answering questions."""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+
+from aura_telegram_bot.metrics import span
+
+
+class StageTimings:
+    """Accumulates how long each stage of answering a question takes.
+
+    Stages are named freely, e.g. "cache", "live_context" and "model", so the
+    slowest part of an answer can be told apart from the rest.
+    """
+
+    def __init__(self, *, clock: Callable[[], float] = time.perf_counter) -> None:
+        """Initializes empty totals.
+
+        Args:
+            clock: The monotonic time source.
+        """
+        self._clock = clock
+        self.counts: Counter[str] = Counter()
+        self.seconds_total: Counter[str] = Counter()
+        self.seconds_max: dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Adds one measurement of a stage."""
+        self.counts[stage] += 1
+        self.seconds_total[stage] += seconds
+        self.seconds_max[stage] = max(self.seconds_max.get(stage, 0.0), seconds)
+
+    def mean(self, stage: str) -> float:
+        """Returns the mean duration of a stage in seconds, or 0 if it never ran."""
+        count = self.counts[stage]
+        return self.seconds_total[stage] / count if count else 0.0
+
+    @contextlib.contextmanager
+    def measure(self, stage: str, trace: dict[str, float] | None = None) -> Iterator[None]:
+        """Measures the enclosed block as one run of a stage.
+
+        The stage is also recorded as a span of the current request trace, if any.
+
+        Args:
+            stage: The name of the stage.
+            trace: An optional per-request record that also receives the duration.
+        """
+        started = self._clock()
+        try:
+            with span(stage):
+                yield
+        finally:
+            seconds = self._clock() - started
+            self.record(stage, seconds)
+            if trace is not None:
+                trace[stage] = seconds
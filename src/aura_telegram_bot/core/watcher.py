@@ -0,0 +1,128 @@
+"""Watches the knowledge base file or directory and hot-reloads it into the engine."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from aura_telegram_bot.core.corpus import DOCUMENT_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+# (inode, size, mtime) of a file, or of every document of a directory; any
+# change means the knowledge base must be reloaded.
+type FileSignature = tuple[int, ...]
+
+
+def _signature(path: Path) -> FileSignature | None:
+    """Returns the stat signature of a file or directory, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if not path.is_dir():
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+    signature: list[int] = []
+    for document in sorted(path.rglob("*")):
+        if document.suffix.lower() not in DOCUMENT_SUFFIXES:
+            continue
+        try:
+            stat = os.stat(document)
+        except FileNotFoundError:
+            continue
+        signature += (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    return tuple(signature)
+
+
+class KnowledgeBaseWatcher:
+    """Polls the knowledge base file and reloads it when it changes.
+
+    Each poll costs a single ``stat`` call, or one per document of a knowledge
+    base directory; the knowledge base is only loaded when an inode, size or
+    modification time changes. Unlike inotify, polling also
+    works where file events are not delivered, such as bind mounts on Docker
+    Desktop.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        on_change: Callable[[Any], Awaitable[object]],
+        *,
+        interval: float = 5.0,
+        load: Callable[[], object] | None = None,
+    ) -> None:
+        """Initializes the watcher.
+
+        Args:
+            path: The knowledge base file or directory to watch.
+            on_change: Called with the new content, e.g. ``engine.reload_knowledge_base``.
+            interval: The number of seconds between two polls.
+            load: Loads the new content in a worker thread. By default, the file
+                is read as text.
+        """
+        self._path = path
+        self._on_change = on_change
+        self._load = load or (lambda: path.read_text(encoding="utf-8"))
+        self._interval = interval
+        self._signature = _signature(path)
+        self._task: asyncio.Task[None] | None = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload_seconds: float | None = None
+
+    def start(self) -> None:
+        """Starts polling in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="knowledge-base-watcher")
+            logger.info("Watching '%s' for changes every %ss.", self._path, self._interval)
+
+    async def stop(self) -> None:
+        """Stops polling and waits for a reload in progress to finish."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def check(self) -> bool:
+        """Reloads the knowledge base if the file changed since the last check.
+
+        Returns:
+            True if a new version was loaded.
+        """
+        signature = _signature(self._path)
+        if signature is None or signature == self._signature:
+            # A missing file is usually an editor replacing it; keep the current version.
+            return False
+
+        # Remember the signature even on failure, so a broken file is reported once.
+        self._signature = signature
+        started = time.perf_counter()
+        try:
+            content = await asyncio.to_thread(self._load)
+            await self._on_change(content)
+        except Exception:
+            self.failures += 1
+            logger.exception("Failed to reload the knowledge base from '%s'.", self._path)
+            return False
+        self.reloads += 1
+        self.last_reload_seconds = time.perf_counter() - started
+        logger.info(
+            "Reloaded knowledge base from '%s' in %.1f ms.",
+            self._path,
+            self.last_reload_seconds * 1000,
+        )
+        return True
+
+    async def _run(self) -> None:
+        """Polls the file until cancelled."""
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.check()
@@ -0,0 +1,372 @@
+"""Concurrent update processing that keeps the messages of each chat in order.
+
+Updates from different chats are handled concurrently by a bounded number of
+workers, while the updates of a single chat are handled one after another in
+the order they arrived. A chat that sends faster than it is answered has its
+backlog capped: either the oldest waiting message is dropped, or a new text
+message is merged into the last waiting one so the question is answered once.
+Text messages a user sends in quick succession, such as the parts of a long
+paste, are merged as well: a new message is held for a short window, and the
+messages that follow within the window join it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+if TYPE_CHECKING:
+    from telegram.ext import Application
+
+    from aura_telegram_bot.journal import UpdateJournal
+
+logger = logging.getLogger(__name__)
+
+# What to do with a new message when a chat's queue is full.
+type OverflowPolicy = Literal["drop_oldest", "merge"]
+
+
+@dataclass(slots=True)
+class _Pending:
+    """An update waiting for its chat's previous updates to be handled.
+
+    The turn future resolves to True when the update may run, or to False
+    when it was dropped to make room for newer messages.
+    """
+
+    update: object
+    coroutine: Awaitable[Any]
+    turn: asyncio.Future[bool]
+    received_at: float
+
+
+def _discard(coroutine: Awaitable[Any]) -> None:
+    """Closes a coroutine that will never be awaited, avoiding a runtime warning."""
+    if inspect.iscoroutine(coroutine):
+        coroutine.close()
+
+
+def _chat_id(update: object) -> int | None:
+    """Returns the chat an update belongs to, or None if it has no chat."""
+    if isinstance(update, Update) and update.effective_chat:
+        return update.effective_chat.id
+    return None
+
+
+def _sender_id(update: object) -> int | None:
+    """Returns the user who sent an update, or None if it has no sender."""
+    if isinstance(update, Update) and update.effective_user:
+        return update.effective_user.id
+    return None
+
+
+def _message_text(update: object) -> str | None:
+    """Returns the text of a new text message, or None for any other update."""
+    if isinstance(update, Update) and update.message and update.message.text:
+        return update.message.text
+    return None
+
+
+def _is_command(update: object) -> bool:
+    """Tells whether an update is a bot command, such as ``/start``."""
+    if not isinstance(update, Update) or not update.message or not update.message.text:
+        return False
+    message = update.message
+    return message.text.startswith("/") or any(
+        entity.type == "bot_command" for entity in message.entities
+    )
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Handles chats concurrently and the updates within each chat in order.
+
+    Pass an instance to ``ApplicationBuilder.concurrent_updates`` and call
+    :meth:`bind` with the built application to enable merging.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        *,
+        max_queue_per_chat: int = 3,
+        overflow: OverflowPolicy = "merge",
+        merge_window: float = 0.0,
+        max_pending_updates: int = 256,
+        journal: UpdateJournal | None = None,
+    ) -> None:
+        """Initializes the processor.
+
+        Args:
+            workers: The maximum number of updates handled at once, across all chats.
+            max_queue_per_chat: The maximum number of updates of one chat waiting
+                behind the one being handled.
+            overflow: "drop_oldest" drops the oldest waiting update of a chat whose
+                queue is full; "merge" appends a new text message to the last
+                waiting one instead, falling back to dropping for other updates.
+            merge_window: With "merge", how long a new text message is held, in
+                seconds, so that text messages its sender adds within the window
+                are merged into it. Zero merges only on overflow.
+            max_pending_updates: The maximum number of updates accepted from
+                Telegram but not yet finished, across all chats.
+            journal: Is told about every update that was handled, if given. The
+                updates it replays are neither merged nor dropped.
+
+        Raises:
+            ValueError: If a limit is not positive.
+        """
+        if workers < 1 or max_queue_per_chat < 1:
+            raise ValueError("workers and max_queue_per_chat must be positive.")
+        # The base class only admits updates; the worker semaphore limits handling,
+        # so that updates waiting for their chat do not take up workers.
+        super().__init__(max(max_pending_updates, workers + 1))
+        self._workers = asyncio.Semaphore(workers)
+        self._max_queue_per_chat = max_queue_per_chat
+        self._overflow = overflow
+        self._merge_window = merge_window if overflow == "merge" else 0.0
+        self._application: Application | None = None
+        self._journal = journal
+        # A chat is present while one of its updates is being handled; the deque
+        # holds the updates waiting behind it.
+        self._chats: dict[int, deque[_Pending]] = {}
+        self.processed = 0
+        self.dropped = 0
+        self.merged = 0
+        self.max_queue_length = 0
+        self.handler_seconds_total = 0.0
+        self.handler_seconds_max = 0.0
+
+    def bind(self, application: Application) -> None:
+        """Gives the processor the application it needs to re-dispatch merged updates."""
+        self._application = application
+
+    @property
+    def queue_lengths(self) -> dict[int, int]:
+        """The number of updates waiting in each busy chat, by chat ID."""
+        return {chat_id: len(pending) for chat_id, pending in self._chats.items()}
+
+    async def initialize(self) -> None:
+        """Does nothing; the processor holds no resources."""
+
+    async def shutdown(self) -> None:
+        """Logs a summary; the application already waited for running updates."""
+        if self.processed:
+            logger.info(
+                "Handled %d updates in %.1f ms on average (max %.1f ms); "
+                "dropped %d, merged %d, longest chat queue %d.",
+                self.processed,
+                self.handler_seconds_total / self.processed * 1000,
+                self.handler_seconds_max * 1000,
+                self.dropped,
+                self.merged,
+                self.max_queue_length,
+            )
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Handles an update once the previous updates of its chat are done.
+
+        Args:
+            update: The update to be processed.
+            coroutine: Processes the update when awaited.
+        """
+        chat_id = _chat_id(update)
+        if chat_id is None:
+            await self._run(update, coroutine)
+            return
+
+        pending = self._chats.get(chat_id)
+        if pending is None:
+            pending = self._chats[chat_id] = deque()
+            if (
+                self._merge_window
+                and _message_text(update) is not None
+                and not self._replayed(update)
+            ):
+                entry = await self._hold(chat_id, pending, update, coroutine)
+                if entry is None:
+                    return
+                update, coroutine = entry.update, entry.coroutine
+        else:
+            entry = self._enqueue(chat_id, pending, update, coroutine)
+            if entry is None:
+                return
+            try:
+                if not await entry.turn:
+                    return
+            except asyncio.CancelledError:
+                if entry.turn.done() and not entry.turn.cancelled() and entry.turn.result():
+                    # The turn was handed over just as we were cancelled; pass it on.
+                    self._next(chat_id)
+                elif entry in pending:
+                    pending.remove(entry)
+                _discard(entry.coroutine)
+                raise
+            # A merge may have replaced the update while it was waiting.
+            update, coroutine = entry.update, entry.coroutine
+
+        try:
+            await self._run(update, coroutine)
+        finally:
+            self._next(chat_id)
+
+    async def _hold(
+        self,
+        chat_id: int,
+        pending: deque[_Pending],
+        update: object,
+        coroutine: Awaitable[Any],
+    ) -> _Pending | None:
+        """Keeps a new message of an idle chat waiting for the merge window.
+
+        The chat counts as busy meanwhile, so following updates queue up, and
+        text messages from the same sender are merged into the held one.
+
+        Returns:
+            The held entry, possibly merged, or None if it was dropped to make room.
+        """
+        loop = asyncio.get_running_loop()
+        entry = _Pending(update, coroutine, loop.create_future(), time.monotonic())
+        pending.append(entry)
+        try:
+            await asyncio.sleep(self._merge_window)
+        except asyncio.CancelledError:
+            if entry in pending:
+                pending.remove(entry)
+            _discard(entry.coroutine)
+            self._next(chat_id)
+            raise
+        if entry.turn.done():
+            # Dropped by the queue cap; let the updates behind it run.
+            self._next(chat_id)
+            return None
+        pending.remove(entry)
+        return entry
+
+    def _enqueue(
+        self,
+        chat_id: int,
+        pending: deque[_Pending],
+        update: object,
+        coroutine: Awaitable[Any],
+    ) -> _Pending | None:
+        """Queues an update behind the busy chat, enforcing the queue cap.
+
+        Returns:
+            The queued entry, or None if the update was merged into a waiting one.
+        """
+        now = time.monotonic()
+        if self._replayed(update):
+            # Sent apart and already accepted, so neither merged nor capped.
+            entry = _Pending(update, coroutine, asyncio.get_running_loop().create_future(), now)
+            pending.append(entry)
+            return entry
+        if (
+            self._merge_window
+            and pending
+            and now - pending[-1].received_at <= self._merge_window
+            and self._merge_into(chat_id, pending[-1], update, coroutine)
+        ):
+            return None
+        if len(pending) >= self._max_queue_per_chat:
+            if self._overflow == "merge" and self._merge_into(
+                chat_id, pending[-1], update, coroutine
+            ):
+                return None
+            oldest = pending.popleft()
+            _discard(oldest.coroutine)
+            oldest.turn.set_result(False)
+            self.dropped += 1
+            logger.warning("Chat %s is sending too fast, dropped its oldest message.", chat_id)
+
+        entry = _Pending(update, coroutine, asyncio.get_running_loop().create_future(), now)
+        pending.append(entry)
+        self.max_queue_length = max(self.max_queue_length, len(pending))
+        logger.debug("Chat %s has %d updates waiting.", chat_id, len(pending))
+        return entry
+
+    def _merge_into(
+        self,
+        chat_id: int,
+        last: _Pending,
+        update: object,
+        coroutine: Awaitable[Any],
+    ) -> bool:
+        """Merges an update into a waiting entry; returns False if they cannot be merged."""
+        merged = self._merge(last.update, update)
+        if merged is None or self._application is None:
+            return False
+        _discard(last.coroutine)
+        _discard(coroutine)
+        last.update = merged
+        last.coroutine = self._application.process_update(merged)
+        last.received_at = time.monotonic()
+        self.merged += 1
+        logger.info("Merged a message into the queue of chat %s.", chat_id)
+        return True
+
+    def _merge(self, previous: object, update: object) -> Update | None:
+        """Combines two text messages into one, or returns None if they cannot be merged.
+
+        Only plain text messages of the same sender are merged: the merged update
+        is authorized as its newer message's sender, and commands would reach
+        the model as text. Replayed messages were sent apart and stay apart.
+        The merged update keeps the newer message, so the answer replies to it.
+        """
+        if not isinstance(update, Update) or self._application is None:
+            return None
+        if (
+            _sender_id(previous) != _sender_id(update)
+            or self._replayed(previous)
+            or _is_command(previous)
+            or _is_command(update)
+        ):
+            return None
+        previous_text = _message_text(previous)
+        text = _message_text(update)
+        if previous_text is None or text is None:
+            return None
+        data = update.to_dict()
+        message = data["message"]
+        message["text"] = f"{previous_text}\n{text}"
+        # Entity offsets refer to the original text only.
+        message.pop("entities", None)
+        return Update.de_json(data, self._application.bot)
+
+    def _replayed(self, update: object) -> bool:
+        """Tells whether an update was replayed from the journal after a restart."""
+        return self._journal is not None and self._journal.replayed(update)
+
+    def _next(self, chat_id: int) -> None:
+        """Lets the next waiting update of a chat run, or marks the chat idle."""
+        pending = self._chats[chat_id]
+        if pending:
+            pending.popleft().turn.set_result(True)
+        else:
+            del self._chats[chat_id]
+
+    async def _run(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """Handles an update on one of the workers, recording how long it took."""
+        async with self._workers:
+            started = time.perf_counter()
+            try:
+                await coroutine
+                if self._journal is not None:
+                    self._journal.complete(update)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.processed += 1
+                self.handler_seconds_total += elapsed
+                self.handler_seconds_max = max(self.handler_seconds_max, elapsed)
+                logger.debug(
+                    "Handled update %s in %.1f ms.",
+                    getattr(update, "update_id", None),
+                    elapsed * 1000,
+                )
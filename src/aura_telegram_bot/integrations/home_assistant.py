@@ -3,21 +3,22 @@
 from __future__ import annotations
 
 import logging
+import time
+from collections.abc import Callable, Iterable
 from types import TracebackType
 from typing import Any
 
 import httpx
 
+from aura_telegram_bot.core.singleflight import SingleFlight
+from aura_telegram_bot.integrations.http import DEFAULT_TIMEOUT
+from aura_telegram_bot.metrics import ERRORS, HOME_ASSISTANT_SECONDS, span
+
 # --- Setup logging ---
 logger = logging.getLogger(__name__)
 
-# A more robust timeout configuration with per-phase values.
-DEFAULT_TIMEOUT = httpx.Timeout(
-    connect=5.0,
-    read=10.0,
-    write=10.0,
-    pool=5.0,
-)
+# The single-flight key of a bulk fetch; entity IDs always contain a dot.
+_ALL_STATES = "*"
 
 
 class HomeAssistantError(Exception):
@@ -32,31 +33,114 @@ class HAConnectionError(HomeAssistantError):
     """Raised when the client cannot connect to Home Assistant."""
 
 
+class StateCache:
+    """An in-memory cache of entity states, each with its own freshness.
+
+    Every state is valid for ``ttl`` seconds after it was fetched, so a bulk
+    fetch refreshes all entities at once while single fetches only refresh
+    their own entity.
+    """
+
+    def __init__(self, ttl: float = 5.0, *, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            ttl: How long a fetched state stays fresh, in seconds. Zero disables the cache.
+            clock: The monotonic time source.
+        """
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: dict[str, tuple[dict[str, Any], float]] = {}
+        self._snapshot_expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Returns the number of cached states, including stale ones."""
+        return len(self._entries)
+
+    @property
+    def has_fresh_snapshot(self) -> bool:
+        """Whether all states were fetched in bulk within the TTL.
+
+        While true, an entity missing from the cache does not exist in Home Assistant.
+        """
+        return self._snapshot_expires_at > self._clock()
+
+    def get(self, entity_id: str) -> dict[str, Any] | None:
+        """Returns the state of an entity if it is fresh, or None."""
+        entry = self._entries.get(entity_id)
+        if entry is None or entry[1] <= self._clock():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, entity_id: str, state: dict[str, Any]) -> None:
+        """Caches the state of a single entity."""
+        if self._ttl:
+            self._entries[entity_id] = (state, self._clock() + self._ttl)
+
+    def put_all(self, states: Iterable[dict[str, Any]]) -> None:
+        """Replaces the cache with a bulk fetch of all entity states."""
+        if not self._ttl:
+            return
+        expires_at = self._clock() + self._ttl
+        self._entries = {state["entity_id"]: (state, expires_at) for state in states}
+        self._snapshot_expires_at = expires_at
+
+
 class HomeAssistantClient:
-    """An asynchronous client for the Home Assistant REST API."""
+    """An asynchronous client for the Home Assistant REST API.
+
+    Entity states are cached for a few seconds, and concurrent requests for
+    the same states share a single API call.
 
-    def __init__(self, base_url: str, token: str) -> None:
+    Given a shared HTTP client, the Home Assistant client is ready to use
+    without ``async with`` and never closes the shared client. Otherwise each
+    ``async with`` block opens and closes a client of its own.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        *,
+        client: httpx.AsyncClient | None = None,
+        state_ttl: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         """Initializes the Home Assistant client.
 
         Args:
             base_url: The base URL of the Home Assistant instance (e.g., http://localhost:8123).
             token: A long-lived access token for authentication.
+            client: An application-wide HTTP client to send requests with, see
+                ``create_http_client``. Its owner is responsible for closing it.
+            state_ttl: How long fetched entity states are reused, in seconds.
+                Zero disables the cache.
+            clock: The monotonic time source of the cache.
         """
-        self._base_url = base_url
+        self._base_url = base_url.rstrip("/")
         self._headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
-        self._client: httpx.AsyncClient | None = None
+        self._shared_client = client
+        self._client: httpx.AsyncClient | None = client
+        self._states = StateCache(state_ttl, clock=clock)
+        self._flights: SingleFlight[Any] = SingleFlight()
+
+    @property
+    def state_cache(self) -> StateCache:
+        """The cache of entity states shared by all requests of this client."""
+        return self._states
 
     async def __aenter__(self) -> HomeAssistantClient:
-        """Enter the async context manager, initializing the client."""
-        self._client = httpx.AsyncClient(
-            base_url=self._base_url,
-            headers=self._headers,
-            timeout=DEFAULT_TIMEOUT,
-        )
+        """Enter the async context manager, initializing the client unless one is shared."""
+        if self._shared_client is None:
+            self._client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT)
         return self
 
     async def __aexit__(
@@ -65,7 +149,9 @@ class HomeAssistantClient:
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
-        """Exit the async context manager, closing the client."""
+        """Exit the async context manager, closing the client unless it is shared."""
+        if self._shared_client is not None:
+            return
         try:
             if self._client:
                 await self._client.aclose()
@@ -84,22 +170,89 @@ class HomeAssistantClient:
         Raises:
             HAConnectionError: If there's a network issue connecting to Home Assistant.
             ApiError: If Home Assistant returns an error response.
-            TypeError: If the client is used outside of an `async with` block.
+            TypeError: If the client is used outside of an `async with` block
+                without a shared HTTP client.
         """
         if not self._client:
             raise TypeError("HomeAssistantClient must be used with 'async with'.")
 
-        api_path = f"api/states/{entity_id}"
-        logger.info(f"Requesting entity state from: {api_path}")
+        state = self._states.get(entity_id)
+        if state is None:
+            state = await self._flights.do(entity_id, lambda: self._fetch_state(entity_id))
+        return state
+
+    async def get_states(self, entity_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Fetches the states of several entities with at most one API call.
+
+        Fresh states are served from the cache. If any are missing, all states
+        are fetched at once from ``api/states``, which is cheaper than fetching
+        a dozen entities one by one.
+
+        Args:
+            entity_ids: The IDs of the entities to fetch.
+
+        Returns:
+            The states by entity ID. Entities unknown to Home Assistant are omitted.
+
+        Raises:
+            HAConnectionError: If there's a network issue connecting to Home Assistant.
+            ApiError: If Home Assistant returns an error response.
+            TypeError: If the client is used outside of an `async with` block
+                without a shared HTTP client.
+        """
+        if not self._client:
+            raise TypeError("HomeAssistantClient must be used with 'async with'.")
+
+        states: dict[str, dict[str, Any]] = {}
+        missing: list[str] = []
+        for entity_id in dict.fromkeys(entity_ids):
+            state = self._states.get(entity_id)
+            if state is None:
+                missing.append(entity_id)
+            else:
+                states[entity_id] = state
+        if not missing or self._states.has_fresh_snapshot:
+            return states
+
+        all_states = await self._flights.do(_ALL_STATES, self._fetch_all_states)
+        for entity_id in missing:
+            if entity_id in all_states:
+                states[entity_id] = all_states[entity_id]
+        return states
+
+    async def _fetch_state(self, entity_id: str) -> dict[str, Any]:
+        """Fetches the state of one entity and caches it."""
+        state = await self._get(f"api/states/{entity_id}")
+        self._states.put(entity_id, state)
+        return state
+
+    async def _fetch_all_states(self) -> dict[str, dict[str, Any]]:
+        """Fetches the states of all entities and caches them."""
+        states = await self._get("api/states")
+        self._states.put_all(states)
+        return {state["entity_id"]: state for state in states}
+
+    async def _get(self, api_path: str) -> Any:
+        """Sends a GET request to the API and returns the decoded JSON response."""
+        if not self._client:
+            raise TypeError("HomeAssistantClient must be used with 'async with'.")
+
+        logger.info("Requesting entity state from: %s", api_path)
 
         try:
-            response = await self._client.get(api_path)
+            with span("home_assistant"), HOME_ASSISTANT_SECONDS.time():
+                response = await self._client.get(
+                    f"{self._base_url}/{api_path}",
+                    headers=self._headers,
+                )
             response.raise_for_status()
             return response.json()
         except httpx.RequestError as e:
+            ERRORS.inc(labels=("home_assistant",))
             logger.exception("Failed to connect to Home Assistant")
             raise HAConnectionError(f"Cannot connect to Home Assistant: {e}") from e
         except httpx.HTTPStatusError as e:
+            ERRORS.inc(labels=("home_assistant",))
             logger.exception(
                 "Received non-200 response from Home Assistant: %s",
                 e.response.status_code,
@@ -0,0 +1,307 @@
+"""An in-process mirror of Home Assistant entity states, kept current over the WebSocket API.
+
+The mirror authenticates with a long-lived access token, subscribes to
+``state_changed`` events and loads all states once, so reads are served
+from memory without a round trip to Home Assistant. After a lost
+connection it reconnects with backoff and loads all states again, since
+events may have been missed while it was away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import sys
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from tornado.websocket import WebSocketClientConnection, websocket_connect
+
+from aura_telegram_bot.integrations.home_assistant import (
+    ApiError,
+    HAConnectionError,
+    HomeAssistantError,
+)
+
+logger = logging.getLogger(__name__)
+
+# A full state dump of a large installation easily exceeds Tornado's 10 MiB default.
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# The state fields worth keeping; the event context alone is three UUIDs per entity.
+_STATE_FIELDS = ("entity_id", "state", "attributes", "last_changed", "last_updated")
+
+_SUBSCRIBE_ID = 1
+_GET_STATES_ID = 2
+
+
+class AuthenticationError(HomeAssistantError):
+    """Raised when Home Assistant rejects the access token."""
+
+
+class StaleStateError(HomeAssistantError):
+    """Raised when the mirror has been out of sync with Home Assistant for too long."""
+
+
+def websocket_url(base_url: str) -> str:
+    """Returns the WebSocket API URL of a Home Assistant instance.
+
+    Args:
+        base_url: The base URL of the instance (e.g., http://localhost:8123).
+    """
+    url = base_url.rstrip("/")
+    if url.startswith("https://"):
+        url = "wss://" + url.removeprefix("https://")
+    elif url.startswith("http://"):
+        url = "ws://" + url.removeprefix("http://")
+    return f"{url}/api/websocket"
+
+
+def _compact(state: dict[str, Any]) -> dict[str, Any]:
+    """Keeps only the useful fields of a state, sharing repeated strings."""
+    compact = {field: state[field] for field in _STATE_FIELDS if field in state}
+    if isinstance(compact.get("state"), str):
+        compact["state"] = sys.intern(compact["state"])
+    if compact.get("last_updated") == compact.get("last_changed"):
+        # The timestamps only differ when just the attributes changed.
+        compact["last_updated"] = compact.get("last_changed")
+    return compact
+
+
+class HomeAssistantStateMirror:
+    """Keeps an in-memory copy of all entity states, updated by Home Assistant events.
+
+    Reads never touch the network. While the connection is down, the last
+    known states are served for up to ``max_staleness`` seconds; after that,
+    reads raise :class:`StaleStateError` so callers can fall back or degrade.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        *,
+        max_staleness: float = 60.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 60.0,
+        ping_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes the mirror; call :meth:`start` to connect.
+
+        Args:
+            base_url: The base URL of the Home Assistant instance (e.g., http://localhost:8123).
+            token: A long-lived access token for authentication.
+            max_staleness: How long states are served after the connection was lost, in seconds.
+            reconnect_delay: The backoff before the first reconnection attempt, in seconds.
+            max_reconnect_delay: The upper bound of the reconnection backoff, in seconds.
+            ping_interval: How often to ping Home Assistant to detect dead connections,
+                in seconds.
+            clock: The monotonic time source.
+        """
+        self._url = websocket_url(base_url)
+        self._token = token
+        self._max_staleness = max_staleness
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._ping_interval = ping_interval
+        self._clock = clock
+        self._states: dict[str, dict[str, Any]] = {}
+        self._synced = False
+        self._synced_event = asyncio.Event()
+        self._disconnected_at: float | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.events = 0
+        self.resyncs = 0
+        self.reconnects = 0
+
+    def __len__(self) -> int:
+        """Returns the number of mirrored entities."""
+        return len(self._states)
+
+    @property
+    def running(self) -> bool:
+        """Whether the mirror is connected or trying to reconnect."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def in_sync(self) -> bool:
+        """Whether the mirror is connected and has loaded all states."""
+        return self._synced
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the mirrored states may be served.
+
+        True while connected and in sync, and for ``max_staleness`` seconds after
+        the connection was lost.
+        """
+        if self._synced:
+            return True
+        return (
+            self._disconnected_at is not None
+            and self._clock() - self._disconnected_at <= self._max_staleness
+        )
+
+    def start(self) -> None:
+        """Connects and keeps the mirror in sync in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="home-assistant-state-mirror")
+            logger.info("Mirroring Home Assistant states from '%s'.", self._url)
+
+    async def stop(self) -> None:
+        """Disconnects and stops reconnecting."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._mark_disconnected()
+
+    async def wait_until_synced(self, timeout: float | None = None) -> None:
+        """Waits until all states have been loaded at least once.
+
+        Raises:
+            TimeoutError: If the states were not loaded within the timeout.
+        """
+        async with asyncio.timeout(timeout):
+            await self._synced_event.wait()
+
+    def get_state(self, entity_id: str) -> dict[str, Any] | None:
+        """Returns the state of an entity, or None if Home Assistant does not know it.
+
+        Raises:
+            StaleStateError: If the mirror is out of sync for longer than allowed.
+        """
+        self._check_fresh()
+        return self._states.get(entity_id)
+
+    async def get_states(self, entity_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Returns the states of several entities; unknown entities are omitted.
+
+        This is a coroutine only to match ``HomeAssistantClient.get_states``; it
+        never waits.
+
+        Raises:
+            StaleStateError: If the mirror is out of sync for longer than allowed.
+        """
+        self._check_fresh()
+        states = self._states
+        return {entity_id: states[entity_id] for entity_id in entity_ids if entity_id in states}
+
+    def _check_fresh(self) -> None:
+        """Raises if the mirrored states are too old to be served."""
+        if not self.is_fresh:
+            raise StaleStateError("The Home Assistant state mirror is out of sync.")
+
+    async def _run(self) -> None:
+        """Connects, and reconnects with jittered backoff, until cancelled."""
+        delay = self._reconnect_delay
+        while True:
+            resyncs = self.resyncs
+            try:
+                await self._session()
+            except AuthenticationError:
+                logger.exception("Home Assistant rejected the access token; not reconnecting.")
+                self._mark_disconnected()
+                return
+            except Exception as e:
+                logger.warning("Lost the Home Assistant WebSocket connection: %s", e)
+            self._mark_disconnected()
+            if self.resyncs > resyncs:
+                # The connection worked for a while; start the backoff over.
+                delay = self._reconnect_delay
+            await asyncio.sleep(random.uniform(0, delay))  # noqa: S311
+            delay = min(self._max_reconnect_delay, delay * 2)
+            self.reconnects += 1
+
+    def _mark_disconnected(self) -> None:
+        """Starts the staleness clock if the mirror was in sync."""
+        if self._synced:
+            self._synced = False
+            self._disconnected_at = self._clock()
+
+    async def _session(self) -> None:
+        """Runs one connection: authenticates, subscribes, loads all states and follows events."""
+        connection = await websocket_connect(
+            self._url,
+            ping_interval=self._ping_interval,
+            max_message_size=MAX_MESSAGE_SIZE,
+        )
+        try:
+            await self._authenticate(connection)
+            await self._send(
+                connection, id=_SUBSCRIBE_ID, type="subscribe_events", event_type="state_changed"
+            )
+            await self._send(connection, id=_GET_STATES_ID, type="get_states")
+            while True:
+                message = await self._receive(connection)
+                self._handle(message)
+        finally:
+            connection.close()
+
+    async def _authenticate(self, connection: WebSocketClientConnection) -> None:
+        """Completes Home Assistant's authentication handshake."""
+        message = await self._receive(connection)
+        if message.get("type") != "auth_required":
+            raise HomeAssistantError(f"Unexpected first message: {message.get('type')}")
+        await self._send(connection, type="auth", access_token=self._token)
+        message = await self._receive(connection)
+        if message.get("type") == "auth_invalid":
+            raise AuthenticationError(message.get("message", "Invalid access token."))
+        if message.get("type") != "auth_ok":
+            raise HomeAssistantError(f"Unexpected authentication reply: {message.get('type')}")
+
+    def _handle(self, message: dict[str, Any]) -> None:
+        """Applies a message received after authentication."""
+        message_type = message.get("type")
+        message_id = message.get("id")
+        if message_type == "event" and message_id == _SUBSCRIBE_ID:
+            # Events sent before the state dump are already reflected in it.
+            if self._synced:
+                self._apply_event(message["event"]["data"])
+        elif message_type == "result":
+            if not message.get("success"):
+                error = message.get("error", {})
+                raise ApiError(f"Home Assistant request {message_id} failed: {error}")
+            if message_id == _GET_STATES_ID:
+                self._replace(message["result"])
+
+    def _replace(self, states: list[dict[str, Any]]) -> None:
+        """Swaps in a full state dump."""
+        self._states = {state["entity_id"]: _compact(state) for state in states}
+        self._synced = True
+        self._disconnected_at = None
+        self._synced_event.set()
+        self.resyncs += 1
+        logger.info("Loaded %d Home Assistant entity states.", len(self._states))
+
+    def _apply_event(self, data: dict[str, Any]) -> None:
+        """Applies a ``state_changed`` event to the mirror."""
+        self.events += 1
+        new_state = data.get("new_state")
+        if new_state is None:
+            self._states.pop(data["entity_id"], None)
+        else:
+            self._states[data["entity_id"]] = _compact(new_state)
+
+    @staticmethod
+    async def _send(connection: WebSocketClientConnection, **message: Any) -> None:
+        """Sends a JSON message."""
+        await connection.write_message(json.dumps(message))
+
+    @staticmethod
+    async def _receive(connection: WebSocketClientConnection) -> dict[str, Any]:
+        """Receives a JSON message.
+
+        Raises:
+            HAConnectionError: If the connection was closed.
+        """
+        message = await connection.read_message()
+        if message is None:
+            raise HAConnectionError("Home Assistant closed the WebSocket connection.")
+        return json.loads(message)
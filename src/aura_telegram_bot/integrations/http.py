@@ -0,0 +1,57 @@
+"""The application-wide HTTP client shared by all integrations."""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# A more robust timeout configuration with per-phase values.
+DEFAULT_TIMEOUT = httpx.Timeout(
+    connect=5.0,
+    read=10.0,
+    write=10.0,
+    pool=5.0,
+)
+
+
+def create_http_client(
+    *,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+) -> httpx.AsyncClient:
+    """Creates a pooled HTTP client that keeps connections alive between requests.
+
+    The client is meant to be created once at startup, shared by every
+    integration and closed at shutdown, so requests reuse open connections
+    instead of paying for TCP and TLS setup each time.
+
+    Args:
+        max_connections: The maximum number of concurrent connections.
+        max_keepalive_connections: The maximum number of idle connections kept open.
+        keepalive_expiry: How long an idle connection is kept open, in seconds.
+        http2: Whether to negotiate HTTP/2 with servers that support it. Needs the
+            ``h2`` package (``pip install httpx[http2]``); without it, HTTP/1.1 is used.
+        timeout: The per-phase timeouts of every request.
+
+    Returns:
+        The client. Close it with ``aclose()``.
+    """
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1.")
+        http2 = False
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2,
+        timeout=timeout,
+    )
@@ -0,0 +1,234 @@
+"""Non-blocking, structured logging.
+
+Log records are put on a queue by the thread that logs them and written out
+by a background thread, so the event loop never waits on stdout. Records are
+formatted only in that thread, and only if they pass the filters:
+
+* every record carries the ID of the request it was logged for, if any;
+* loggers with a sample rate keep only that share of their records below
+  WARNING;
+* user messages, wrapped in ``user_text``, are truncated or redacted.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, Literal, TextIO
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from types import TracebackType
+
+MessageBodies = Literal["full", "truncate", "redact"]
+
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("aura_request_id", default="-")
+_message_bodies: MessageBodies = "full"
+_message_max_chars = 80
+
+_TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+
+class _RequestContext:
+    """Tags every record logged inside a ``with`` block with a request ID."""
+
+    __slots__ = ("_request_id", "_token")
+
+    def __init__(self, request_id: object) -> None:
+        """Initializes the context for one request, e.g. with a Telegram update ID."""
+        self._request_id = str(request_id)
+        self._token: contextvars.Token[str] | None = None
+
+    def __enter__(self) -> None:
+        """Makes the request ID current."""
+        self._token = _request_id.set(self._request_id)
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Restores the previous request ID."""
+        if self._token is not None:
+            _request_id.reset(self._token)
+
+
+def request_context(request_id: object) -> _RequestContext:
+    """Returns a context manager tagging the records logged inside it with a request ID.
+
+    Args:
+        request_id: Identifies the request, e.g. the ID of a Telegram update.
+    """
+    return _RequestContext(request_id)
+
+
+class UserText:
+    """A user's message as a log argument, shortened according to the logging settings.
+
+    The text is only rendered when the record is formatted, in the logging thread.
+    """
+
+    __slots__ = ("_text",)
+
+    def __init__(self, text: str) -> None:
+        """Wraps the message."""
+        self._text = text
+
+    def __str__(self) -> str:
+        """Returns the message, truncated or replaced by its length and a short hash."""
+        if _message_bodies == "redact":
+            digest = hashlib.sha256(self._text.encode("utf-8")).hexdigest()[:8]
+            return f"<{len(self._text)} chars #{digest}>"
+        if _message_bodies == "truncate" and len(self._text) > _message_max_chars:
+            return f"{self._text[:_message_max_chars]}… (+{len(self._text) - _message_max_chars})"
+        return self._text
+
+    def __repr__(self) -> str:
+        """Quotes the rendered message, like a string argument formatted with %r."""
+        return repr(str(self))
+
+
+def user_text(text: str) -> UserText:
+    """Marks a user's message as a log argument that may be truncated or redacted."""
+    return UserText(text)
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds the current request ID to each record as ``request_id``.
+
+    Must run in the thread that logs the record, i.e. on the queue handler.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Tags the record and lets it through."""
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a share of the records below WARNING from high-volume loggers.
+
+    A rate applies to the named logger and its children, with the most
+    specific name winning. Loggers without a rate keep every record.
+    """
+
+    def __init__(self, rates: Mapping[str, float], rng: random.Random | None = None) -> None:
+        """Initializes the filter.
+
+        Args:
+            rates: The share of records to keep, between 0 and 1, per logger name.
+            rng: The random source, for repeatable tests.
+        """
+        super().__init__()
+        self._rates = dict(rates)
+        self._random = (rng or random.Random()).random  # noqa: S311
+        self.dropped = 0
+
+    def _rate(self, name: str) -> float:
+        """Returns the sample rate of a logger, inherited from its closest parent."""
+        while True:
+            rate = self._rates.get(name)
+            if rate is not None:
+                return rate
+            if "." not in name:
+                return 1.0
+            name = name.rpartition(".")[0]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Returns whether the record is kept."""
+        if record.levelno >= logging.WARNING or not self._rates:
+            return True
+        rate = self._rate(record.name)
+        if rate >= 1.0 or self._random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one line of JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Returns the record's time, level, logger, request ID and message as JSON."""
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queues records without formatting them first.
+
+    ``QueueHandler.prepare`` renders the message in the logging thread so that
+    records can be pickled; in-process queues do not need that, so the work is
+    left to the listener. Arguments must therefore not change after logging,
+    which holds for the strings, numbers and ``UserText`` the bot logs.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Returns the record unchanged."""
+        return record
+
+
+def configure_logging(
+    *,
+    level: int | str = logging.INFO,
+    json_format: bool = True,
+    sample_rates: Mapping[str, float] | None = None,
+    message_bodies: MessageBodies = "truncate",
+    message_max_chars: int = 80,
+    stream: TextIO | None = None,
+) -> QueueListener:
+    """Routes the root logger through a queue to a background writer.
+
+    Replaces any handlers of the root logger.
+
+    Args:
+        level: The level of the root logger.
+        json_format: Write JSON lines instead of human-readable text.
+        sample_rates: The share of records below WARNING to keep, per logger name.
+        message_bodies: How user messages are logged: in full, truncated, or
+            replaced by their length and a short hash.
+        message_max_chars: The length user messages are truncated to.
+        stream: Where the records are written; stderr by default.
+
+    Returns:
+        The started listener. Stop it at shutdown to flush the queue.
+    """
+    global _message_bodies, _message_max_chars
+    _message_bodies = message_bodies
+    _message_max_chars = message_max_chars
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if json_format else logging.Formatter(_TEXT_FORMAT))
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(records)
+    handler.addFilter(RequestIdFilter())
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for previous in root.handlers[:]:
+        root.removeHandler(previous)
+        previous.close()
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = QueueListener(records, output, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -2,8 +2,13 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import signal
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
+import httpx
 from telegram import Update
 from telegram.constants import ChatAction
 from telegram.ext import (
@@ -13,25 +18,48 @@ from telegram.ext import (
     MessageHandler,
     filters,
 )
+from telegram.request import BaseRequest
 
-from aura_telegram_bot.auth import restricted
-from aura_telegram_bot.config import get_settings
+from aura_telegram_bot.auth import reload_allowlist, restricted
+from aura_telegram_bot.config import Settings, get_settings
 from aura_telegram_bot.core.engine import AuraEngine
-
-# --- Setup logging ---
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
+from aura_telegram_bot.core.factory import create_engine
+from aura_telegram_bot.core.live_context import (
+    FallbackStateSource,
+    LiveContextProvider,
+    StateSource,
+)
+from aura_telegram_bot.core.watcher import KnowledgeBaseWatcher
+from aura_telegram_bot.dispatch import PerChatUpdateProcessor
+from aura_telegram_bot.integrations.home_assistant import HomeAssistantClient
+from aura_telegram_bot.integrations.home_assistant_ws import HomeAssistantStateMirror
+from aura_telegram_bot.integrations.http import create_http_client
+from aura_telegram_bot.journal import JournaledUpdateQueue, UpdateJournal
+from aura_telegram_bot.logs import configure_logging, request_context, user_text
+from aura_telegram_bot.metrics import (
+    ERRORS,
+    HANDLER_SECONDS,
+    REGISTRY,
+    MetricsServer,
+    configure_tracing,
+    engine_collector,
+    home_assistant_collector,
+    knowledge_base_watcher_collector,
+    span,
+    trace_request,
+    update_processor_collector,
 )
-# Set a higher log level for the httpx library to avoid noisy logs.
-logging.getLogger("httpx").setLevel(logging.WARNING)
+from aura_telegram_bot.streaming import ThrottledMessageEditor
 
 logger = logging.getLogger(__name__)
 
 
 @restricted
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Sends a welcome message when the /start command is issued."""
+    """Sends a welcome message when the /start command is issued, starting a new conversation."""
+    engine: AuraEngine = context.bot_data["engine"]
+    if engine.conversation_memory is not None and update.effective_chat:
+        engine.conversation_memory.forget(update.effective_chat.id)
     user_name = update.effective_user.first_name if update.effective_user else "there"
     if update.message:
         await update.message.reply_text(
@@ -43,12 +71,29 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 @restricted
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handles user's questions by sending them to the AuraEngine."""
+    with (
+        request_context(update.update_id),
+        trace_request("telegram_update"),
+        HANDLER_SECONDS.time(),
+    ):
+        try:
+            await _answer(update, context)
+        except Exception:
+            ERRORS.inc(labels=("handler",))
+            journal: UpdateJournal | None = context.bot_data.get("update_journal")
+            if journal is not None:
+                # Answer it again after a restart, rather than never.
+                journal.fail(update)
+            raise
+
+
+async def _answer(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Asks the engine and replies, streaming the answer if enabled."""
     if not update.message or not update.message.text:
         return
-
     user_question = update.message.text
-    user_name = update.effective_user.first_name if update.effective_user else "unknown"
-    logger.info(f"Received question from user '{user_name}': {user_question}")
+    user_id = update.effective_user.id if update.effective_user else None
+    logger.info("Received question from user %s: %r", user_id, user_text(user_question))
 
     # Show "typing..." status in Telegram for better UX
     if update.effective_chat:
@@ -59,37 +104,243 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     # The engine is stored in the bot's context, so we can access it here.
     engine: AuraEngine = context.bot_data["engine"]
-    answer = await engine.get_response(user_question)
-    if update.message:
-        await update.message.reply_text(answer)
+    chat_id = update.effective_chat.id if update.effective_chat else None
+    settings = get_settings()
+    if not settings.stream_responses:
+        answer = await engine.get_response(user_question, chat_id=chat_id)
+        with span("reply"):
+            await update.message.reply_text(answer)
+        return
 
+    # Send the answer as soon as the first chunk arrives and keep editing it.
+    editor = ThrottledMessageEditor(
+        update.message.reply_text,
+        min_interval=settings.stream_edit_interval_seconds,
+    )
+    async for chunk in engine.stream_response(user_question, chat_id=chat_id):
+        await editor.append(chunk)
+    with span("reply"):
+        await editor.finish()
 
-def main() -> None:
-    """Starts the Telegram bot and waits for messages."""
+
+async def post_init(application: Application) -> None:
+    """Starts background services once the bot is initialized.
+
+    Runs before the first update is fetched, so it also waits for the engine
+    that ``build_application`` started building in the background.
+    """
     settings = get_settings()
+    engine_future: Future[AuraEngine] | None = application.bot_data.pop("engine_future", None)
+    if engine_future is not None:
+        application.bot_data["engine"] = await asyncio.wrap_future(engine_future)
+    engine: AuraEngine = application.bot_data["engine"]
+    configure_tracing(settings.trace_sample_rate)
+    if isinstance(application.update_queue, JournaledUpdateQueue):
+        # Queued ahead of the first poll, so the backlog is answered oldest first.
+        application.update_queue.replay(application.bot)
+    if hasattr(signal, "SIGHUP"):
+        # Re-read the allowlist and per-user limits without a restart.
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_allowlist)
+    # One pooled HTTP client serves every integration for the lifetime of the bot.
+    http_client = create_http_client(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        http2=settings.http2,
+    )
+    application.bot_data["http_client"] = http_client
+    home_assistant = HomeAssistantClient(
+        str(settings.home_assistant_url),
+        settings.home_assistant_token,
+        client=http_client,
+        state_ttl=settings.home_assistant_state_ttl_seconds,
+    )
+    application.bot_data["home_assistant"] = home_assistant
+    if settings.knowledge_base_reload_interval_seconds:
+        watcher = KnowledgeBaseWatcher(
+            settings.knowledge_base_path,
+            engine.reload_knowledge_base,
+            interval=settings.knowledge_base_reload_interval_seconds,
+            load=settings.load_knowledge_base,
+        )
+        watcher.start()
+        application.bot_data["knowledge_base_watcher"] = watcher
+    if settings.metrics_enabled:
+        REGISTRY.add_collector(engine_collector(engine))
+        if "knowledge_base_watcher" in application.bot_data:
+            REGISTRY.add_collector(
+                knowledge_base_watcher_collector(application.bot_data["knowledge_base_watcher"])
+            )
+        if isinstance(application.update_processor, PerChatUpdateProcessor):
+            REGISTRY.add_collector(update_processor_collector(application.update_processor))
+        REGISTRY.add_collector(home_assistant_collector(home_assistant))
+        metrics_server = MetricsServer(
+            REGISTRY, host=settings.metrics_listen, port=settings.metrics_port
+        )
+        await metrics_server.start()
+        application.bot_data["metrics_server"] = metrics_server
+    if settings.home_assistant_websocket:
+        mirror = HomeAssistantStateMirror(
+            str(settings.home_assistant_url),
+            settings.home_assistant_token,
+            max_staleness=settings.home_assistant_max_staleness_seconds,
+        )
+        mirror.start()
+        application.bot_data["home_assistant_mirror"] = mirror
+    if settings.home_assistant_context_entities:
+        source: StateSource = home_assistant
+        if "home_assistant_mirror" in application.bot_data:
+            # Serve readings from memory, and over REST while the mirror is out of sync.
+            source = FallbackStateSource(application.bot_data["home_assistant_mirror"], source)
+        engine.live_context = LiveContextProvider(
+            source,
+            settings.home_assistant_context_entities,
+            budget=settings.home_assistant_context_budget_seconds,
+            max_entities=settings.home_assistant_context_max_entities,
+        )
 
-    # --- Initialize Telegram Bot ---
-    logger.info("Starting bot...")
-    application = Application.builder().token(settings.telegram_token).build()
 
-    # --- Initialize Engine and add it to the bot's context ---
-    knowledge_base = settings.load_knowledge_base()
-    engine = AuraEngine(
-        gemini_api_key=settings.gemini_api_key,
-        knowledge_base=knowledge_base,
+async def post_shutdown(application: Application) -> None:
+    """Stops background services and releases engine resources once the bot has stopped."""
+    watcher: KnowledgeBaseWatcher | None = application.bot_data.get("knowledge_base_watcher")
+    if watcher:
+        await watcher.stop()
+    mirror: HomeAssistantStateMirror | None = application.bot_data.get("home_assistant_mirror")
+    if mirror:
+        await mirror.stop()
+    metrics_server: MetricsServer | None = application.bot_data.get("metrics_server")
+    if metrics_server:
+        await metrics_server.stop()
+    # The engine is missing if building it failed, which post_init has reported.
+    engine: AuraEngine | None = application.bot_data.get("engine")
+    if engine:
+        engine.close()
+    journal: UpdateJournal | None = application.bot_data.get("update_journal")
+    if journal:
+        journal.close()
+    http_client: httpx.AsyncClient | None = application.bot_data.get("http_client")
+    if http_client:
+        await http_client.aclose()
+
+
+def build_application(settings: Settings, *, request: BaseRequest | None = None) -> Application:
+    """Builds the bot application and starts building its engine in the background.
+
+    Importing the Gemini SDK and indexing the knowledge base take seconds on a
+    Raspberry Pi, so they run in a worker thread while the application connects
+    to Telegram. ``post_init`` waits for the engine before the first update is
+    fetched.
+
+    Args:
+        settings: The application settings.
+        request: Replaces the connection to the Bot API, e.g. with a fake in benchmarks.
+
+    Returns:
+        The application, ready to run.
+    """
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="engine")
+    engine_future = executor.submit(create_engine, settings)
+    executor.shutdown(wait=False)
+
+    journal = None
+    if settings.update_journal_path is not None:
+        journal = UpdateJournal(
+            settings.update_journal_path,
+            max_attempts=settings.update_journal_max_attempts,
+            max_age=settings.update_backlog_max_age_seconds,
+        )
+    update_processor = PerChatUpdateProcessor(
+        settings.update_workers,
+        max_queue_per_chat=settings.chat_queue_size,
+        overflow=settings.chat_queue_overflow,
+        merge_window=settings.chat_merge_window_seconds,
+        journal=journal,
     )
-    application.bot_data["engine"] = engine
+    builder = (
+        Application.builder()
+        .token(settings.telegram_token)
+        .concurrent_updates(update_processor)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
+    if journal is not None:
+        builder = builder.update_queue(JournaledUpdateQueue(journal))
+    if request is not None:
+        builder = builder.request(request).get_updates_request(request)
+    application = builder.build()
+    update_processor.bind(application)
+    application.bot_data["engine_future"] = engine_future
+    if journal is not None:
+        application.bot_data["update_journal"] = journal
+
+    def log_build(future: Future[AuraEngine]) -> None:
+        elapsed = time.perf_counter() - started
+        if future.cancelled() or future.exception() is not None:
+            logger.error("Building the engine failed after %.2fs.", elapsed)
+        else:
+            logger.info("Engine built in %.2fs.", elapsed)
+
+    engine_future.add_done_callback(log_build)
 
     # Register handlers
     application.add_handler(CommandHandler("start", start))
     application.add_handler(
         MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message),
     )
+    return application
+
+
+def main() -> None:
+    """Starts the Telegram bot and waits for messages."""
+    settings = get_settings()
+    # --- Setup logging ---
+    log_listener = configure_logging(
+        level=settings.log_level,
+        json_format=settings.log_format == "json",
+        sample_rates=settings.log_sample_rates,
+        message_bodies=settings.log_message_bodies,
+        message_max_chars=settings.log_message_max_chars,
+    )
+    # Set a higher log level for the httpx library to avoid noisy logs.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # --- Initialize Telegram Bot ---
+    logger.info("Starting bot...")
+    application = build_application(settings)
 
-    # Start the Bot, ignoring any updates that were missed while it was offline.
-    logger.info("Bot started and polling for updates...")
-    application.run_polling(drop_pending_updates=True)
-    logger.info("Bot stopped.")
+    # Start the Bot. Updates missed while it was offline are answered from the
+    # journal if there is one, and ignored otherwise.
+    # On SIGINT/SIGTERM, the application stops accepting updates and waits for
+    # the handlers already running to finish before shutting down.
+    drop_pending_updates = settings.update_journal_path is None
+    try:
+        if settings.telegram_update_mode == "webhook":
+            logger.info(
+                "Bot started and listening for webhook updates on %s:%s/%s...",
+                settings.webhook_listen,
+                settings.webhook_port,
+                settings.webhook_path,
+            )
+            application.run_webhook(
+                listen=settings.webhook_listen,
+                port=settings.webhook_port,
+                url_path=settings.webhook_path,
+                webhook_url=str(settings.webhook_url),
+                secret_token=settings.webhook_secret_token,
+                drop_pending_updates=drop_pending_updates,
+                stop_signals=(signal.SIGINT, signal.SIGTERM),
+            )
+        else:
+            logger.info("Bot started and polling for updates...")
+            application.run_polling(
+                drop_pending_updates=drop_pending_updates,
+                stop_signals=(signal.SIGINT, signal.SIGTERM),
+            )
+    finally:
+        logger.info("Bot stopped.")
+        # Write out the log lines still queued.
+        log_listener.stop()
 
 
 if __name__ == "__main__":
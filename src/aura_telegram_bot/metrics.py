@@ -0,0 +1,657 @@
+"""Prometheus-style metrics and per-request tracing.
+
+Metrics are plain in-process counters, gauges and histograms, cheap enough
+to leave on in production: recording a value is a dictionary lookup and an
+addition. Values that other components already count, such as cache hits,
+are read by collectors only when ``/metrics`` is scraped, so they cost
+nothing on the hot path. The text exposition format is rendered by hand, so
+no client library is needed.
+
+Tracing is off by default. When enabled, a sampled share of Telegram updates
+records a span for every stage between the update and the reply, and the
+whole trace is logged once the reply has been sent.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from aura_telegram_bot.core.engine import AuraEngine
+    from aura_telegram_bot.core.watcher import KnowledgeBaseWatcher
+    from aura_telegram_bot.dispatch import PerChatUpdateProcessor
+    from aura_telegram_bot.integrations.home_assistant import HomeAssistantClient
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets from 5 ms to 1 minute, in seconds.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+type LabelValues = tuple[str, ...]
+# A collected sample: metric name, metric type, help text and values by label pairs.
+type Sample = tuple[str, str, str, dict[tuple[tuple[str, str], ...], float]]
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value for the text exposition format."""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(pairs: Iterable[tuple[str, str]]) -> str:
+    """Renders label pairs as ``{name="value",...}``, or "" if there are none."""
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _format_value(value: float) -> str:
+    """Renders a sample value, using integers where possible."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """The name, help text and label names shared by all metric types."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        """Initializes the metric.
+
+        Args:
+            name: The metric name, e.g. "aura_handler_seconds".
+            documentation: The help text shown on ``/metrics``.
+            labelnames: The names of the labels, whose values are passed as ``labels``.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _label_pairs(self, values: LabelValues) -> tuple[tuple[str, str], ...]:
+        """Pairs label values with the label names."""
+        return tuple(zip(self.labelnames, values, strict=True))
+
+    def render(self) -> Iterator[str]:
+        """Yields the metric's lines in the text exposition format."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        yield from self._render_samples()
+
+    def _render_samples(self) -> Iterator[str]:
+        """Yields the metric's sample lines."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        """Initializes the counter at zero."""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        """Increases the counter of the given label values."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        """Returns the current count of the given label values."""
+        return self._values.get(labels, 0.0)
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self._label_pairs(labels))} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, such as the size of the last prompt."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        """Initializes the gauge at zero."""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {} if self.labelnames else {(): 0.0}
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        """Sets the gauge of the given label values."""
+        self._values[labels] = value
+
+    def value(self, labels: LabelValues = ()) -> float:
+        """Returns the current value of the given label values."""
+        return self._values.get(labels, 0.0)
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self._label_pairs(labels))} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    """The bucket counts, count and sum of one label combination."""
+
+    __slots__ = ("buckets", "count", "sum")
+
+    def __init__(self, size: int) -> None:
+        """Initializes empty buckets; the last one counts values above all bounds."""
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class _Timer:
+    """Observes the duration of a ``with`` block; a class, as it is cheaper than a generator."""
+
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues) -> None:
+        """Initializes the timer for one block."""
+        self._histogram = histogram
+        self._labels = labels
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        """Starts timing."""
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Observes the elapsed time, whether or not the block raised."""
+        self._histogram.observe(time.perf_counter() - self._started, self._labels)
+
+
+class Histogram(_Metric):
+    """Counts observations, such as latencies, in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initializes empty buckets.
+
+        Args:
+            name: The metric name.
+            documentation: The help text shown on ``/metrics``.
+            labelnames: The names of the labels.
+            buckets: The upper bounds of the buckets, in ascending order.
+        """
+        super().__init__(name, documentation, labelnames)
+        self._bounds = tuple(buckets)
+        self._series: dict[LabelValues, _HistogramSeries] = {}
+        if not self.labelnames:
+            self._series[()] = _HistogramSeries(len(self._bounds) + 1)
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        """Records one observation of the given label values."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _HistogramSeries(len(self._bounds) + 1)
+        series.buckets[bisect.bisect_left(self._bounds, value)] += 1
+        series.count += 1
+        series.sum += value
+
+    def time(self, labels: LabelValues = ()) -> _Timer:
+        """Returns a context manager that observes how long its block takes, in seconds."""
+        return _Timer(self, labels)
+
+    def count(self, labels: LabelValues = ()) -> int:
+        """Returns the number of observations of the given label values."""
+        series = self._series.get(labels)
+        return series.count if series is not None else 0
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, series in self._series.items():
+            pairs = self._label_pairs(labels)
+            cumulative = 0
+            for bound, count in zip((*self._bounds, float("inf")), series.buckets, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels((*pairs, ('le', le)))} {cumulative}"
+            yield f"{self.name}_count{_format_labels(pairs)} {series.count}"
+            yield f"{self.name}_sum{_format_labels(pairs)} {_format_value(series.sum)}"
+
+
+class Registry:
+    """Holds metrics and scrape-time collectors, and renders them for ``/metrics``."""
+
+    def __init__(self) -> None:
+        """Initializes an empty registry."""
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[Sample]]] = []
+
+    def register[M: _Metric](self, metric: M) -> M:
+        """Adds a metric and returns it.
+
+        Raises:
+            ValueError: If a metric with the same name is already registered.
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered.")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Adds a function that reports values when the metrics are scraped."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                logger.exception("Metrics collector failed.")
+                continue
+            for name, type_name, documentation, values in samples:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                lines.extend(
+                    f"{name}{_format_labels(pairs)} {_format_value(value)}"
+                    for pairs, value in values.items()
+                )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HANDLER_SECONDS = REGISTRY.register(
+    Histogram("aura_handler_seconds", "Time from a Telegram message to the complete reply."),
+)
+GEMINI_SECONDS = REGISTRY.register(
+    Histogram(
+        "aura_gemini_seconds",
+        "Duration of Gemini calls, including retries, excluding queue wait.",
+        ["mode"],
+    ),
+)
+MODEL_SECONDS = REGISTRY.register(
+    Histogram(
+        "aura_gemini_model_seconds",
+        "Duration of successful Gemini calls per model; streams until the first chunk.",
+        ["model", "mode"],
+    ),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.register(
+    Histogram("aura_gemini_queue_wait_seconds", "Time Gemini calls wait for a free slot."),
+)
+HOME_ASSISTANT_SECONDS = REGISTRY.register(
+    Histogram(
+        "aura_home_assistant_request_seconds",
+        "Duration of Home Assistant REST requests.",
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    ),
+)
+AUTH_REJECTIONS = REGISTRY.register(
+    Counter("aura_auth_rejections_total", "Updates ignored because the user is not allowed."),
+)
+AUTH_SHED = REGISTRY.register(
+    Counter(
+        "aura_auth_shed_total",
+        "Work shed by the auth layer: rate-limited updates and unlogged rejections.",
+        ["reason"],
+    ),
+)
+ERRORS = REGISTRY.register(
+    Counter("aura_errors_total", "Errors by the component that raised them.", ["component"]),
+)
+PROMPT_TOKENS = REGISTRY.register(
+    Gauge("aura_prompt_tokens", "Estimated tokens of the last prompt sent to Gemini."),
+)
+SYSTEM_INSTRUCTION_TOKENS = REGISTRY.register(
+    Gauge(
+        "aura_system_instruction_tokens",
+        "Estimated tokens of the static system instruction of the current knowledge base.",
+    ),
+)
+
+
+# --- Collectors ---
+
+
+def engine_collector(engine: AuraEngine) -> Callable[[], list[Sample]]:
+    """Returns a collector of the engine's cache, coalescing and scheduler counters."""
+
+    def collect() -> list[Sample]:
+        cache_requests = {
+            (("cache", "answer"), ("result", "hit")): engine.answer_cache.hits,
+            (("cache", "answer"), ("result", "miss")): engine.answer_cache.misses,
+        }
+        if engine.semantic_cache is not None:
+            cache_requests[(("cache", "semantic"), ("result", "hit"))] = engine.semantic_cache.hits
+            cache_requests[(("cache", "semantic"), ("result", "miss"))] = (
+                engine.semantic_cache.misses
+            )
+        scheduler = engine.scheduler
+        samples: list[Sample] = [
+            ("aura_cache_requests_total", "counter", "Answer cache lookups.", cache_requests),
+            (
+                "aura_llm_calls_avoided_total",
+                "counter",
+                "Questions answered by the intent router or the semantic cache.",
+                {(): engine.llm_calls_avoided},
+            ),
+            (
+                "aura_coalesced_requests_total",
+                "counter",
+                "Questions that shared an identical question's Gemini call.",
+                {(): engine.single_flight.shared},
+            ),
+            ("aura_gemini_active", "gauge", "Gemini calls running.", {(): scheduler.active}),
+            ("aura_gemini_queued", "gauge", "Gemini calls waiting.", {(): scheduler.queued}),
+            (
+                "aura_gemini_rejected_total",
+                "counter",
+                "Gemini calls shed because the queue was full.",
+                {(): scheduler.rejected},
+            ),
+            (
+                "aura_gemini_retries_total",
+                "counter",
+                "Retried Gemini calls.",
+                {(): scheduler.retries},
+            ),
+            (
+                "aura_gemini_hedges_total",
+                "counter",
+                "Gemini calls passed on to the next model because the previous one was late "
+                "or failed, and how often the next model answered first.",
+                {
+                    (("event", "late"),): engine.hedger.hedges,
+                    (("event", "failed"),): engine.hedger.fallbacks,
+                    (("event", "won"),): engine.hedger.hedge_wins,
+                },
+            ),
+        ]
+        if engine.conversation_memory is not None:
+            samples.append(
+                (
+                    "aura_conversations",
+                    "gauge",
+                    "Chats with a remembered conversation.",
+                    {(): len(engine.conversation_memory)},
+                ),
+            )
+        return samples
+
+    return collect
+
+
+def home_assistant_collector(client: HomeAssistantClient) -> Callable[[], list[Sample]]:
+    """Returns a collector of the Home Assistant state cache counters."""
+
+    def collect() -> list[Sample]:
+        cache = client.state_cache
+        return [
+            (
+                "aura_home_assistant_cache_requests_total",
+                "counter",
+                "Home Assistant state cache lookups.",
+                {(("result", "hit"),): cache.hits, (("result", "miss"),): cache.misses},
+            ),
+        ]
+
+    return collect
+
+
+def knowledge_base_watcher_collector(
+    watcher: KnowledgeBaseWatcher,
+) -> Callable[[], list[Sample]]:
+    """Returns a collector of the knowledge base reloads and how long the last one took."""
+
+    def collect() -> list[Sample]:
+        samples: list[Sample] = [
+            (
+                "aura_knowledge_base_reloads_total",
+                "counter",
+                "Knowledge base reloads by result.",
+                {
+                    (("result", "success"),): watcher.reloads,
+                    (("result", "failure"),): watcher.failures,
+                },
+            ),
+        ]
+        if watcher.last_reload_seconds is not None:
+            samples.append(
+                (
+                    "aura_knowledge_base_last_reload_seconds",
+                    "gauge",
+                    "Time taken by the last successful knowledge base reload.",
+                    {(): watcher.last_reload_seconds},
+                ),
+            )
+        return samples
+
+    return collect
+
+
+def update_processor_collector(processor: PerChatUpdateProcessor) -> Callable[[], list[Sample]]:
+    """Returns a collector of the update processor's counters and per-chat queue depth."""
+
+    def collect() -> list[Sample]:
+        queued = [length for length in processor.queue_lengths.values() if length]
+        return [
+            (
+                "aura_updates_total",
+                "counter",
+                "Telegram updates by outcome.",
+                {
+                    (("outcome", "processed"),): processor.processed,
+                    (("outcome", "dropped"),): processor.dropped,
+                    (("outcome", "merged"),): processor.merged,
+                },
+            ),
+            (
+                "aura_update_queue_length",
+                "gauge",
+                "Updates waiting behind the one being handled, across all chats.",
+                {(): sum(queued)},
+            ),
+            (
+                "aura_update_queue_length_max",
+                "gauge",
+                "Updates waiting in the most backed-up chat.",
+                {(): max(queued, default=0)},
+            ),
+            (
+                "aura_update_queues_busy",
+                "gauge",
+                "Chats with updates waiting.",
+                {(): len(queued)},
+            ),
+        ]
+
+    return collect
+
+
+# --- Tracing ---
+
+
+class Span:
+    """One timed stage of a request, relative to the start of its trace."""
+
+    __slots__ = ("name", "offset", "seconds")
+
+    def __init__(self, name: str, offset: float, seconds: float) -> None:
+        """Initializes the span."""
+        self.name = name
+        self.offset = offset
+        self.seconds = seconds
+
+
+class RequestTrace:
+    """The spans recorded while handling one request."""
+
+    def __init__(self, name: str) -> None:
+        """Starts the trace now."""
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+
+    def describe(self) -> str:
+        """Returns a one-line rendering of the spans, e.g. for a log line."""
+        return ", ".join(
+            f"{span.name}@{span.offset * 1000:.1f}ms={span.seconds * 1000:.1f}ms"
+            for span in self.spans
+        )
+
+
+_current_trace: contextvars.ContextVar[RequestTrace | None] = contextvars.ContextVar(
+    "aura_trace", default=None
+)
+_trace_sample_rate = 0.0
+
+
+def configure_tracing(sample_rate: float) -> None:
+    """Sets the share of requests that are traced, between 0 (off) and 1 (all)."""
+    global _trace_sample_rate
+    _trace_sample_rate = sample_rate
+
+
+@contextlib.contextmanager
+def trace_request(name: str) -> Iterator[RequestTrace | None]:
+    """Traces the enclosed request if it is sampled, logging its spans at the end.
+
+    Yields:
+        The trace, or None if the request is not traced.
+    """
+    if not _trace_sample_rate or random.random() >= _trace_sample_rate:  # noqa: S311
+        yield None
+        return
+    trace = RequestTrace(name)
+    token = _current_trace.set(trace)
+    try:
+        with span(name):
+            yield trace
+    finally:
+        _current_trace.reset(token)
+        logger.info("Trace %s: %s", name, trace.describe())
+
+
+class _SpanTimer:
+    """Records the duration of a ``with`` block as a span of a trace."""
+
+    __slots__ = ("_name", "_started", "_trace")
+
+    def __init__(self, name: str, trace: RequestTrace) -> None:
+        """Initializes the timer for one block."""
+        self._name = name
+        self._trace = trace
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        """Starts timing."""
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Appends the span to the trace, whether or not the block raised."""
+        seconds = time.perf_counter() - self._started
+        self._trace.spans.append(
+            Span(self._name, self._started - self._trace.started, seconds),
+        )
+
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+def span(name: str) -> contextlib.AbstractContextManager[None]:
+    """Returns a context manager recording its block as a span of the current trace.
+
+    Without a current trace, a shared no-op context manager is returned, so
+    untraced requests pay only for a context variable lookup.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _SpanTimer(name, trace)
+
+
+# --- Endpoint ---
+
+
+class MetricsServer:
+    """Serves the registry on ``GET /metrics`` over plain HTTP.
+
+    The server is meant for a local scraper, so it binds to localhost by
+    default and answers one request per connection.
+    """
+
+    def __init__(
+        self,
+        registry: Registry = REGISTRY,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 9464,
+    ) -> None:
+        """Initializes the server.
+
+        Args:
+            registry: The metrics to serve.
+            host: The address to listen on.
+            port: The port to listen on; 0 picks a free one.
+        """
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port(self) -> int:
+        """The port the server listens on, once started."""
+        if self._server is None or not self._server.sockets:
+            return self._port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        """Starts listening for scrapes."""
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+        logger.info("Serving metrics on http://%s:%d/metrics.", self._host, self.port)
+
+    async def stop(self) -> None:
+        """Stops listening and waits for the server to close."""
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answers one HTTP request with the metrics or a 404."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Skip the headers; the request has no body worth reading.
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            method, _, rest = request_line.decode("latin-1").partition(" ")
+            path = rest.split(" ", 1)[0].split("?", 1)[0]
+            if method == "GET" and path == "/metrics":
+                status = "200 OK"
+                body = self._registry.render().encode("utf-8")
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+            head = (
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1") + body)
+            await writer.drain()
+        except (TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
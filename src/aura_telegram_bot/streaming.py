@@ -0,0 +1,108 @@
+"""Progressive rendering of streamed answers into Telegram messages."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Protocol
+
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages longer than this many characters.
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class EditableMessage(Protocol):
+    """The part of a Telegram message the editor needs."""
+
+    async def edit_text(self, text: str) -> object:
+        """Replaces the text of the message."""
+        ...
+
+
+class ThrottledMessageEditor:
+    """Shows a streamed answer by sending a message and then editing it as text arrives.
+
+    Edits are throttled to at most one per ``min_interval`` seconds to stay
+    within Telegram's rate limits. Text longer than a single message is
+    continued in new messages.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[EditableMessage]],
+        *,
+        min_interval: float = 1.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initializes the editor.
+
+        Args:
+            send: Sends a new message with the given text, e.g. ``message.reply_text``.
+            min_interval: The minimum number of seconds between two updates.
+            clock: The monotonic time source.
+        """
+        self._send = send
+        self._min_interval = min_interval
+        self._clock = clock
+        self._text = ""
+        self._messages: list[EditableMessage] = []
+        self._rendered: list[str] = []
+        self._next_update_at = 0.0
+        self.edits = 0
+
+    @property
+    def text(self) -> str:
+        """The full text received so far."""
+        return self._text
+
+    async def append(self, chunk: str) -> None:
+        """Adds a chunk of text, updating Telegram if the throttle allows it."""
+        self._text += chunk
+        if self._clock() >= self._next_update_at:
+            await self._render()
+
+    async def finish(self, max_attempts: int = 3) -> None:
+        """Renders the complete text, waiting out the throttle if necessary.
+
+        Args:
+            max_attempts: How many times to retry if Telegram asks to slow down.
+        """
+        for _ in range(max_attempts):
+            if "".join(self._rendered) == self._text:
+                return
+            delay = self._next_update_at - self._clock()
+            if delay > 0 and self._messages:
+                await asyncio.sleep(delay)
+            await self._render()
+
+    async def _render(self) -> None:
+        """Brings the Telegram messages in line with the text received so far."""
+        pages = [
+            self._text[start : start + TELEGRAM_MAX_MESSAGE_LENGTH]
+            for start in range(0, len(self._text), TELEGRAM_MAX_MESSAGE_LENGTH)
+        ]
+        try:
+            for i, page in enumerate(pages):
+                if i == len(self._messages):
+                    self._messages.append(await self._send(page))
+                    self._rendered.append(page)
+                elif self._rendered[i] != page:
+                    await self._messages[i].edit_text(page)
+                    self._rendered[i] = page
+                    self.edits += 1
+        except RetryAfter as e:
+            logger.warning("Telegram asked to slow down edits for %s seconds.", e.retry_after)
+            retry_after = e.retry_after
+            if isinstance(retry_after, dt.timedelta):
+                retry_after = retry_after.total_seconds()
+            self._next_update_at = self._clock() + retry_after
+            return
+        except BadRequest as e:
+            logger.warning("Telegram rejected a message edit: %s", e)
+        self._next_update_at = self._clock() + self._min_interval
@@ -0,0 +1,121 @@
+"""Unit tests for the answer cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from aura_telegram_bot.core.cache import AnswerCache, normalize_question
+
+
+class FakeClock:
+    """A manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Starts the clock at an arbitrary point in time."""
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        """Returns the current fake time."""
+        return self.now
+
+
+def test_normalize_question_ignores_case_punctuation_and_whitespace() -> None:
+    """Verify that trivial variations of a question normalize to the same key."""
+    assert normalize_question("  What does F2 mean?? ") == normalize_question("what does f2 mean")
+    assert normalize_question("Jak přepnout na ECO?") == "jak přepnout na eco"
+
+
+def test_cache_hit_and_miss_counters() -> None:
+    """Verify that hits and misses are counted and normalized questions match."""
+    # Arrange
+    cache = AnswerCache()
+    cache.bind("kb-v1")
+
+    # Act
+    first = cache.get("What does F2 mean?")
+    cache.put("What does F2 mean?", "Overheating.")
+    second = cache.get("what does f2 mean")
+
+    # Assert
+    assert first is None
+    assert second == "Overheating."
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_expires_entries_after_ttl() -> None:
+    """Verify that an entry is no longer served once its TTL has passed."""
+    # Arrange
+    clock = FakeClock()
+    cache = AnswerCache(ttl=60, clock=clock)
+    cache.put("question", "answer")
+
+    # Act
+    clock.now += 61
+
+    # Assert
+    assert cache.get("question") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used_entry() -> None:
+    """Verify that the least recently used entry is evicted when full."""
+    # Arrange
+    cache = AnswerCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+
+    # Act
+    cache.put("c", "3")
+
+    # Assert
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_bind_to_new_knowledge_base_drops_answers() -> None:
+    """Verify that changing the knowledge base fingerprint invalidates the cache."""
+    # Arrange
+    cache = AnswerCache()
+    cache.bind("kb-v1")
+    cache.put("question", "old answer")
+
+    # Act
+    cache.bind("kb-v2")
+
+    # Assert
+    assert cache.get("question") is None
+
+
+def test_cache_survives_restart_only_for_same_knowledge_base(tmp_path: Path) -> None:
+    """Verify that persisted answers are reloaded, unless the knowledge base changed."""
+    # Arrange
+    path = tmp_path / "cache" / "answers.json"
+    cache = AnswerCache(path=path)
+    cache.bind("kb-v1")
+    cache.put("question", "answer")
+
+    # Act
+    cache.save()
+    same_kb = AnswerCache(path=path)
+    same_kb.bind("kb-v1")
+    changed_kb = AnswerCache(path=path)
+    changed_kb.bind("kb-v2")
+
+    # Assert
+    assert same_kb.get("question") == "answer"
+    assert changed_kb.get("question") is None
+
+
+def test_cache_ignores_corrupt_file(tmp_path: Path) -> None:
+    """Verify that an unreadable persistence file leaves the cache empty."""
+    # Arrange
+    path = tmp_path / "answers.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    # Act
+    cache = AnswerCache(path=path)
+
+    # Assert
+    assert len(cache) == 0
@@ -0,0 +1,149 @@
+"""Unit tests for the lazily loaded corpus of knowledge base documents."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from aura_telegram_bot.core.corpus import Corpus
+
+BOILER = """---
+device: Vitodens 111-F boiler
+keywords: boiler, gas
+default: true
+---
+Viessmann Vitodens 111-F - Technical Summary
+
+## Common Fault Codes
+
+- **Fault Code F2:** Burner lockout due to overheating. Check the pressure.
+- **Fault Code F4:** Flame failure. Check the gas supply.
+
+## Routine Maintenance
+
+- **Annual Service:** Have the boiler serviced annually.
+"""
+
+HEAT_PUMP = """---
+device: Vitocal 200-S heat pump
+keywords: heat pump, compressor, defrost
+---
+## Defrosting
+
+The outdoor unit defrosts itself when ice builds up on the evaporator.
+
+## Compressor Faults
+
+- **Fault Code A9:** The compressor is overloaded. Check the airflow.
+"""
+
+VENTILATION = """## Filters
+
+Replace the ventilation filters every six months.
+"""
+
+
+def write_corpus(directory: Path) -> Path:
+    """Writes a corpus of three device documents and returns its directory."""
+    (directory / "boiler.md").write_text(BOILER, encoding="utf-8")
+    (directory / "heat_pump.md").write_text(HEAT_PUMP, encoding="utf-8")
+    (directory / "ventilation.txt").write_text(VENTILATION, encoding="utf-8")
+    (directory / "notes.pdf").write_bytes(b"%PDF-1.4")
+    return directory
+
+
+def test_open_reads_front_matter_without_loading_documents(tmp_path: Path) -> None:
+    """Verify that opening a directory only collects document metadata."""
+    # Act
+    corpus = Corpus.open(write_corpus(tmp_path))
+
+    # Assert
+    assert [info.device for info in corpus.documents] == [
+        "Vitodens 111-F boiler",
+        "Vitocal 200-S heat pump",
+        "ventilation",
+    ]
+    assert corpus.documents[0].default
+    assert corpus.documents[1].keywords == ("heat pump", "compressor", "defrost")
+    assert corpus.loads == 0
+    assert corpus.resident_bytes == 0
+
+
+def test_questions_select_documents_by_device_and_keywords(tmp_path: Path) -> None:
+    """Verify that a question naming a device goes to its document, others to the default."""
+    # Arrange
+    corpus = Corpus.open(write_corpus(tmp_path))
+
+    # Act
+    heat_pump = corpus.select("Why does the heat pump defrost so often?")
+    ventilation = corpus.select("When should I change the ventilation filters?")
+    generic = corpus.select("What does F2 mean?")
+
+    # Assert
+    assert [info.path.name for info in heat_pump] == ["heat_pump.md"]
+    assert [info.path.name for info in ventilation] == ["ventilation.txt"]
+    assert [info.path.name for info in generic] == ["boiler.md"]
+
+
+def test_build_context_loads_only_the_selected_document(tmp_path: Path) -> None:
+    """Verify that retrieval materializes the matching document and labels its device."""
+    # Arrange
+    corpus = Corpus.open(write_corpus(tmp_path))
+
+    # Act
+    context = corpus.build_context(
+        "What does compressor fault A9 on the heat pump mean?", top_k=1, token_budget=200
+    )
+
+    # Assert
+    assert context.startswith("# Vitocal 200-S heat pump\n\n## Compressor Faults")
+    assert "overloaded" in context
+    assert "Defrosting" not in context
+    assert corpus.loads == 1
+    assert corpus.is_loaded("heat pump")
+    assert not corpus.is_loaded("boiler")
+
+
+def test_resident_documents_stay_within_the_budget(tmp_path: Path) -> None:
+    """Verify that the least recently used documents are evicted over the size budget."""
+    # Arrange
+    corpus = Corpus.open(write_corpus(tmp_path), max_resident_bytes=450)
+
+    # Act
+    corpus.load("boiler")
+    corpus.load("heat pump")
+    corpus.load("ventilation")
+    corpus.load("heat pump")
+
+    # Assert
+    assert corpus.loads == 3
+    assert corpus.evictions == 1
+    assert corpus.resident_bytes <= 450
+    assert corpus.is_loaded("heat pump")
+    assert not corpus.is_loaded("boiler")
+
+
+def test_router_answers_lookups_from_the_selected_document(tmp_path: Path) -> None:
+    """Verify that lookup questions are routed within the document chosen for them."""
+    # Arrange
+    router = Corpus.open(write_corpus(tmp_path)).router(threshold=0.5)
+
+    # Act
+    match = router.match("What is fault A9 on the heat pump?")
+
+    # Assert
+    assert match is not None
+    assert match.route.answer.startswith("Fault Code A9: The compressor is overloaded.")
+
+
+def test_fingerprint_changes_when_a_document_changes(tmp_path: Path) -> None:
+    """Verify that the corpus version follows the files, without reading them."""
+    # Arrange
+    directory = write_corpus(tmp_path)
+    before = Corpus.open(directory).fingerprint
+
+    # Act
+    (directory / "ventilation.txt").write_text(VENTILATION + "\nMore.", encoding="utf-8")
+    after = Corpus.open(directory).fingerprint
+
+    # Assert
+    assert before != after
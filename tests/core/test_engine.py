@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from _pytest.logging import LogCaptureFixture
 
-from aura_telegram_bot.core.engine import AuraEngine
+from aura_telegram_bot.core.corpus import Corpus
+from aura_telegram_bot.core.engine import AuraEngine, ResponseStats
+from aura_telegram_bot.core.hedging import Hedger
+from aura_telegram_bot.core.live_context import LiveContextProvider
+from aura_telegram_bot.core.memory import ConversationMemory
+from aura_telegram_bot.core.scheduler import RequestScheduler
+from aura_telegram_bot.metrics import GEMINI_SECONDS, engine_collector
 
 # Mark all tests in this file as asyncio, since our engine is async
 pytestmark = pytest.mark.asyncio
@@ -32,15 +41,18 @@ async def test_get_response_uses_gemini_api_successfully(mock_genai: MagicMock)
     # Assert
     # 1. Verify initialization
     mock_genai.configure.assert_called_once_with(api_key="fake-api-key")
-    mock_genai.GenerativeModel.assert_called_once_with("gemini-1.5-flash")
+    mock_genai.GenerativeModel.assert_called_once()
+    model_args, model_kwargs = mock_genai.GenerativeModel.call_args
+    assert model_args == ("gemini-1.5-flash",)
+    system_instruction = model_kwargs["system_instruction"]
+    assert "You are a helpful and polite expert assistant" in system_instruction
+    assert "Test knowledge base." in system_instruction
 
-    # 2. Verify API call
+    # 2. Verify API call: the static prefix is not repeated in the prompt
     mock_genai.GenerativeModel.return_value.generate_content_async.assert_called_once()
     call_args, _ = mock_genai.GenerativeModel.return_value.generate_content_async.call_args
     sent_prompt = call_args[0]
-    assert "Test knowledge base." in sent_prompt
-    assert "What is the test question?" in sent_prompt
-    assert "You are a helpful and polite expert assistant" in sent_prompt
+    assert sent_prompt == 'User Question: "What is the test question?"'
 
     # 3. Verify final response
     assert actual_response == "Mocked Gemini Response"
@@ -88,3 +100,552 @@ async def test_get_response_handles_malformed_api_response(mock_genai: MagicMock
 
     # Assert
     assert "Sorry, I couldn't generate a response" in actual_response
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_sends_only_relevant_sections(mock_genai: MagicMock) -> None:
+    """Verify that a knowledge base over budget is narrowed down to matching sections."""
+    # Arrange
+    mock_genai.GenerativeModel.return_value.generate_content_async.return_value = SimpleNamespace(
+        text="Answer",
+    )
+    knowledge_base = "\n\n".join(
+        f"## Topic {i}\n\n{'filler ' * 50}{'The boiler pressure is 1.5 bar.' if i == 7 else ''}"
+        for i in range(20)
+    )
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base=knowledge_base,
+        top_k=1,
+        token_budget=200,
+    )
+
+    # Act
+    await engine.get_response("What pressure should the boiler have?")
+
+    # Assert
+    call_args, _ = mock_genai.GenerativeModel.return_value.generate_content_async.call_args
+    sent_prompt = call_args[0]
+    assert "## Topic 7" in sent_prompt
+    assert "## Topic 8" not in sent_prompt
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_serves_repeated_questions_from_cache(mock_genai: MagicMock) -> None:
+    """Verify that a repeated question does not trigger a second Gemini call."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.return_value = SimpleNamespace(text="Overheating.")
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+
+    # Act
+    first = await engine.get_response("What does F2 mean?")
+    second = await engine.get_response("what does f2 mean")
+
+    # Assert
+    assert first == second == "Overheating."
+    generate.assert_called_once()
+    assert engine.answer_cache.hits == 1
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_reports_the_source_and_prompt_size(mock_genai: MagicMock) -> None:
+    """Verify that the stats tell a model answer with its prompt from a cached one."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.return_value = SimpleNamespace(text="Overheating.")
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+    first, second = ResponseStats(), ResponseStats()
+
+    # Act
+    await engine.get_response("What does F2 mean?", stats=first)
+    await engine.get_response("What does F2 mean?", stats=second)
+
+    # Assert
+    assert first.source == "model"
+    assert first.prompt_tokens > 0
+    assert "model" in first.stages
+    assert second.source == "cache"
+    assert second.prompt_tokens == 0
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_a_slow_primary_model_is_hedged_with_a_fallback(mock_genai: MagicMock) -> None:
+    """Verify that a late primary model is raced by the fallback model, whose answer wins."""
+    # Arrange
+    models = {"primary": MagicMock(), "fallback": MagicMock()}
+    mock_genai.GenerativeModel.side_effect = lambda name, **kwargs: models[name]
+
+    async def stall(prompt: str) -> SimpleNamespace:
+        await asyncio.sleep(10)
+        return SimpleNamespace(text="Too late.")
+
+    models["primary"].generate_content_async = stall
+    models["fallback"].generate_content_async = AsyncMock(
+        return_value=SimpleNamespace(text="Overheating."),
+    )
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        model_name="primary",
+        fallback_models=["fallback"],
+        hedger=Hedger(initial_delay=0.01),
+    )
+
+    # Act
+    answer = await engine.get_response("What does F2 mean?")
+
+    # Assert
+    assert answer == "Overheating."
+    assert engine.hedger.hedge_wins == 1
+    system_instruction = mock_genai.GenerativeModel.call_args.kwargs["system_instruction"]
+    assert "Test knowledge base." in system_instruction
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_does_not_cache_errors(mock_genai: MagicMock) -> None:
+    """Verify that a failed Gemini call is retried on the next identical question."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = [Exception("boom"), SimpleNamespace(text="Recovered.")]
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+
+    # Act
+    first = await engine.get_response("question")
+    second = await engine.get_response("question")
+
+    # Assert
+    assert "Sorry, I encountered an error" in first
+    assert second == "Recovered."
+    assert generate.call_count == 2
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_coalesces_concurrent_identical_questions(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that simultaneous identical questions trigger a single Gemini call."""
+    # Arrange
+    release = asyncio.Event()
+
+    async def slow_generate(prompt: str) -> SimpleNamespace:
+        await release.wait()
+        return SimpleNamespace(text="Flame failure.")
+
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = slow_generate
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+
+    # Act
+    waiters = [
+        asyncio.create_task(engine.get_response(question))
+        for question in ("What is F4?", "what is f4", "WHAT IS F4 ?")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    answers = await asyncio.gather(*waiters)
+
+    # Assert
+    assert answers == ["Flame failure."] * 3
+    generate.assert_called_once()
+    assert engine.single_flight.shared == 2
+
+
+class FakeStream:
+    """A stand-in for the SDK's streamed response."""
+
+    def __init__(self, chunks: list[str]) -> None:
+        """Stores the chunks to yield."""
+        self._chunks = chunks
+
+    async def __aiter__(self) -> AsyncIterator[SimpleNamespace]:
+        """Yields the chunks in order."""
+        for chunk in self._chunks:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(text=chunk)
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_stream_response_coalesces_concurrent_identical_questions(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that identical questions streamed at once share one Gemini stream."""
+    # Arrange
+    release = asyncio.Event()
+
+    async def slow_generate(prompt: str, stream: bool = False) -> FakeStream:
+        await release.wait()
+        return FakeStream(["Flame ", "failure."])
+
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = slow_generate
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+
+    async def ask(question: str) -> str:
+        return "".join([chunk async for chunk in engine.stream_response(question)])
+
+    # Act
+    waiters = [asyncio.create_task(ask(question)) for question in ("What is F4?", "what is f4")]
+    waiters.append(asyncio.create_task(engine.get_response("WHAT IS F4 ?")))
+    await asyncio.sleep(0.01)
+    release.set()
+    answers = await asyncio.gather(*waiters)
+
+    # Assert
+    assert answers == ["Flame failure."] * 3
+    generate.assert_called_once()
+    assert engine.single_flight.shared == 2
+    assert len(engine.single_flight) == 0
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_stream_response_yields_chunks_in_order_and_caches_answer(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that streamed chunks are passed through in order and then cached."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.return_value = FakeStream(["Press ", "MODE ", "for 3 seconds."])
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+
+    # Act
+    chunks = [chunk async for chunk in engine.stream_response("How to switch mode?")]
+    cached = [chunk async for chunk in engine.stream_response("how to switch mode")]
+
+    # Assert
+    assert chunks == ["Press ", "MODE ", "for 3 seconds."]
+    assert cached == ["Press MODE for 3 seconds."]
+    generate.assert_called_once()
+    assert generate.call_args.kwargs == {"stream": True}
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_stream_response_reports_errors_as_final_chunk(mock_genai: MagicMock) -> None:
+    """Verify that an API failure while streaming ends with the polite error message."""
+    # Arrange
+    mock_genai.GenerativeModel.return_value.generate_content_async.side_effect = Exception("down")
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+
+    # Act
+    chunks = [chunk async for chunk in engine.stream_response("any question")]
+
+    # Assert
+    assert len(chunks) == 1
+    assert "Sorry, I encountered an error" in chunks[0]
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_context_cache_mode_sends_only_the_question(mock_genai: MagicMock) -> None:
+    """Verify that the knowledge base is uploaded to the context cache once."""
+    # Arrange
+    cached_model = mock_genai.GenerativeModel.from_cached_content.return_value
+    cached_model.generate_content_async = AsyncMock(
+        return_value=SimpleNamespace(text="Cached answer"),
+    )
+
+    # Act
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        model_name="gemini-1.5-flash-002",
+        context_cache_ttl=600,
+    )
+    answer = await engine.get_response("What is F2?")
+    engine.close()
+
+    # Assert
+    create_kwargs = mock_genai.caching.CachedContent.create.call_args.kwargs
+    assert create_kwargs["model"] == "gemini-1.5-flash-002"
+    assert "Test knowledge base." in create_kwargs["system_instruction"]
+    cached_model.generate_content_async.assert_called_once_with('User Question: "What is F2?"')
+    assert answer == "Cached answer"
+    mock_genai.caching.CachedContent.create.return_value.delete.assert_called_once()
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_context_cache_failure_falls_back_to_regular_model(mock_genai: MagicMock) -> None:
+    """Verify that the engine still works when the context cache cannot be created."""
+    # Arrange
+    mock_genai.caching.CachedContent.create.side_effect = Exception("too few tokens")
+    mock_genai.GenerativeModel.return_value.generate_content_async.return_value = SimpleNamespace(
+        text="Regular answer",
+    )
+
+    # Act
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        context_cache_ttl=600,
+    )
+    answer = await engine.get_response("What is F2?")
+
+    # Assert
+    assert answer == "Regular answer"
+    mock_genai.GenerativeModel.from_cached_content.assert_not_called()
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_reload_knowledge_base_swaps_snapshot_and_invalidates_cache(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that a reload rebuilds the prefix and drops answers from the old version."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = [SimpleNamespace(text="Old answer"), SimpleNamespace(text="New answer")]
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Old knowledge base.")
+    old_version = engine.knowledge_base_version
+    await engine.get_response("question")
+
+    # Act
+    changed = await engine.reload_knowledge_base("New knowledge base.")
+    unchanged = await engine.reload_knowledge_base("New knowledge base.")
+    answer = await engine.get_response("question")
+
+    # Assert
+    assert (changed, unchanged) == (True, False)
+    assert engine.knowledge_base_version != old_version
+    assert answer == "New answer"
+    last_instruction = mock_genai.GenerativeModel.call_args.kwargs["system_instruction"]
+    assert "New knowledge base." in last_instruction
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_sheds_load_when_queue_is_full(mock_genai: MagicMock) -> None:
+    """Verify that a polite busy message is returned when no call can be queued."""
+    # Arrange
+    release = asyncio.Event()
+
+    async def slow_generate(prompt: str) -> SimpleNamespace:
+        await release.wait()
+        return SimpleNamespace(text="Answer")
+
+    mock_genai.GenerativeModel.return_value.generate_content_async.side_effect = slow_generate
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        scheduler=RequestScheduler(max_concurrency=1, max_queue=0),
+    )
+    first = asyncio.create_task(engine.get_response("first question"))
+    await asyncio.sleep(0)
+
+    # Act
+    second = await engine.get_response("second question")
+    release.set()
+
+    # Assert
+    assert "answering a lot of questions" in second
+    assert await first == "Answer"
+    assert engine.scheduler.rejected == 1
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_get_response_includes_live_readings_and_caches_per_reading(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that live readings reach the prompt and key the answer cache."""
+    # Arrange
+    readings = ["- Boiler pressure: 1.4 bar", "- Boiler pressure: 0.6 bar"]
+    live_context = MagicMock(spec=LiveContextProvider)
+    live_context.fetch = AsyncMock(side_effect=[readings[0], readings[0], readings[1]])
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = [
+        SimpleNamespace(text="Pressure is fine."),
+        SimpleNamespace(text="Low."),
+    ]
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        live_context=live_context,
+    )
+
+    # Act
+    answers = [await engine.get_response("Is the pressure OK?") for _ in range(3)]
+
+    # Assert
+    assert answers == ["Pressure is fine.", "Pressure is fine.", "Low."]
+    assert generate.call_count == 2
+    first_prompt = generate.call_args_list[0].args[0]
+    assert "--- Live Readings Start ---\n- Boiler pressure: 1.4 bar" in first_prompt
+    assert first_prompt.endswith('User Question: "Is the pressure OK?"')
+    assert engine.timings.counts["live_context"] == 3
+    assert engine.timings.counts["model"] == 2
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_lookup_questions_are_answered_without_gemini(mock_genai: MagicMock) -> None:
+    """Verify that the intent router answers a fault code question locally."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.return_value = SimpleNamespace(text="Model answer.")
+    knowledge_base = "## Common Fault Codes\n\n- **Fault Code F4:** Flame failure.\n"
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base=knowledge_base)
+
+    # Act
+    routed = await engine.get_response("What is fault F4?")
+    streamed = [chunk async for chunk in engine.stream_response("what does F4 mean")]
+    fallback = await engine.get_response("Why does F4 keep coming back every morning?")
+
+    # Assert
+    assert routed == "Fault Code F4: Flame failure."
+    assert streamed == [routed]
+    assert fallback == "Model answer."
+    generate.assert_called_once()
+    assert engine.llm_calls_avoided == 2
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_similar_questions_are_answered_from_the_semantic_cache(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that a reworded question reuses an answer, but not when live readings apply."""
+    # Arrange
+    semantic_cache = pytest.importorskip("aura_telegram_bot.core.semantic_cache")
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = [SimpleNamespace(text="Open the filling loop.")]
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        semantic_cache=semantic_cache.SemanticCache(),
+    )
+
+    # Act
+    first = await engine.get_response("How to top up boiler pressure")
+    second = await engine.get_response("How do I top up the pressure?")
+    streamed = [chunk async for chunk in engine.stream_response("how can I top up pressure")]
+
+    # Assert
+    assert first == second == "Open the filling loop."
+    assert streamed == [first]
+    generate.assert_called_once()
+    assert engine.semantic_cache is not None
+    assert engine.semantic_cache.hits == 2
+    assert engine.llm_calls_avoided == 2
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_follow_up_questions_are_sent_with_the_conversation(mock_genai: MagicMock) -> None:
+    """Verify that a chat's earlier turns reach the prompt and are not shared with other chats."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = [
+        SimpleNamespace(text="The pressure is too low."),
+        FakeStream(["Open the ", "filling loop."]),
+        SimpleNamespace(text="Fix what?"),
+    ]
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        conversation_memory=ConversationMemory(),
+    )
+
+    # Act
+    await engine.get_response("Why is the boiler beeping?", chat_id=1)
+    streamed = [chunk async for chunk in engine.stream_response("How do I fix it?", chat_id=1)]
+    other_chat = await engine.get_response("How do I fix it?", chat_id=2)
+
+    # Assert
+    assert streamed == ["Open the ", "filling loop."]
+    assert other_chat == "Fix what?"
+    follow_up_prompt = generate.call_args_list[1].args[0]
+    assert (
+        "--- Conversation Start ---\nUser: Why is the boiler beeping?\n"
+        "Assistant: The pressure is too low.\n--- Conversation End ---"
+    ) in follow_up_prompt
+    assert follow_up_prompt.endswith('User Question: "How do I fix it?"')
+    assert "Conversation" not in generate.call_args_list[2].args[0]
+    assert engine.conversation_memory is not None
+    assert "Open the filling loop." in engine.conversation_memory.history(1)
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_repeated_questions_in_a_conversation_are_served_from_the_cache(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that a standalone question is cached even when its chat has history."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.side_effect = [
+        SimpleNamespace(text="The pressure is too low."),
+        SimpleNamespace(text="E21 means the flame was lost."),
+    ]
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base="Test knowledge base.",
+        conversation_memory=ConversationMemory(),
+    )
+    await engine.get_response("Why is the boiler beeping?", chat_id=1)
+    await engine.get_response("What does error E21 mean?", chat_id=1)
+    stats = ResponseStats()
+
+    # Act
+    repeated = await engine.get_response("What does error E21 mean?", chat_id=1, stats=stats)
+
+    # Assert
+    assert repeated == "E21 means the flame was lost."
+    assert stats.source == "cache"
+    assert generate.call_count == 2
+    assert "Conversation" not in generate.call_args_list[1].args[0]
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_engine_metrics_report_cache_lookups_and_gemini_latency(
+    mock_genai: MagicMock,
+) -> None:
+    """Verify that the engine collector and the Gemini histogram see every request."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.return_value = SimpleNamespace(text="Answer")
+    engine = AuraEngine(gemini_api_key="fake-api-key", knowledge_base="Test knowledge base.")
+    calls = GEMINI_SECONDS.count(("complete",))
+
+    # Act
+    await engine.get_response("What is the question?")
+    await engine.get_response("what is the question")
+    samples = {name: values for name, _, _, values in engine_collector(engine)()}
+
+    # Assert
+    assert GEMINI_SECONDS.count(("complete",)) == calls + 1
+    assert samples["aura_cache_requests_total"] == {
+        (("cache", "answer"), ("result", "hit")): 1,
+        (("cache", "answer"), ("result", "miss")): 1,
+    }
+    assert samples["aura_gemini_queued"] == {(): 0}
+
+
+@patch("aura_telegram_bot.core.engine.genai", autospec=True)
+async def test_large_corpus_is_searched_per_question(
+    mock_genai: MagicMock, tmp_path: Path
+) -> None:
+    """Verify that a corpus over budget is left out of the prefix and loaded per question."""
+    # Arrange
+    generate = mock_genai.GenerativeModel.return_value.generate_content_async
+    generate.return_value = SimpleNamespace(text="Answer")
+    (tmp_path / "boiler.md").write_text(
+        "---\ndevice: Boiler\ndefault: true\n---\n## Pressure\n\nKeep 1 to 2 bar.\n"
+        + "## Filler\n\n"
+        + "x" * 400,
+        encoding="utf-8",
+    )
+    (tmp_path / "heat_pump.md").write_text(
+        "---\ndevice: Heat pump\n---\n## Defrosting\n\nThe outdoor unit defrosts itself.\n",
+        encoding="utf-8",
+    )
+    corpus = Corpus.open(tmp_path)
+    engine = AuraEngine(
+        gemini_api_key="fake-api-key",
+        knowledge_base=corpus,
+        token_budget=50,
+        intent_threshold=None,
+    )
+
+    # Act
+    await engine.get_response("Why does the heat pump defrost?")
+
+    # Assert
+    system_instruction = mock_genai.GenerativeModel.call_args.kwargs["system_instruction"]
+    assert "Defrosting" not in system_instruction
+    prompt = generate.call_args.args[0]
+    assert "# Heat pump\n\n## Defrosting" in prompt
+    assert "Pressure" not in prompt
+    assert corpus.loads == 1
+    assert engine.knowledge_base_version == corpus.fingerprint
@@ -0,0 +1,151 @@
+"""Unit tests for hedged calls across a chain of models."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+
+import pytest
+
+from aura_telegram_bot.core.hedging import Hedger, LatencyWindow
+
+
+class FakeModel:
+    """Answers after a fixed latency, except every ``slow_every``-th call, which stalls."""
+
+    def __init__(self, latency: float, *, stall: float = 0.0, slow_every: int = 0) -> None:
+        """Initializes the model with its latencies."""
+        self.latency = latency
+        self.stall = stall
+        self.slow_every = slow_every
+        self.calls = itertools.count(1)
+        self.cancelled = 0
+
+    async def answer(self) -> str:
+        """Answers after this call's latency; counts calls cut short."""
+        number = next(self.calls)
+        slow = self.slow_every and number % self.slow_every == 0
+        try:
+            await asyncio.sleep(self.stall if slow else self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"answer {number}"
+
+
+def test_latency_window_keeps_the_latest_samples() -> None:
+    """Verify that the quantile is taken over the most recent latencies only."""
+    # Arrange
+    window = LatencyWindow(size=100)
+
+    # Act
+    for _ in range(100):
+        window.observe(5.0)
+    for seconds in range(1, 101):
+        window.observe(seconds / 100)
+
+    # Assert
+    assert len(window) == 100
+    assert window.quantile(0.95) == 0.95
+    assert window.quantile(0.5) == 0.5
+
+
+@pytest.mark.asyncio
+async def test_a_late_primary_is_hedged_and_the_loser_cancelled() -> None:
+    """Verify that the secondary is asked after the delay and its answer wins."""
+    # Arrange
+    hedger = Hedger(initial_delay=0.01)
+    primary, secondary = FakeModel(1.0), FakeModel(0.01)
+
+    # Act
+    started = time.perf_counter()
+    result = await hedger.race([("primary", primary.answer), ("secondary", secondary.answer)])
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0)
+
+    # Assert
+    assert result == "answer 1"
+    assert elapsed < 0.5
+    assert primary.cancelled == 1
+    assert (hedger.hedges, hedger.hedge_wins, hedger.fallbacks) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_a_failed_primary_falls_back_at_once() -> None:
+    """Verify that an error hands the call to the next model without waiting."""
+    # Arrange
+    hedger = Hedger(initial_delay=10.0)
+    fallback = FakeModel(0.0)
+
+    async def fail() -> str:
+        raise RuntimeError("overloaded")
+
+    # Act
+    result = await hedger.race([("primary", fail), ("fallback", fallback.answer)])
+
+    # Assert
+    assert result == "answer 1"
+    assert (hedger.hedges, hedger.fallbacks) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_the_first_error_is_raised_when_every_model_fails() -> None:
+    """Verify that a chain that fails entirely reports the primary's error."""
+    # Arrange
+    hedger = Hedger()
+
+    async def fail(message: str) -> str:
+        raise RuntimeError(message)
+
+    # Act / Assert
+    with pytest.raises(RuntimeError, match="primary down"):
+        await hedger.race(
+            [("primary", lambda: fail("primary down")), ("fallback", lambda: fail("down too"))]
+        )
+
+
+def test_delays_follow_the_observed_latency() -> None:
+    """Verify that once a model has enough samples, its quantile becomes the delay."""
+    # Arrange
+    hedger = Hedger(quantile=0.9, initial_delay=2.0, min_delay=0.0, min_samples=10)
+    before = hedger.delay("primary")
+
+    # Act
+    for seconds in range(1, 11):
+        hedger.latencies("primary").observe(seconds / 10)
+
+    # Assert
+    assert before == 2.0
+    assert hedger.delay("primary") == pytest.approx(0.9)
+    assert hedger.delay("primary", "stream") == 2.0
+
+
+@pytest.mark.asyncio
+async def test_hedging_cuts_the_latency_tail_of_stalling_calls() -> None:
+    """Verify that occasional stalls of the primary no longer reach the p99 latency."""
+
+    async def p99(hedged: bool) -> float:
+        hedger = Hedger(initial_delay=0.02, min_delay=0.0, min_samples=10)
+        primary = FakeModel(0.002, stall=0.15, slow_every=10)
+        secondary = FakeModel(0.002, stall=0.15, slow_every=7)
+        attempts = [("primary", primary.answer)]
+        if hedged:
+            attempts.append(("secondary", secondary.answer))
+
+        async def timed() -> float:
+            started = time.perf_counter()
+            await hedger.race(attempts)
+            return time.perf_counter() - started
+
+        latencies: list[float] = []
+        for _ in range(5):
+            latencies += await asyncio.gather(*(timed() for _ in range(20)))
+        return sorted(latencies)[98]
+
+    # Act
+    unhedged, hedged = await p99(hedged=False), await p99(hedged=True)
+
+    # Assert
+    assert unhedged >= 0.15
+    assert hedged < 0.1
@@ -0,0 +1,131 @@
+"""Unit tests for live Home Assistant readings in prompts."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from typing import Any
+
+import pytest
+
+from aura_telegram_bot.core.live_context import (
+    FallbackStateSource,
+    LiveContextProvider,
+    format_states,
+)
+
+ENTITIES = {
+    "sensor.boiler_pressure": ["pressure", "bar"],
+    "sensor.boiler_flow_temperature": ["temperature", "flow"],
+    "sensor.boiler_fault_code": [],
+}
+
+
+def make_state(entity_id: str, state: str, name: str, unit: str | None = None) -> dict[str, Any]:
+    """Builds an entity state as Home Assistant returns it."""
+    attributes: dict[str, Any] = {"friendly_name": name}
+    if unit:
+        attributes["unit_of_measurement"] = unit
+    return {"entity_id": entity_id, "state": state, "attributes": attributes}
+
+
+STATES = {
+    "sensor.boiler_pressure": make_state(
+        "sensor.boiler_pressure", "1.4", "Boiler pressure", "bar"
+    ),
+    "sensor.boiler_fault_code": make_state("sensor.boiler_fault_code", "none", "Fault code"),
+}
+
+
+class FakeStateSource:
+    """Returns canned states after an optional delay, or raises."""
+
+    def __init__(self, delay: float = 0.0, error: Exception | None = None) -> None:
+        """Configures the delay and the error to raise."""
+        self._delay = delay
+        self._error = error
+        self.requests: list[list[str]] = []
+
+    async def get_states(self, entity_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Returns the known states among the requested entities."""
+        entity_ids = list(entity_ids)
+        self.requests.append(entity_ids)
+        await asyncio.sleep(self._delay)
+        if self._error:
+            raise self._error
+        return {entity_id: STATES[entity_id] for entity_id in entity_ids if entity_id in STATES}
+
+
+def test_select_matches_keywords_and_adds_unconditional_entities() -> None:
+    """Verify that entities are picked by keyword, with keyword-less ones added."""
+    # Arrange
+    provider = LiveContextProvider(FakeStateSource(), ENTITIES)
+
+    # Act & Assert
+    assert provider.select("What is the pressure in bar right now?") == [
+        "sensor.boiler_pressure",
+        "sensor.boiler_fault_code",
+    ]
+    assert provider.select("How do I switch to Eco mode?") == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_renders_compact_readings() -> None:
+    """Verify that fetched states are rendered one short line each."""
+    # Arrange
+    source = FakeStateSource()
+    provider = LiveContextProvider(source, ENTITIES)
+
+    # Act
+    readings = await provider.fetch("Is the pressure OK?")
+
+    # Assert
+    assert readings == "- Boiler pressure: 1.4 bar\n- Fault code: none"
+    assert source.requests == [["sensor.boiler_pressure", "sensor.boiler_fault_code"]]
+
+
+@pytest.mark.asyncio
+async def test_fetch_degrades_when_the_budget_is_exceeded() -> None:
+    """Verify that a slow state source costs the readings, not the answer."""
+    # Arrange
+    provider = LiveContextProvider(FakeStateSource(delay=1.0), ENTITIES, budget=0.01)
+
+    # Act
+    started = asyncio.get_running_loop().time()
+    readings = await provider.fetch("Is the pressure OK?")
+    elapsed = asyncio.get_running_loop().time() - started
+
+    # Assert
+    assert readings == ""
+    assert provider.timeouts == 1
+    assert elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_fetch_degrades_when_the_source_fails() -> None:
+    """Verify that a failing state source is reported and skipped."""
+    # Arrange
+    provider = LiveContextProvider(FakeStateSource(error=ConnectionError("down")), ENTITIES)
+
+    # Act
+    readings = await provider.fetch("Is the pressure OK?")
+
+    # Assert
+    assert readings == ""
+    assert provider.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_source_is_used_when_the_primary_fails() -> None:
+    """Verify that states come from the fallback while the primary is unavailable."""
+    # Arrange
+    fallback = FakeStateSource()
+    source = FallbackStateSource(FakeStateSource(error=RuntimeError("stale")), fallback)
+
+    # Act
+    states = await source.get_states(["sensor.boiler_pressure"])
+
+    # Assert
+    assert format_states(states) == "- Boiler pressure: 1.4 bar"
+    assert source.fallbacks == 1
+    assert fallback.requests == [["sensor.boiler_pressure"]]
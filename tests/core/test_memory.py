@@ -0,0 +1,180 @@
+"""Unit tests for the per-chat conversation memory."""
+
+from __future__ import annotations
+
+import tracemalloc
+from pathlib import Path
+
+from aura_telegram_bot.core.memory import ConversationMemory, refers_back
+
+
+class FakeClock:
+    """A manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Starts the clock at an arbitrary point in time."""
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        """Returns the current fake time."""
+        return self.now
+
+
+def test_history_renders_turns_of_the_chat_only() -> None:
+    """Verify that each chat sees its own earlier turns, oldest first."""
+    # Arrange
+    memory = ConversationMemory()
+
+    # Act
+    memory.record(1, "What is F4?", "Flame failure.")
+    memory.record(1, "How do I fix it?", "Check the gas supply.")
+    memory.record(2, "What is F2?", "Overheating.")
+
+    # Assert
+    assert memory.history(1) == (
+        "User: What is F4?\nAssistant: Flame failure.\n"
+        "User: How do I fix it?\nAssistant: Check the gas supply."
+    )
+    assert memory.history(2) == "User: What is F2?\nAssistant: Overheating."
+    assert memory.history(3) == ""
+
+
+def test_oldest_turns_are_summarized_when_over_the_turn_limit() -> None:
+    """Verify that a full ring buffer keeps the dropped question in the summary."""
+    # Arrange
+    memory = ConversationMemory(max_turns=2)
+
+    # Act
+    for number in range(3):
+        memory.record(1, f"Question {number}?", f"Answer {number}.")
+
+    # Assert
+    history = memory.history(1)
+    assert history.startswith("Earlier questions: Question 0?\n")
+    assert "Answer 0." not in history
+    assert "User: Question 1?" in history
+    assert "User: Question 2?" in history
+
+
+def test_history_stays_within_the_token_budget() -> None:
+    """Verify that long answers push older turns out of the budget."""
+    # Arrange
+    memory = ConversationMemory(max_turns=10, token_budget=100)
+
+    # Act
+    for number in range(5):
+        memory.record(1, f"Question {number}?", "x" * 120)
+
+    # Assert
+    history = memory.history(1)
+    assert len(history) // 4 <= 100
+    assert "User: Question 4?" in history
+    assert "User: Question 0?" not in history
+    assert "Question 0?" in history.splitlines()[0]
+
+
+def test_idle_chats_are_evicted() -> None:
+    """Verify that a chat is forgotten once it has been idle for longer than the TTL."""
+    # Arrange
+    clock = FakeClock()
+    memory = ConversationMemory(idle_ttl=60, clock=clock)
+    memory.record(1, "question", "answer")
+    clock.now += 30
+    memory.record(2, "question", "answer")
+
+    # Act
+    clock.now += 31
+
+    # Assert
+    assert memory.history(1) == ""
+    assert memory.history(2) != ""
+    assert len(memory) == 1
+    assert memory.evicted == 1
+
+
+def test_forget_starts_a_new_conversation() -> None:
+    """Verify that a forgotten chat has no history."""
+    # Arrange
+    memory = ConversationMemory()
+    memory.record(1, "question", "answer")
+
+    # Act
+    memory.forget(1)
+
+    # Assert
+    assert memory.history(1) == ""
+
+
+def test_only_follow_up_questions_refer_back() -> None:
+    """Verify that follow-ups need the conversation and standalone questions do not."""
+    # Arrange
+    follow_ups = ["And how do I fix it?", "Why?", "What about the filter?", "Is that normal?"]
+    standalone = ["What does error E21 mean?", "How do I descale the machine?"]
+
+    # Act
+    needs_history = [refers_back(question) for question in follow_ups + standalone]
+
+    # Assert
+    assert needs_history == [True] * len(follow_ups) + [False] * len(standalone)
+
+
+def test_memory_stays_constant_under_many_chats() -> None:
+    """Verify that thousands of chats do not grow memory beyond the chat limit."""
+    # Arrange
+    clock = FakeClock()
+    memory = ConversationMemory(max_chats=500, clock=clock)
+
+    def load(first_chat: int) -> None:
+        for chat_id in range(first_chat, first_chat + 5_000):
+            clock.now += 0.01
+            memory.record(chat_id, f"What is fault F{chat_id % 10}?", "A" * 200)
+
+    load(0)
+    tracemalloc.start()
+    try:
+        # Act
+        load(5_000)
+        baseline, _ = tracemalloc.get_traced_memory()
+        load(10_000)
+        load(15_000)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Assert
+    assert len(memory) == 500
+    assert memory.evicted == 19_500
+    assert current - baseline < 64 * 1024
+
+
+def test_conversations_persist_across_restarts(tmp_path: Path) -> None:
+    """Verify that saved conversations are loaded again, without the idle ones."""
+    # Arrange
+    clock = FakeClock()
+    path = tmp_path / "conversations.sqlite3"
+    memory = ConversationMemory(idle_ttl=60, path=path, clock=clock)
+    memory.record(1, "Old question", "Old answer")
+    clock.now += 45
+    memory.record(2, "Prix du gaz ?", "Je ne sais pas.")
+    memory.save()
+
+    # Act
+    clock.now += 30
+    reloaded = ConversationMemory(idle_ttl=60, path=path, clock=clock)
+
+    # Assert
+    assert len(reloaded) == 1
+    assert reloaded.history(2) == "User: Prix du gaz ?\nAssistant: Je ne sais pas."
+
+
+def test_corrupt_database_is_ignored(tmp_path: Path) -> None:
+    """Verify that an unreadable database leaves the memory empty."""
+    # Arrange
+    path = tmp_path / "conversations.sqlite3"
+    path.write_text("not a database", encoding="utf-8")
+
+    # Act
+    memory = ConversationMemory(path=path)
+
+    # Assert
+    assert len(memory) == 0
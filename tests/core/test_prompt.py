@@ -0,0 +1,43 @@
+"""Unit tests for the static prompt prefix."""
+
+from __future__ import annotations
+
+from aura_telegram_bot.core.prompt import SYSTEM_INSTRUCTION, PromptPrefix
+
+KNOWLEDGE_BASE = "## Modes\n\nPress MODE.\n\n## Faults\n\nF2 means overheating."
+
+
+def test_small_knowledge_base_is_embedded_in_system_instruction() -> None:
+    """Verify that a knowledge base within budget becomes part of the static prefix."""
+    # Act
+    prefix = PromptPrefix.build(KNOWLEDGE_BASE, token_budget=1000)
+
+    # Assert
+    assert prefix.inline
+    assert prefix.system_instruction.startswith(SYSTEM_INSTRUCTION)
+    assert "F2 means overheating." in prefix.system_instruction
+    assert (
+        prefix.render("What is F2?", top_k=2, token_budget=1000) == 'User Question: "What is F2?"'
+    )
+
+
+def test_large_knowledge_base_is_retrieved_per_question() -> None:
+    """Verify that a knowledge base over budget is left out of the static prefix."""
+    # Act
+    prefix = PromptPrefix.build(KNOWLEDGE_BASE, token_budget=8)
+    prompt = prefix.render("What is F2?", top_k=1, token_budget=8)
+
+    # Assert
+    assert not prefix.inline
+    assert prefix.system_instruction == SYSTEM_INSTRUCTION
+    assert "F2 means overheating." in prompt
+    assert "Press MODE." not in prompt
+    assert prompt.endswith('User Question: "What is F2?"')
+
+
+def test_fingerprint_changes_with_knowledge_base() -> None:
+    """Verify that the prefix is versioned by the knowledge base content."""
+    first = PromptPrefix.build(KNOWLEDGE_BASE, token_budget=1000)
+    second = PromptPrefix.build(KNOWLEDGE_BASE + "\nF4 means flame failure.", token_budget=1000)
+
+    assert first.fingerprint != second.fingerprint
@@ -0,0 +1,105 @@
+"""Unit tests for the knowledge base retrieval index."""
+
+from __future__ import annotations
+
+from aura_telegram_bot.core.retrieval import KnowledgeIndex, estimate_tokens, split_sections
+
+KNOWLEDGE_BASE = """Viessmann Vitodens 111-F - Technical Summary
+
+## Operating Modes
+
+- **Eco Mode:** The boiler only heats water on demand.
+- **Changing Modes:** Press the "MODE" button for 3 seconds.
+
+## Common Fault Codes
+
+- **Fault Code F2:** Burner lockout due to overheating. Check the pressure.
+- **Fault Code F4:** Flame failure. Check the gas supply.
+
+## Routine Maintenance
+
+- **Annual Service:** Have the boiler serviced annually.
+"""
+
+
+def test_split_sections_uses_headings_and_keeps_preamble() -> None:
+    """Verify that the text is split on '##' headings with a leading preamble."""
+    # Act
+    sections = split_sections(KNOWLEDGE_BASE)
+
+    # Assert
+    assert [section.title for section in sections] == [
+        "",
+        "Operating Modes",
+        "Common Fault Codes",
+        "Routine Maintenance",
+    ]
+    assert sections[0].text == "Viessmann Vitodens 111-F - Technical Summary"
+    assert sections[2].text.startswith("## Common Fault Codes")
+    assert "F4" in sections[2].text
+    assert sections[2].tokens == estimate_tokens(sections[2].text)
+
+
+def test_search_ranks_the_relevant_section_first() -> None:
+    """Verify that BM25 scoring puts the matching section on top."""
+    # Arrange
+    index = KnowledgeIndex.from_text(KNOWLEDGE_BASE)
+
+    # Act
+    results = index.search("What does fault F4 mean?", top_k=2)
+
+    # Assert
+    assert results[0][0].title == "Common Fault Codes"
+    assert all(score > 0 for _, score in results)
+
+
+def test_build_context_returns_everything_when_within_budget() -> None:
+    """Verify that a small knowledge base is sent in full."""
+    # Arrange
+    index = KnowledgeIndex.from_text(KNOWLEDGE_BASE)
+
+    # Act
+    context = index.build_context("anything", top_k=1, token_budget=10_000)
+
+    # Assert
+    assert "Operating Modes" in context
+    assert "Routine Maintenance" in context
+
+
+def test_build_context_respects_top_k_and_token_budget() -> None:
+    """Verify that only the best sections that fit the budget are selected."""
+    # Arrange
+    index = KnowledgeIndex.from_text(KNOWLEDGE_BASE)
+    budget = index.sections[2].tokens
+
+    # Act
+    context = index.build_context("fault code F2", top_k=3, token_budget=budget)
+
+    # Assert
+    assert context == index.sections[2].text
+
+
+def test_build_context_falls_back_to_leading_sections_without_matches() -> None:
+    """Verify that the leading sections are used when no term matches."""
+    # Arrange
+    index = KnowledgeIndex.from_text(KNOWLEDGE_BASE)
+
+    # Act
+    context = index.build_context("xyzzy", top_k=1, token_budget=20)
+
+    # Assert
+    assert context == "Viessmann Vitodens 111-F - Technical Summary"
+
+
+def test_index_of_sections_without_terms_falls_back_to_leading_sections() -> None:
+    """Verify that a knowledge base without any words can be indexed and searched."""
+    # Arrange
+    index = KnowledgeIndex.from_text("---\n\n## ***\n\n...")
+
+    # Act
+    results = index.search("pressure", top_k=1)
+    context = index.build_context("pressure", top_k=1, token_budget=20)
+
+    # Assert
+    assert results == []
+    assert context == "---\n\n## ***\n\n..."
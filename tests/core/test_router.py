@@ -0,0 +1,105 @@
+"""Unit tests for the local intent router."""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from aura_telegram_bot.core.router import IntentRouter
+
+KNOWLEDGE_BASE = """Boiler - Technical Summary
+
+## Operating Modes
+
+- **Comfort Mode:** Keeps hot water ready at all times.
+- **Eco Mode:** Heats water on demand only.
+- **Changing Modes:** Press the "MODE" button for 3 seconds.
+
+## Common Fault Codes
+
+- **Fault Code F2:** Burner lockout due to overheating.
+    - Cause: Low water pressure.
+    - Solution: Top up the system to **1.5 bar**.
+
+- **Fault Code F4:** Flame failure.
+    - Solution: Reset the boiler.
+
+## Routine Maintenance
+
+- **Annual Service:** Have the boiler serviced once a year.
+"""
+
+
+@pytest.fixture
+def router() -> IntentRouter:
+    """Provides a router over the test knowledge base."""
+    return IntentRouter.from_text(KNOWLEDGE_BASE)
+
+
+@pytest.mark.parametrize(
+    ("question", "title"),
+    [
+        ("What is fault F4?", "Fault Code F4"),
+        ("what does f-2 mean", "Fault Code F2"),
+        ("How do I change mode?", "Changing Modes"),
+        ("What is Eco mode?", "Eco Mode"),
+        ("Tell me about the operating modes", "Operating Modes"),
+        ("What is the annual service?", "Annual Service"),
+    ],
+)
+def test_lookup_questions_are_routed_to_their_entry(
+    router: IntentRouter,
+    question: str,
+    title: str,
+) -> None:
+    """Verify that lookup questions match the entry that answers them."""
+    # Act
+    match = router.match(question)
+
+    # Assert
+    assert match is not None
+    assert match.route.title == title
+    assert match.confidence >= 0.8
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Why does my boiler show F2 although the pressure is 1.2 bar?",  # More than a lookup.
+        "Co znamená F4?",  # Another language; the model answers in kind.
+        "Which mode is cheaper?",  # Several entries match equally well.
+        "What is fault F9?",  # Not in the knowledge base.
+        "How to switch to eco mode",  # Names an entry, but asks something it does not cover.
+        "What is the annual service cost?",  # The entry does not mention a cost.
+    ],
+)
+def test_other_questions_are_left_to_the_model(router: IntentRouter, question: str) -> None:
+    """Verify that questions without a confident match are not routed."""
+    assert router.match(question) is None
+
+
+def test_routed_answer_is_the_plain_text_entry(router: IntentRouter) -> None:
+    """Verify that the reply is the whole entry without Markdown emphasis."""
+    # Act
+    match = router.match("What is F2?")
+
+    # Assert
+    assert match is not None
+    assert match.route.answer == (
+        "Fault Code F2: Burner lockout due to overheating.\n"
+        "- Cause: Low water pressure.\n"
+        "- Solution: Top up the system to 1.5 bar."
+    )
+
+
+def test_matching_takes_well_under_a_millisecond(router: IntentRouter) -> None:
+    """Verify that routing is cheap enough to run before every model call."""
+    # Act
+    started = time.perf_counter()
+    for _ in range(1000):
+        router.match("What is fault F4?")
+    elapsed = (time.perf_counter() - started) / 1000
+
+    # Assert
+    assert elapsed < 0.0005
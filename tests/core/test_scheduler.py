@@ -0,0 +1,182 @@
+"""Unit tests for the upstream call scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from aura_telegram_bot.core.scheduler import (
+    Priority,
+    QueueFullError,
+    RequestScheduler,
+    TokenBucket,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Starts the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Returns the current fake time."""
+        return self.now
+
+
+class RateLimitedError(Exception):
+    """Mimics a Google API error with an HTTP status code."""
+
+    code = 429
+
+
+async def test_waiting_calls_are_served_by_priority_then_cost() -> None:
+    """Verify that queued calls get the slot in priority order, cheapest first."""
+    # Arrange
+    scheduler = RequestScheduler(max_concurrency=1)
+    order: list[str] = []
+
+    async def job(name: str, priority: Priority, cost: int) -> None:
+        async with scheduler.slot(priority, cost):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    blocker = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot():
+            await blocker.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    # Act
+    jobs = [
+        asyncio.create_task(job("bulk", Priority.BULK, 1)),
+        asyncio.create_task(job("long", Priority.NORMAL, 900)),
+        asyncio.create_task(job("short", Priority.NORMAL, 10)),
+        asyncio.create_task(job("interactive", Priority.INTERACTIVE, 500)),
+    ]
+    await asyncio.sleep(0)
+    queued = scheduler.queued
+    blocker.set()
+    await asyncio.gather(holder, *jobs)
+
+    # Assert
+    assert queued == 4
+    assert order == ["interactive", "short", "long", "bulk"]
+    assert scheduler.active == 0
+    assert scheduler.queued == 0
+
+
+async def test_full_queue_rejects_new_calls() -> None:
+    """Verify that calls beyond the queue capacity are shed immediately."""
+    # Arrange
+    scheduler = RequestScheduler(max_concurrency=1, max_queue=1)
+    blocker = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot():
+            await blocker.wait()
+
+    tasks = [asyncio.create_task(hold()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    # Act & Assert
+    with pytest.raises(QueueFullError):
+        async with scheduler.slot():
+            pass
+    assert scheduler.rejected == 1
+    blocker.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    """Verify that a cancelled waiter does not keep or leak a slot."""
+    # Arrange
+    scheduler = RequestScheduler(max_concurrency=1)
+    blocker = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot():
+            await blocker.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    # Act
+    waiter.cancel()
+    await asyncio.sleep(0)
+    blocker.set()
+    await holder
+
+    # Assert
+    assert waiter.cancelled()
+    assert (scheduler.active, scheduler.queued) == (0, 0)
+
+
+async def test_retryable_errors_are_retried_with_backoff() -> None:
+    """Verify that a 429 is retried and the call eventually succeeds."""
+    # Arrange
+    scheduler = RequestScheduler(max_retries=3, base_delay=0.001)
+    attempts = 0
+
+    async def flaky() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise RateLimitedError("quota exceeded")
+        return "ok"
+
+    # Act
+    result = await scheduler.run(flaky)
+
+    # Assert
+    assert result == "ok"
+    assert scheduler.retries == 2
+
+
+async def test_other_errors_and_exhausted_retries_are_raised() -> None:
+    """Verify that only retryable errors are retried, and only up to the limit."""
+    # Arrange
+    scheduler = RequestScheduler(max_retries=1, base_delay=0.001)
+    calls = 0
+
+    async def broken() -> str:
+        nonlocal calls
+        calls += 1
+        raise ValueError("bad request")
+
+    async def overloaded() -> str:
+        nonlocal calls
+        calls += 1
+        raise RateLimitedError("quota exceeded")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="bad request"):
+        await scheduler.run(broken)
+    assert calls == 1
+
+    with pytest.raises(RateLimitedError):
+        await scheduler.run(overloaded)
+    assert calls == 3
+
+
+async def test_token_bucket_allows_burst_then_applies_rate() -> None:
+    """Verify that the bucket allows its capacity at once and then refills over time."""
+    # Arrange
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.5, capacity=2, clock=clock)
+
+    # Act & Assert
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now = 2.0
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
@@ -0,0 +1,121 @@
+"""Unit tests for the semantic answer cache."""
+
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from aura_telegram_bot.core.semantic_cache import (  # noqa: E402
+    HashingVectorizer,
+    SemanticCache,
+)
+
+
+class FakeClock:
+    """A manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Starts the clock at an arbitrary point in time."""
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        """Returns the current fake time."""
+        return self.now
+
+
+def test_vectorizer_returns_unit_vectors() -> None:
+    """Verify that vectors are normalized and stop words alone give a zero vector."""
+    vectorize = HashingVectorizer(dim=64)
+
+    assert np.linalg.norm(vectorize("boiler pressure")) == pytest.approx(1.0)
+    assert not vectorize("how do i").any()
+
+
+@pytest.mark.parametrize(
+    ("cached", "asked"),
+    [
+        ("How to top up boiler pressure", "How do I top up the pressure?"),
+        ("What does fault code F2 mean?", "what does the F2 fault code mean"),
+        ("How do I change the mode?", "How can I change modes?"),
+    ],
+)
+def test_paraphrases_are_served_from_cache(cached: str, asked: str) -> None:
+    """Verify that a differently worded question reuses the cached answer."""
+    # Arrange
+    cache = SemanticCache()
+    cache.bind("kb-v1")
+    cache.put(cached, "Cached answer.")
+
+    # Act
+    answer = cache.get(asked)
+
+    # Assert
+    assert answer == "Cached answer."
+    assert cache.hits == 1
+
+
+@pytest.mark.parametrize(
+    ("cached", "asked"),
+    [
+        ("What is fault F2?", "What is fault F4?"),
+        ("What is comfort mode?", "What is eco mode?"),
+        ("How do I change the mode?", "How do I reset the boiler?"),
+    ],
+)
+def test_different_questions_miss(cached: str, asked: str) -> None:
+    """Verify that questions about other things, or other fault codes, are not matched."""
+    # Arrange
+    cache = SemanticCache()
+    cache.bind("kb-v1")
+    cache.put(cached, "Cached answer.")
+
+    # Act
+    answer = cache.get(asked)
+
+    # Assert
+    assert answer is None
+    assert cache.misses == 1
+
+
+def test_least_recently_used_entry_gives_up_its_row() -> None:
+    """Verify that a full cache evicts the least recently used answer and stays bounded."""
+    # Arrange
+    cache = SemanticCache(max_entries=2)
+    cache.bind("kb-v1")
+    cache.put("boiler pressure", "Pressure.")
+    cache.put("radiator bleeding", "Bleeding.")
+    cache.get("boiler pressure")
+
+    # Act
+    cache.put("flame failure", "Flame.")
+
+    # Assert
+    assert len(cache) == 2
+    assert cache.get("radiator bleeding") is None
+    assert cache.get("boiler pressure") == "Pressure."
+    assert cache.get("flame failure") == "Flame."
+    assert cache.memory_bytes == 2 * (256 * 4 + 8)
+
+
+def test_expired_answers_and_old_knowledge_base_versions_are_not_served() -> None:
+    """Verify that answers expire and are dropped when the knowledge base changes."""
+    # Arrange
+    clock = FakeClock()
+    cache = SemanticCache(ttl=60, clock=clock)
+    cache.bind("kb-v1")
+    cache.put("boiler pressure", "Pressure.")
+    cache.put("flame failure", "Flame.")
+
+    # Act
+    clock.now += 61
+    expired = cache.get("boiler pressure")
+    cache.put("boiler pressure", "Pressure again.")
+    refreshed = cache.get("boiler pressure")
+    cache.bind("kb-v2")
+
+    # Assert
+    assert expired is None
+    assert refreshed == "Pressure again."
+    assert len(cache) == 0
+    assert cache.get("boiler pressure") is None
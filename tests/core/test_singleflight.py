@@ -0,0 +1,100 @@
+"""Unit tests for single-flight call coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from aura_telegram_bot.core.singleflight import SingleFlight
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_concurrent_identical_calls_share_one_upstream_call() -> None:
+    """Verify that concurrent callers with the same key get one shared result."""
+    # Arrange
+    flights: SingleFlight[str] = SingleFlight()
+    started = 0
+    release = asyncio.Event()
+
+    async def upstream() -> str:
+        nonlocal started
+        started += 1
+        await release.wait()
+        return "answer"
+
+    # Act
+    waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    # Assert
+    assert results == ["answer"] * 5
+    assert started == 1
+    assert (flights.calls, flights.shared) == (1, 4)
+    assert len(flights) == 0
+
+
+async def test_errors_are_propagated_to_all_waiters() -> None:
+    """Verify that an upstream exception reaches every waiter."""
+    # Arrange
+    flights: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def upstream() -> str:
+        await release.wait()
+        raise RuntimeError("upstream failed")
+
+    # Act
+    waiters = [asyncio.create_task(flights.do("key", upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    # Assert
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_cancelling_one_waiter_does_not_cancel_the_shared_call() -> None:
+    """Verify that the remaining waiters still get the result after a cancellation."""
+    # Arrange
+    flights: SingleFlight[str] = SingleFlight()
+    release = asyncio.Event()
+
+    async def upstream() -> str:
+        await release.wait()
+        return "answer"
+
+    first = asyncio.create_task(flights.do("key", upstream))
+    second = asyncio.create_task(flights.do("key", upstream))
+    await asyncio.sleep(0)
+
+    # Act
+    first.cancel()
+    release.set()
+
+    # Assert
+    assert await second == "answer"
+    assert first.cancelled()
+
+
+async def test_new_call_starts_after_previous_one_finished() -> None:
+    """Verify that finished calls are not reused for later callers."""
+    # Arrange
+    flights: SingleFlight[int] = SingleFlight()
+    counter = 0
+
+    async def upstream() -> int:
+        nonlocal counter
+        counter += 1
+        return counter
+
+    # Act
+    first = await flights.do("key", upstream)
+    second = await flights.do("key", upstream)
+
+    # Assert
+    assert (first, second) == (1, 2)
+    assert flights.shared == 0
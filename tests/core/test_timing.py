@@ -0,0 +1,29 @@
+"""Unit tests for per-stage latency accounting."""
+
+from __future__ import annotations
+
+import pytest
+
+from aura_telegram_bot.core.timing import StageTimings
+
+
+def test_measure_records_totals_maximum_and_trace() -> None:
+    """Verify that each measured block updates the totals and the request trace."""
+    # Arrange
+    now = iter([0.0, 0.25, 1.0, 1.5])
+    timings = StageTimings(clock=lambda: next(now))
+    trace: dict[str, float] = {}
+
+    # Act
+    with timings.measure("model", trace):
+        pass
+    with pytest.raises(RuntimeError), timings.measure("model"):
+        raise RuntimeError
+
+    # Assert
+    assert timings.counts["model"] == 2
+    assert timings.seconds_total["model"] == 0.75
+    assert timings.seconds_max["model"] == 0.5
+    assert timings.mean("model") == 0.375
+    assert timings.mean("cache") == 0.0
+    assert trace == {"model": 0.25}
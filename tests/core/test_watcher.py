@@ -0,0 +1,115 @@
+"""Unit tests for the knowledge base file watcher."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from aura_telegram_bot.core.watcher import KnowledgeBaseWatcher
+
+pytestmark = pytest.mark.asyncio
+
+
+def touch_later(path: Path, text: str) -> None:
+    """Rewrites a file and moves its modification time forward."""
+    path.write_text(text, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+async def test_check_reloads_only_when_file_changes(tmp_path: Path) -> None:
+    """Verify that the content is passed on once per change, and not otherwise."""
+    # Arrange
+    path = tmp_path / "knowledge_base.txt"
+    path.write_text("version 1", encoding="utf-8")
+    received: list[str] = []
+
+    async def on_change(text: str) -> None:
+        received.append(text)
+
+    watcher = KnowledgeBaseWatcher(path, on_change)
+
+    # Act
+    unchanged = await watcher.check()
+    touch_later(path, "version 2")
+    changed = await watcher.check()
+    again = await watcher.check()
+
+    # Assert
+    assert (unchanged, changed, again) == (False, True, False)
+    assert received == ["version 2"]
+    assert watcher.reloads == 1
+    assert watcher.last_reload_seconds is not None
+
+
+async def test_check_keeps_current_version_while_file_is_missing(tmp_path: Path) -> None:
+    """Verify that a temporarily missing file does not trigger a reload."""
+    # Arrange
+    path = tmp_path / "knowledge_base.txt"
+    path.write_text("version 1", encoding="utf-8")
+    received: list[str] = []
+
+    async def on_change(text: str) -> None:
+        received.append(text)
+
+    watcher = KnowledgeBaseWatcher(path, on_change)
+    path.unlink()
+
+    # Act
+    changed = await watcher.check()
+
+    # Assert
+    assert not changed
+    assert received == []
+
+
+async def test_failed_reload_is_counted_and_not_retried(tmp_path: Path) -> None:
+    """Verify that a failing reload is reported once per file version."""
+    # Arrange
+    path = tmp_path / "knowledge_base.txt"
+    path.write_text("version 1", encoding="utf-8")
+    calls = 0
+
+    async def on_change(text: str) -> None:
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("bad content")
+
+    watcher = KnowledgeBaseWatcher(path, on_change)
+    touch_later(path, "version 2")
+
+    # Act
+    first = await watcher.check()
+    second = await watcher.check()
+
+    # Assert
+    assert (first, second) == (False, False)
+    assert calls == 1
+    assert watcher.failures == 1
+
+
+async def test_check_reloads_a_directory_when_one_document_changes(tmp_path: Path) -> None:
+    """Verify that a knowledge base directory is reloaded with the given loader."""
+    # Arrange
+    (tmp_path / "boiler.md").write_text("boiler", encoding="utf-8")
+    (tmp_path / "heat_pump.md").write_text("heat pump", encoding="utf-8")
+    received: list[list[str]] = []
+
+    async def on_change(names: list[str]) -> None:
+        received.append(names)
+
+    watcher = KnowledgeBaseWatcher(
+        tmp_path, on_change, load=lambda: sorted(path.name for path in tmp_path.iterdir())
+    )
+
+    # Act
+    unchanged = await watcher.check()
+    touch_later(tmp_path / "heat_pump.md", "heat pump, revised")
+    (tmp_path / "ventilation.md").write_text("ventilation", encoding="utf-8")
+    changed = await watcher.check()
+
+    # Assert
+    assert (unchanged, changed) == (False, True)
+    assert received == [["boiler.md", "heat_pump.md", "ventilation.md"]]
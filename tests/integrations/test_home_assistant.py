@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 import httpx
@@ -129,3 +130,130 @@ async def test_reuses_client_session(
 
     # Assert
     assert created_count == 1, "AsyncClient should only be created once."
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Starts the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Returns the current fake time."""
+        return self.now
+
+
+BOILER_SENSORS = [f"sensor.boiler_{name}" for name in ("pressure", "flow_temp", "fault_code")]
+ALL_STATES = [{"entity_id": entity_id, "state": "1"} for entity_id in BOILER_SENSORS]
+
+
+@respx.mock
+async def test_get_states_fetches_all_entities_in_one_request() -> None:
+    """Verify that a bulk read makes one request and is then served from the cache."""
+    # Arrange
+    clock = FakeClock()
+    client_instance = HomeAssistantClient(TEST_URL, TEST_TOKEN, state_ttl=5.0, clock=clock)
+    route = respx.get(f"{TEST_URL}/api/states").mock(
+        return_value=Response(200, json=ALL_STATES),
+    )
+
+    # Act
+    async with client_instance as client:
+        first = await client.get_states([*BOILER_SENSORS, "sensor.unknown"])
+        clock.now = 4.0
+        second = await client.get_states(BOILER_SENSORS)
+        pressure = await client.get_entity_state("sensor.boiler_pressure")
+
+    # Assert
+    assert route.call_count == 1
+    assert list(first) == BOILER_SENSORS
+    assert second == first
+    assert pressure == {"entity_id": "sensor.boiler_pressure", "state": "1"}
+
+
+@respx.mock
+async def test_stale_states_are_fetched_again() -> None:
+    """Verify that states older than the TTL trigger a new bulk request."""
+    # Arrange
+    clock = FakeClock()
+    client_instance = HomeAssistantClient(TEST_URL, TEST_TOKEN, state_ttl=5.0, clock=clock)
+    route = respx.get(f"{TEST_URL}/api/states").mock(
+        return_value=Response(200, json=ALL_STATES),
+    )
+
+    # Act
+    async with client_instance as client:
+        await client.get_states(BOILER_SENSORS)
+        clock.now = 5.0
+        await client.get_states(BOILER_SENSORS)
+
+    # Assert
+    assert route.call_count == 2
+
+
+@respx.mock
+async def test_concurrent_reads_are_coalesced(client_instance: HomeAssistantClient) -> None:
+    """Verify that concurrent reads of the same states share one request."""
+    # Arrange
+    bulk_route = respx.get(f"{TEST_URL}/api/states").mock(
+        return_value=Response(200, json=ALL_STATES),
+    )
+    entity_route = respx.get(f"{TEST_URL}/api/states/{TEST_ENTITY_ID}").mock(
+        return_value=Response(200, json={"entity_id": TEST_ENTITY_ID, "state": "on"}),
+    )
+
+    # Act
+    async with client_instance as client:
+        bulk = await asyncio.gather(*(client.get_states(BOILER_SENSORS) for _ in range(5)))
+        single = await asyncio.gather(
+            *(client.get_entity_state(TEST_ENTITY_ID) for _ in range(5)),
+        )
+
+    # Assert
+    assert bulk_route.call_count == 1
+    assert entity_route.call_count == 1
+    assert all(states == bulk[0] for states in bulk)
+    assert all(state["state"] == "on" for state in single)
+
+
+@respx.mock
+async def test_zero_ttl_disables_the_state_cache() -> None:
+    """Verify that every read goes to Home Assistant when the TTL is zero."""
+    # Arrange
+    client_instance = HomeAssistantClient(TEST_URL, TEST_TOKEN, state_ttl=0)
+    route = respx.get(f"{TEST_URL}/api/states").mock(
+        return_value=Response(200, json=ALL_STATES),
+    )
+
+    # Act
+    async with client_instance as client:
+        await client.get_states(BOILER_SENSORS)
+        await client.get_states(BOILER_SENSORS)
+
+    # Assert
+    assert route.call_count == 2
+    assert len(client_instance.state_cache) == 0
+
+
+@respx.mock
+async def test_shared_http_client_is_reused_and_left_open() -> None:
+    """Verify that a shared HTTP client serves requests and survives 'async with' blocks."""
+    # Arrange
+    route = respx.get(f"{TEST_URL}/api/states/{TEST_ENTITY_ID}").mock(
+        return_value=Response(200, json={"entity_id": TEST_ENTITY_ID, "state": "on"}),
+    )
+    shared = httpx.AsyncClient()
+    client_instance = HomeAssistantClient(TEST_URL, TEST_TOKEN, client=shared, state_ttl=0)
+
+    # Act
+    state = await client_instance.get_entity_state(TEST_ENTITY_ID)
+    async with client_instance as client:
+        await client.get_entity_state(TEST_ENTITY_ID)
+
+    # Assert
+    assert state["state"] == "on"
+    assert route.call_count == 2
+    assert route.calls.last.request.headers["authorization"] == f"Bearer {TEST_TOKEN}"
+    assert not shared.is_closed
+    await shared.aclose()
@@ -0,0 +1,282 @@
+"""Tests for the Home Assistant state mirror against a local fake WebSocket server."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import pytest
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application
+from tornado.websocket import WebSocketHandler
+
+from aura_telegram_bot.integrations.home_assistant_ws import (
+    HomeAssistantStateMirror,
+    StaleStateError,
+    websocket_url,
+)
+
+TEST_TOKEN = "fake-long-lived-token"  # noqa: S105
+
+
+def make_state(entity_id: str, state: str) -> dict[str, Any]:
+    """Builds an entity state as Home Assistant sends it."""
+    return {
+        "entity_id": entity_id,
+        "state": state,
+        "attributes": {"friendly_name": entity_id, "unit_of_measurement": "bar"},
+        "last_changed": "2024-01-01T00:00:00+00:00",
+        "last_updated": "2024-01-01T00:00:00+00:00",
+        "context": {"id": "01HX0000000000000000000000", "parent_id": None, "user_id": None},
+    }
+
+
+class FakeHomeAssistant:
+    """The state and subscribers of the fake Home Assistant server."""
+
+    def __init__(self, states: list[dict[str, Any]]) -> None:
+        """Starts the server state with the given entities."""
+        self.states = states
+        self.connections: list[FakeWebSocketHandler] = []
+        self.events_before_states: list[dict[str, Any]] = []
+
+    def push(self, entity_id: str, new_state: dict[str, Any] | None) -> None:
+        """Sends a state_changed event to every subscriber."""
+        for connection in self.connections:
+            connection.send_event(entity_id, new_state)
+
+    def disconnect_all(self) -> None:
+        """Drops every client connection."""
+        for connection in self.connections:
+            connection.close()
+        self.connections.clear()
+
+
+class FakeWebSocketHandler(WebSocketHandler):
+    """Speaks the parts of Home Assistant's WebSocket API the mirror uses."""
+
+    def initialize(self, hub: FakeHomeAssistant) -> None:
+        """Connects the handler to the server state."""
+        self.hub = hub
+        self.subscription: int | None = None
+
+    def open(self) -> None:
+        """Asks the client to authenticate."""
+        self.write_json({"type": "auth_required", "ha_version": "2024.1.0"})
+
+    def on_message(self, message: str | bytes) -> None:
+        """Answers authentication, subscription and state requests."""
+        request = json.loads(message)
+        if request["type"] == "auth":
+            if request["access_token"] == TEST_TOKEN:
+                self.write_json({"type": "auth_ok", "ha_version": "2024.1.0"})
+            else:
+                self.write_json({"type": "auth_invalid", "message": "Invalid access"})
+        elif request["type"] == "subscribe_events":
+            self.subscription = request["id"]
+            self.hub.connections.append(self)
+            self.write_json({"id": request["id"], "type": "result", "success": True})
+        elif request["type"] == "get_states":
+            for event in self.hub.events_before_states:
+                self.send_event(event["entity_id"], event)
+            self.write_json(
+                {
+                    "id": request["id"],
+                    "type": "result",
+                    "success": True,
+                    "result": self.hub.states,
+                },
+            )
+
+    def on_close(self) -> None:
+        """Forgets the subscription."""
+        if self in self.hub.connections:
+            self.hub.connections.remove(self)
+
+    def send_event(self, entity_id: str, new_state: dict[str, Any] | None) -> None:
+        """Sends a state_changed event for the subscription."""
+        self.write_json(
+            {
+                "id": self.subscription,
+                "type": "event",
+                "event": {
+                    "event_type": "state_changed",
+                    "data": {"entity_id": entity_id, "old_state": None, "new_state": new_state},
+                },
+            },
+        )
+
+    def write_json(self, message: dict[str, Any]) -> None:
+        """Sends a JSON message."""
+        self.write_message(json.dumps(message))
+
+
+@pytest.fixture
+async def fake_home_assistant() -> AsyncIterator[tuple[FakeHomeAssistant, str]]:
+    """Runs a fake Home Assistant WebSocket server on a free local port."""
+    hub = FakeHomeAssistant([make_state("sensor.boiler_pressure", "1.5")])
+    sockets = bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+    server = HTTPServer(Application([(r"/api/websocket", FakeWebSocketHandler, {"hub": hub})]))
+    server.add_sockets(sockets)
+    yield hub, f"http://127.0.0.1:{port}"
+    hub.disconnect_all()
+    server.stop()
+
+
+async def eventually(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Waits until a condition holds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.005)
+
+
+def test_websocket_url_is_derived_from_the_base_url() -> None:
+    """Verify that HTTP(S) base URLs map to the WebSocket API endpoint."""
+    assert websocket_url("http://ha.local:8123/") == "ws://ha.local:8123/api/websocket"
+    assert websocket_url("https://ha.example.com") == "wss://ha.example.com/api/websocket"
+
+
+@pytest.mark.asyncio
+async def test_mirror_applies_events_in_order(
+    fake_home_assistant: tuple[FakeHomeAssistant, str],
+) -> None:
+    """Verify that events sent before the state dump are ignored and later ones applied."""
+    # Arrange
+    hub, url = fake_home_assistant
+    hub.events_before_states = [make_state("sensor.boiler_pressure", "1.4")]
+    mirror = HomeAssistantStateMirror(url, TEST_TOKEN)
+    mirror.start()
+    await mirror.wait_until_synced(timeout=5)
+    synced_state = mirror.get_state("sensor.boiler_pressure")
+
+    # Act
+    for i in range(100):
+        hub.push("sensor.boiler_pressure", make_state("sensor.boiler_pressure", f"2.{i}"))
+    hub.push("sensor.removed", None)
+    await eventually(lambda: mirror.events == 101)
+    states = await mirror.get_states(["sensor.boiler_pressure", "sensor.removed"])
+    await mirror.stop()
+
+    # Assert
+    assert synced_state is not None
+    assert synced_state["state"] == "1.5"
+    assert "context" not in synced_state
+    assert list(states) == ["sensor.boiler_pressure"]
+    assert states["sensor.boiler_pressure"]["state"] == "2.99"
+
+
+@pytest.mark.asyncio
+async def test_mirror_reconnects_and_resyncs(
+    fake_home_assistant: tuple[FakeHomeAssistant, str],
+) -> None:
+    """Verify that a lost connection is re-established and all states reloaded."""
+    # Arrange
+    hub, url = fake_home_assistant
+    mirror = HomeAssistantStateMirror(url, TEST_TOKEN, reconnect_delay=0.01)
+    mirror.start()
+    await mirror.wait_until_synced(timeout=5)
+
+    # Act
+    hub.states = [make_state("sensor.boiler_pressure", "0.8")]  # Changed while disconnected.
+    hub.disconnect_all()
+    await eventually(lambda: mirror.resyncs == 2)
+    state = mirror.get_state("sensor.boiler_pressure")
+    await mirror.stop()
+
+    # Assert
+    assert state is not None
+    assert state["state"] == "0.8"
+    assert mirror.reconnects >= 1
+
+
+@pytest.mark.asyncio
+async def test_states_become_stale_after_the_staleness_bound(
+    fake_home_assistant: tuple[FakeHomeAssistant, str],
+) -> None:
+    """Verify that last known states are served only for a bounded time while disconnected."""
+    # Arrange
+    now = [0.0]
+    hub, url = fake_home_assistant
+    mirror = HomeAssistantStateMirror(
+        url,
+        TEST_TOKEN,
+        max_staleness=30,
+        reconnect_delay=60,
+        clock=lambda: now[0],
+    )
+    mirror.start()
+    await mirror.wait_until_synced(timeout=5)
+
+    # Act
+    hub.disconnect_all()
+    await eventually(lambda: mirror.reconnects == 0 and not mirror.in_sync)
+    now[0] = 30.0
+    within_bound = mirror.get_state("sensor.boiler_pressure")
+    now[0] = 30.1
+
+    # Assert
+    assert within_bound is not None
+    with pytest.raises(StaleStateError):
+        mirror.get_state("sensor.boiler_pressure")
+    await mirror.stop()
+
+
+@pytest.mark.asyncio
+async def test_rejected_token_stops_the_mirror(
+    fake_home_assistant: tuple[FakeHomeAssistant, str],
+) -> None:
+    """Verify that an invalid token is not retried and no states are served."""
+    # Arrange
+    _, url = fake_home_assistant
+    mirror = HomeAssistantStateMirror(url, "wrong-token", reconnect_delay=0.01)
+
+    # Act
+    mirror.start()
+    await eventually(lambda: not mirror.running)
+
+    # Assert
+    assert mirror.reconnects == 0
+    with pytest.raises(StaleStateError):
+        mirror.get_state("sensor.boiler_pressure")
+
+
+@pytest.mark.asyncio
+async def test_tens_of_thousands_of_entities_are_served_from_memory(
+    fake_home_assistant: tuple[FakeHomeAssistant, str],
+) -> None:
+    """Verify the memory footprint and lookup speed of a large installation."""
+    # Arrange
+    entity_count = 30_000
+    hub, url = fake_home_assistant
+    hub.states = [
+        make_state(f"sensor.entity_{i}", "on" if i % 2 else "off") for i in range(entity_count)
+    ]
+    entity_ids = [f"sensor.entity_{i}" for i in range(0, entity_count, 3)]
+    mirror = HomeAssistantStateMirror(url, TEST_TOKEN)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    # Act
+    mirror.start()
+    await mirror.wait_until_synced(timeout=30)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    started = time.perf_counter()
+    states = await mirror.get_states(entity_ids)
+    lookup_seconds = (time.perf_counter() - started) / len(entity_ids)
+    await mirror.stop()
+
+    # Assert
+    assert len(mirror) == entity_count
+    assert len(states) == len(entity_ids)
+    assert retained / entity_count < 2048, f"{retained / entity_count:.0f} bytes per entity"
+    assert lookup_seconds < 10e-6
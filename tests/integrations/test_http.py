@@ -0,0 +1,40 @@
+"""Unit tests for the shared HTTP client factory."""
+
+from __future__ import annotations
+
+import importlib.util
+
+import pytest
+
+from aura_telegram_bot.integrations.http import create_http_client
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_http_client_uses_the_configured_pool_limits() -> None:
+    """Verify that the pool limits and keep-alive expiry reach the transport."""
+    # Act
+    client = create_http_client(
+        max_connections=7,
+        max_keepalive_connections=3,
+        keepalive_expiry=12.5,
+    )
+
+    # Assert
+    pool = client._transport._pool  # ty: ignore[unresolved-attribute]
+    assert (pool._max_connections, pool._max_keepalive_connections) == (7, 3)
+    assert pool._keepalive_expiry == 12.5
+    await client.aclose()
+
+
+async def test_http2_falls_back_to_http1_without_h2(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that requesting HTTP/2 without the h2 package does not fail."""
+    # Arrange
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+
+    # Act
+    client = create_http_client(http2=True)
+
+    # Assert
+    assert not client._transport._pool._http2  # ty: ignore[unresolved-attribute]
+    await client.aclose()
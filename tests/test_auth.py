@@ -2,23 +2,52 @@
 
 from __future__ import annotations
 
+import logging
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from aura_telegram_bot.auth import restricted
+from aura_telegram_bot import auth
+from aura_telegram_bot.auth import RATE_LIMITED_MESSAGE, restricted
+from aura_telegram_bot.core.scheduler import TokenBucket
+from aura_telegram_bot.metrics import AUTH_REJECTIONS, AUTH_SHED
 
 # Mark all tests in this file as asyncio
 pytestmark = pytest.mark.asyncio
 
 
+def configure(
+    mock_get_settings: MagicMock,
+    allowed: list[int],
+    *,
+    requests_per_minute: float = 0,
+    burst: int = 5,
+) -> MagicMock:
+    """Sets the allowlist and per-user limits of the mocked settings and returns them."""
+    settings = MagicMock()
+    settings.allowed_telegram_user_ids = allowed
+    settings.user_requests_per_minute = requests_per_minute
+    settings.user_burst = burst
+    mock_get_settings.return_value = settings
+    return settings
+
+
+def make_update(user_id: int) -> MagicMock:
+    """Builds a mocked message update from the given user."""
+    update = MagicMock()
+    update.effective_user.id = user_id
+    update.effective_user.first_name = "Test"
+    update.message.reply_text = AsyncMock()
+    return update
+
+
 @patch("aura_telegram_bot.auth.get_settings")
 async def test_restricted_allows_authorized_user(
     mock_get_settings: MagicMock,
 ) -> None:
     """Verify that the decorator allows a user with an ID in the whitelist."""
     # Arrange
-    mock_get_settings.return_value.allowed_telegram_user_ids = [12345]
+    configure(mock_get_settings, [12345])
 
     update = MagicMock()
     update.effective_user.id = 12345
@@ -42,7 +71,7 @@ async def test_restricted_blocks_unauthorized_user(
 ) -> None:
     """Verify that the decorator blocks a user with an ID not in the whitelist."""
     # Arrange
-    mock_get_settings.return_value.allowed_telegram_user_ids = [12345]
+    configure(mock_get_settings, [12345])
 
     update = MagicMock()
     update.effective_user.id = 99999  # Unauthorized ID
@@ -51,6 +80,7 @@ async def test_restricted_blocks_unauthorized_user(
 
     original_handler = AsyncMock()
     decorated_handler = restricted(original_handler)
+    rejections = AUTH_REJECTIONS.value()
 
     # Act
     result = await decorated_handler(update, context)
@@ -58,6 +88,7 @@ async def test_restricted_blocks_unauthorized_user(
     # Assert
     assert result is None
     original_handler.assert_not_awaited()
+    assert AUTH_REJECTIONS.value() == rejections + 1
 
 
 @patch("aura_telegram_bot.auth.get_settings")
@@ -66,7 +97,7 @@ async def test_restricted_ignores_update_without_effective_user(
 ) -> None:
     """Verify that the decorator handles updates without an effective_user."""
     # Arrange: This simulates a system-level update, like a channel post.
-    mock_get_settings.return_value.allowed_telegram_user_ids = [12345]
+    configure(mock_get_settings, [12345])
 
     update = MagicMock()
     update.effective_user = None  # No user associated with the update
@@ -81,3 +112,72 @@ async def test_restricted_ignores_update_without_effective_user(
     # Assert
     assert result is None
     original_handler.assert_not_awaited()
+
+
+@patch("aura_telegram_bot.auth.get_settings")
+async def test_restricted_sheds_requests_over_the_user_budget(
+    mock_get_settings: MagicMock,
+) -> None:
+    """Verify that a user who exceeds the burst is shed and told so only once."""
+    # Arrange
+    configure(mock_get_settings, [12345], requests_per_minute=1, burst=2)
+    update = make_update(12345)
+    original_handler = AsyncMock(return_value="Success")
+    decorated_handler = restricted(original_handler)
+    shed = AUTH_SHED.value(("rate_limited",))
+
+    # Act
+    results = [await decorated_handler(update, MagicMock()) for _ in range(4)]
+
+    # Assert
+    assert results == ["Success", "Success", None, None]
+    assert original_handler.await_count == 2
+    update.message.reply_text.assert_awaited_once_with(RATE_LIMITED_MESSAGE)
+    assert AUTH_SHED.value(("rate_limited",)) == shed + 2
+
+
+@patch("aura_telegram_bot.auth.get_settings")
+async def test_restricted_follows_a_reloaded_allowlist(
+    mock_get_settings: MagicMock,
+) -> None:
+    """Verify that replaced settings take effect, keeping the budgets of remaining users."""
+    # Arrange
+    configure(mock_get_settings, [12345, 67890], requests_per_minute=1, burst=1)
+    decorated_handler = restricted(AsyncMock(return_value="Success"))
+    first = await decorated_handler(make_update(12345), MagicMock())
+
+    # Act
+    configure(mock_get_settings, [12345], requests_per_minute=1, burst=1)
+    again = await decorated_handler(make_update(12345), MagicMock())
+    removed = await decorated_handler(make_update(67890), MagicMock())
+
+    # Assert
+    assert first == "Success"
+    assert again is None  # Still over budget after the reload.
+    assert removed is None
+
+
+@patch("aura_telegram_bot.auth.get_settings")
+async def test_restricted_limits_logging_of_unauthorized_attempts(
+    mock_get_settings: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Verify that a flood of unauthorized updates is counted but logged only in bursts."""
+    # Arrange
+    configure(mock_get_settings, [12345])
+    monkeypatch.setattr(auth, "_rejection_log", TokenBucket(0, 2))
+    monkeypatch.setattr(auth, "_suppressed_rejection_logs", 0)
+    decorated_handler = restricted(AsyncMock())
+    rejections = AUTH_REJECTIONS.value()
+    unlogged = AUTH_SHED.value(("rejection_log",))
+
+    # Act
+    with caplog.at_level(logging.WARNING, logger="aura_telegram_bot.auth"):
+        for _ in range(10):
+            await decorated_handler(make_update(99999), MagicMock())
+
+    # Assert
+    assert len(caplog.records) == 2
+    assert AUTH_REJECTIONS.value() == rejections + 10
+    assert AUTH_SHED.value(("rejection_log",)) == unlogged + 8
@@ -0,0 +1,86 @@
+"""Unit tests for the batch mode of the command-line interface."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from aura_telegram_bot.core.engine import ResponseStats
+from aura_telegram_bot.core.scheduler import Priority
+from cli import BatchQuestion, completed_ids, read_questions, run_batch
+
+
+class StubEngine:
+    """Answers every question after a short delay, tracking how many run at once."""
+
+    def __init__(self) -> None:
+        """Starts with no questions running."""
+        self.running = 0
+        self.max_running = 0
+
+    async def get_response(
+        self, user_input: str, priority: Priority, *, stats: ResponseStats
+    ) -> str:
+        """Echoes the question as if the model had answered it."""
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        stats.source = "model"
+        stats.prompt_tokens = len(user_input)
+        return f"Answer to {user_input}"
+
+
+def test_read_questions_accepts_plain_and_json_lines() -> None:
+    """Verify that plain questions are numbered by line and JSON ones keep their ID."""
+    # Act
+    questions = read_questions(
+        ["What does F2 mean?\n", "\n", '{"id": "eco", "question": "How do I use eco mode?"}\n'],
+    )
+
+    # Assert
+    assert questions == [
+        BatchQuestion("1", "What does F2 mean?"),
+        BatchQuestion("eco", "How do I use eco mode?"),
+    ]
+
+
+def test_completed_ids_skip_failed_and_truncated_results(tmp_path: Path) -> None:
+    """Verify that a resumed batch asks again what failed or was cut short."""
+    # Arrange
+    output = tmp_path / "answers.jsonl"
+    output.write_text(
+        '{"id": "1", "source": "model"}\n{"id": "2", "source": "error"}\n{"id": "3", "sou',
+        encoding="utf-8",
+    )
+
+    # Act
+    done = completed_ids(output)
+
+    # Assert
+    assert done == {"1"}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_answers_concurrently_and_writes_json_lines() -> None:
+    """Verify that every question gets one result line, within the concurrency limit."""
+    # Arrange
+    engine = StubEngine()
+    questions = [BatchQuestion(str(number), f"question {number}") for number in range(10)]
+    output = io.StringIO()
+
+    # Act
+    answered = await run_batch(engine, questions, output, concurrency=3)  # ty: ignore[invalid-argument-type]
+
+    # Assert
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert answered == 10
+    assert sorted(int(record["id"]) for record in records) == list(range(10))
+    assert engine.max_running == 3
+    assert records[0]["source"] == "model"
+    assert records[0]["prompt_tokens"] > 0
+    assert records[0]["latency_ms"] >= 0
@@ -0,0 +1,43 @@
+"""Unit tests for the application settings."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from aura_telegram_bot.config import Settings
+
+REQUIRED: dict[str, Any] = {
+    "telegram_token": "token",
+    "gemini_api_key": "key",
+    "home_assistant_token": "ha-token",
+    "home_assistant_url": "http://homeassistant.local:8123",
+    "allowed_telegram_user_ids": [12345],
+}
+
+
+def test_polling_is_the_default_update_mode() -> None:
+    """Verify that no webhook settings are needed for long polling."""
+    settings = Settings(_env_file=None, **REQUIRED)
+
+    assert settings.telegram_update_mode == "polling"
+
+
+def test_webhook_mode_requires_url_and_secret_token() -> None:
+    """Verify that webhook mode is rejected without a URL and a secret token."""
+    with pytest.raises(ValidationError, match="WEBHOOK_SECRET_TOKEN"):
+        Settings(_env_file=None, telegram_update_mode="webhook", **REQUIRED)
+
+
+def test_webhook_secret_token_must_use_allowed_characters() -> None:
+    """Verify that the secret token is validated against Telegram's character set."""
+    with pytest.raises(ValidationError):
+        Settings(
+            _env_file=None,
+            telegram_update_mode="webhook",
+            webhook_url="https://bot.example.com/telegram",
+            webhook_secret_token="not allowed!",  # noqa: S106
+            **REQUIRED,
+        )
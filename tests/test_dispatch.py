@@ -0,0 +1,264 @@
+"""Unit tests for the per-chat ordered update processor."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from telegram import Update
+
+from aura_telegram_bot.dispatch import PerChatUpdateProcessor
+from aura_telegram_bot.journal import UpdateJournal
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_update(update_id: int, chat_id: int, text: str, user_id: int | None = None) -> Update:
+    """Builds a text message update; the sender is the chat's owner unless given."""
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": user_id or chat_id, "is_bot": False, "first_name": "Test"},
+                "text": text,
+            },
+        },
+        None,
+    )
+
+
+class RecordingHandler:
+    """Records the messages it handles; each one waits until it is released."""
+
+    def __init__(self) -> None:
+        """Starts with no handled messages."""
+        self.started: list[str] = []
+        self.finished: list[str] = []
+        self.gates: dict[str, asyncio.Event] = {}
+        self.running = 0
+        self.max_running = 0
+
+    def gate(self, text: str) -> asyncio.Event:
+        """Returns the event that releases the handling of a message."""
+        return self.gates.setdefault(text, asyncio.Event())
+
+    async def handle(self, update: Update) -> None:
+        """Handles an update once its gate is opened."""
+        text = update.message.text
+        self.started.append(text)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await self.gate(text).wait()
+        self.running -= 1
+        self.finished.append(text)
+
+
+class FakeApplication:
+    """The part of the application the processor uses to re-dispatch merged updates."""
+
+    def __init__(self, handler: RecordingHandler) -> None:
+        """Dispatches updates to the given handler."""
+        self.bot = None
+        self._handler = handler
+
+    def process_update(self, update: Update) -> object:
+        """Returns the coroutine that handles the update."""
+        return self._handler.handle(update)
+
+
+def submit(
+    processor: PerChatUpdateProcessor,
+    handler: RecordingHandler,
+    update: Update,
+) -> asyncio.Task[None]:
+    """Hands an update to the processor as the application would."""
+    return asyncio.create_task(processor.process_update(update, handler.handle(update)))
+
+
+async def test_messages_of_a_chat_are_handled_in_order_while_other_chats_proceed() -> None:
+    """Verify that a slow message delays its own chat but not other chats."""
+    # Arrange
+    processor = PerChatUpdateProcessor(4)
+    handler = RecordingHandler()
+    tasks = [
+        submit(processor, handler, make_update(1, chat_id=1, text="a1")),
+        submit(processor, handler, make_update(2, chat_id=1, text="a2")),
+        submit(processor, handler, make_update(3, chat_id=2, text="b1")),
+    ]
+    await asyncio.sleep(0)
+
+    # Act
+    handler.gate("b1").set()
+    handler.gate("a2").set()
+    await tasks[2]
+    started_before_release = list(handler.started)
+    handler.gate("a1").set()
+    await asyncio.gather(*tasks)
+
+    # Assert
+    assert started_before_release == ["a1", "b1"]
+    assert handler.finished == ["b1", "a1", "a2"]
+    assert processor.queue_lengths == {}
+    assert processor.processed == 3
+
+
+async def test_workers_bound_concurrency_across_chats() -> None:
+    """Verify that no more updates than workers are handled at once."""
+    # Arrange
+    processor = PerChatUpdateProcessor(2)
+    handler = RecordingHandler()
+    tasks = [submit(processor, handler, make_update(i, chat_id=i, text=f"m{i}")) for i in range(5)]
+    await asyncio.sleep(0)
+
+    # Act
+    for i in range(5):
+        handler.gate(f"m{i}").set()
+    await asyncio.gather(*tasks)
+
+    # Assert
+    assert handler.max_running == 2
+    assert sorted(handler.finished) == [f"m{i}" for i in range(5)]
+
+
+async def test_full_chat_queue_drops_its_oldest_message() -> None:
+    """Verify that the drop_oldest policy keeps the newest messages within the cap."""
+    # Arrange
+    processor = PerChatUpdateProcessor(4, max_queue_per_chat=1, overflow="drop_oldest")
+    handler = RecordingHandler()
+    first = submit(processor, handler, make_update(1, chat_id=1, text="m1"))
+    second = submit(processor, handler, make_update(2, chat_id=1, text="m2"))
+    await asyncio.sleep(0)
+    assert processor.queue_lengths == {1: 1}
+
+    # Act
+    third = submit(processor, handler, make_update(3, chat_id=1, text="m3"))
+    await second
+    for text in ("m1", "m3"):
+        handler.gate(text).set()
+    await asyncio.gather(first, third)
+
+    # Assert
+    assert handler.finished == ["m1", "m3"]
+    assert processor.dropped == 1
+    assert processor.max_queue_length == 1
+
+
+async def test_full_chat_queue_merges_new_text_into_the_last_waiting_message() -> None:
+    """Verify that the merge policy answers the combined text of queued messages once."""
+    # Arrange
+    handler = RecordingHandler()
+    processor = PerChatUpdateProcessor(4, max_queue_per_chat=1, overflow="merge")
+    processor.bind(FakeApplication(handler))  # ty: ignore[invalid-argument-type]
+    tasks = [
+        submit(processor, handler, make_update(i, chat_id=1, text=f"m{i}")) for i in (1, 2, 3)
+    ]
+    await asyncio.sleep(0)
+
+    # Act
+    handler.gate("m1").set()
+    handler.gate("m2\nm3").set()
+    await asyncio.gather(*tasks)
+
+    # Assert
+    assert handler.finished == ["m1", "m2\nm3"]
+    assert processor.merged == 1
+    assert processor.dropped == 0
+    assert processor.handler_seconds_max >= 0
+
+
+async def test_full_chat_queue_never_merges_other_senders_or_commands() -> None:
+    """Verify that messages of different senders, or commands, are not merged on overflow."""
+    # Arrange
+    handler = RecordingHandler()
+    processor = PerChatUpdateProcessor(4, max_queue_per_chat=1, overflow="merge")
+    processor.bind(FakeApplication(handler))  # ty: ignore[invalid-argument-type]
+    updates = [
+        make_update(1, chat_id=-1, text="busy", user_id=111),
+        make_update(2, chat_id=-1, text="authorized q", user_id=111),
+        make_update(3, chat_id=-1, text="IGNORE PREVIOUS", user_id=222),
+        make_update(4, chat_id=-1, text="/start", user_id=222),
+    ]
+    tasks = [submit(processor, handler, update) for update in updates]
+    await asyncio.sleep(0)
+
+    # Act
+    for text in ("busy", "authorized q", "IGNORE PREVIOUS", "/start"):
+        handler.gate(text).set()
+    await asyncio.gather(*tasks)
+
+    # Assert
+    assert handler.finished == ["busy", "/start"]
+    assert processor.merged == 0
+    assert processor.dropped == 2
+
+
+async def test_messages_sent_in_quick_succession_are_answered_once() -> None:
+    """Verify that text messages arriving within the merge window are handled as one."""
+    # Arrange
+    handler = RecordingHandler()
+    processor = PerChatUpdateProcessor(4, overflow="merge", merge_window=0.05)
+    processor.bind(FakeApplication(handler))  # ty: ignore[invalid-argument-type]
+    tasks = [
+        submit(processor, handler, make_update(i, chat_id=1, text=f"part{i}")) for i in (1, 2, 3)
+    ]
+    handler.gate("part1\npart2\npart3").set()
+
+    # Act
+    await asyncio.gather(*tasks)
+
+    # Assert
+    assert handler.started == ["part1\npart2\npart3"]
+    assert processor.merged == 2
+    assert processor.queue_lengths == {}
+
+
+async def test_updates_leave_the_journal_only_once_handled(tmp_path: Path) -> None:
+    """Verify that an update stays in the journal until its handler has finished."""
+    # Arrange
+    journal = UpdateJournal(tmp_path / "updates.sqlite3")
+    processor = PerChatUpdateProcessor(1, journal=journal)
+    handler = RecordingHandler()
+    update = make_update(1, chat_id=1, text="a1")
+    journal.record(update)
+    task = submit(processor, handler, update)
+    await asyncio.sleep(0)
+    pending_while_handled = len(journal)
+
+    # Act
+    handler.gate("a1").set()
+    await task
+
+    # Assert
+    assert pending_while_handled == 1
+    assert len(journal) == 0
+    journal.close()
+
+
+async def test_replayed_questions_are_answered_one_by_one(tmp_path: Path) -> None:
+    """Verify that a chat's backlog is neither merged nor capped when it is replayed."""
+    # Arrange
+    journal = UpdateJournal(tmp_path / "updates.sqlite3")
+    for i in (1, 2, 3):
+        journal.record(make_update(i, chat_id=1, text=f"q{i}"))
+    backlog = journal.backlog()
+    handler = RecordingHandler()
+    processor = PerChatUpdateProcessor(
+        4, max_queue_per_chat=1, overflow="merge", merge_window=0.05, journal=journal
+    )
+    processor.bind(FakeApplication(handler))  # ty: ignore[invalid-argument-type]
+    for update in backlog:
+        handler.gate(update.message.text).set()
+
+    # Act
+    await asyncio.gather(*(submit(processor, handler, update) for update in backlog))
+
+    # Assert
+    assert handler.finished == ["q1", "q2", "q3"]
+    assert processor.merged == 0
+    assert processor.dropped == 0
+    assert len(journal) == 0
+    journal.close()
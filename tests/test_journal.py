@@ -0,0 +1,146 @@
+"""Unit tests for the durable journal of unhandled updates."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from telegram import Update
+
+from aura_telegram_bot.journal import JournaledUpdateQueue, UpdateJournal
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> Update:
+    """Builds a text message update for a private chat."""
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+                "text": text,
+            },
+        },
+        None,
+    )
+
+
+class FakeClock:
+    """A wall clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Starts at a fixed time."""
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        """Returns the current time."""
+        return self.now
+
+
+def test_updates_and_offset_persist_across_restarts(tmp_path: Path) -> None:
+    """Verify that unhandled updates survive a restart and redelivered ones are rejected."""
+    # Arrange
+    path = tmp_path / "updates.sqlite3"
+    journal = UpdateJournal(path)
+    journal.record(make_update(1, chat_id=10, text="first"))
+    journal.record(make_update(2, chat_id=20, text="second"))
+    journal.close()
+
+    # Act
+    reopened = UpdateJournal(path)
+    redelivered = reopened.record(make_update(2, chat_id=20, text="second"))
+    backlog = reopened.backlog()
+
+    # Assert
+    assert reopened.offset == 2
+    assert redelivered is False
+    assert [update.message.text for update in backlog] == ["first", "second"]
+    reopened.close()
+
+
+def test_completing_an_update_forgets_earlier_updates_of_its_chat(tmp_path: Path) -> None:
+    """Verify that a handled update clears its chat's earlier updates, except failed ones."""
+    # Arrange
+    journal = UpdateJournal(tmp_path / "updates.sqlite3")
+    updates = [
+        make_update(1, chat_id=10, text="failed"),
+        make_update(2, chat_id=10, text="merged"),
+        make_update(3, chat_id=20, text="other chat"),
+        make_update(4, chat_id=10, text="latest"),
+    ]
+    for update in updates:
+        journal.record(update)
+    journal.fail(updates[0])
+
+    # Act
+    journal.complete(updates[3])
+
+    # Assert
+    assert [update.update_id for update in journal.backlog()] == [1, 3]
+    journal.close()
+
+
+def test_failed_merged_update_is_replayed_once(tmp_path: Path) -> None:
+    """Verify that the messages merged into a failed update are not replayed on their own."""
+    # Arrange
+    journal = UpdateJournal(tmp_path / "updates.sqlite3")
+    journal.record(make_update(1, chat_id=10, text="A"))
+    journal.record(make_update(2, chat_id=10, text="B"))
+    journal.record(make_update(3, chat_id=20, text="other chat"))
+
+    # Act
+    journal.fail(make_update(2, chat_id=10, text="A\nB"))
+
+    # Assert
+    assert [update.message.text for update in journal.backlog()] == ["A\nB", "other chat"]
+    journal.close()
+
+
+def test_backlog_skips_stale_exhausted_and_repeated_updates(tmp_path: Path) -> None:
+    """Verify that the backlog drops old, repeatedly failing and duplicate questions."""
+    # Arrange
+    clock = FakeClock()
+    journal = UpdateJournal(tmp_path / "updates.sqlite3", max_attempts=2, max_age=60, clock=clock)
+    stale = make_update(1, chat_id=10, text="Stale")
+    journal.record(stale)
+    clock.now += 120
+    exhausted = make_update(2, chat_id=10, text="exhausted")
+    journal.record(exhausted)
+    journal.fail(exhausted)
+    journal.fail(exhausted)
+    for update_id, chat_id, text in [
+        (3, 10, "Is it on?"),
+        (4, 20, "is it on?"),
+        (5, 10, "is  IT on?"),
+    ]:
+        journal.record(make_update(update_id, chat_id, text))
+
+    # Act
+    backlog = journal.backlog()
+
+    # Assert
+    assert [update.update_id for update in backlog] == [3, 4]
+    assert len(journal) == 2
+    journal.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_records_updates_and_skips_redelivered_ones(tmp_path: Path) -> None:
+    """Verify that the update queue journals new updates and drops ones seen before."""
+    # Arrange
+    journal = UpdateJournal(tmp_path / "updates.sqlite3")
+    queue = JournaledUpdateQueue(journal)
+    update = make_update(7, chat_id=10, text="hello")
+
+    # Act
+    await queue.put(update)
+    await queue.put(update)
+    await queue.put("not an update")
+
+    # Assert
+    assert queue.qsize() == 2
+    assert len(journal) == 1
+    assert journal.duplicates == 1
+    journal.close()
@@ -0,0 +1,128 @@
+"""Unit tests for the queue-based, structured logging."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import random
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from aura_telegram_bot import logs
+from aura_telegram_bot.logs import (
+    SamplingFilter,
+    configure_logging,
+    request_context,
+    user_text,
+)
+
+
+@pytest.fixture
+def restore_root_logger(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Puts the root logger's handlers and level, and the message settings, back after the test."""
+    monkeypatch.setattr(logs, "_message_bodies", logs._message_bodies)
+    monkeypatch.setattr(logs, "_message_max_chars", logs._message_max_chars)
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+@pytest.mark.usefixtures("restore_root_logger")
+def test_records_are_written_as_json_with_the_request_id() -> None:
+    """Verify that a record logged within a request carries its ID and a redacted message."""
+    # Arrange
+    stream = io.StringIO()
+    listener = configure_logging(stream=stream, message_bodies="truncate", message_max_chars=5)
+    logger = logging.getLogger("aura_telegram_bot.test")
+
+    # Act
+    with request_context(42):
+        logger.info("Question: %s", user_text("What does fault F2 mean?"))
+    logger.info("Outside a request.")
+    listener.stop()
+
+    # Assert
+    first, second = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert first["request_id"] == "42"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "aura_telegram_bot.test"
+    assert first["message"] == "Question: What … (+19)"
+    assert second["request_id"] == "-"
+
+
+@pytest.mark.usefixtures("restore_root_logger")
+def test_records_are_formatted_by_the_listener_thread() -> None:
+    """Verify that the logging thread only queues the record."""
+    # Arrange
+    formatted_in: list[str] = []
+
+    class Probe:
+        def __str__(self) -> str:
+            formatted_in.append(threading.current_thread().name)
+            return "probe"
+
+    listener = configure_logging(stream=io.StringIO(), json_format=False)
+
+    # Act
+    logging.getLogger("aura_telegram_bot.test").info("%s", Probe())
+    listener.stop()
+
+    # Assert
+    assert formatted_in
+    assert threading.current_thread().name not in formatted_in
+
+
+def test_redacted_messages_keep_only_their_length_and_hash(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verify that redaction hides the text but tells equal messages apart."""
+    # Arrange
+    monkeypatch.setattr(logs, "_message_bodies", "redact")
+
+    # Act
+    rendered = str(user_text("My address is 1 Main Street"))
+    again = str(user_text("My address is 1 Main Street"))
+
+    # Assert
+    assert "Main Street" not in rendered
+    assert rendered.startswith("<27 chars #")
+    assert rendered == again
+
+
+def test_sampling_keeps_a_share_of_info_records_and_every_warning() -> None:
+    """Verify that a sampled logger and its children drop records below WARNING."""
+    # Arrange
+    sampling = SamplingFilter(
+        {"aura_telegram_bot": 0.1, "aura_telegram_bot.core.engine": 1.0},
+        rng=random.Random(7),  # noqa: S311
+    )
+
+    def record(name: str, level: int) -> logging.LogRecord:
+        return logging.LogRecord(name, level, __file__, 1, "message", None, None)
+
+    # Act
+    kept_info = sum(
+        sampling.filter(record("aura_telegram_bot.auth", logging.INFO)) for _ in range(1000)
+    )
+    kept_warnings = sum(
+        sampling.filter(record("aura_telegram_bot.auth", logging.WARNING)) for _ in range(100)
+    )
+    kept_engine = sum(
+        sampling.filter(record("aura_telegram_bot.core.engine", logging.INFO)) for _ in range(100)
+    )
+    kept_other = sum(sampling.filter(record("telegram.ext", logging.INFO)) for _ in range(100))
+
+    # Assert
+    assert 60 < kept_info < 140
+    assert sampling.dropped == 1000 - kept_info
+    assert kept_warnings == 100
+    assert kept_engine == 100
+    assert kept_other == 100
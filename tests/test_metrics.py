@@ -0,0 +1,214 @@
+"""Unit tests for the metrics registry, tracing and the /metrics endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+import pytest
+from _pytest.logging import LogCaptureFixture
+from telegram import Update
+
+from aura_telegram_bot.core.watcher import KnowledgeBaseWatcher
+from aura_telegram_bot.dispatch import PerChatUpdateProcessor
+from aura_telegram_bot.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsServer,
+    Registry,
+    configure_tracing,
+    knowledge_base_watcher_collector,
+    span,
+    trace_request,
+    update_processor_collector,
+)
+
+
+def test_registry_renders_the_text_exposition_format() -> None:
+    """Verify that counters, gauges and collectors render as Prometheus text."""
+    # Arrange
+    registry = Registry()
+    errors = registry.register(Counter("errors_total", "Errors.", ["component"]))
+    tokens = registry.register(Gauge("prompt_tokens", "Prompt size."))
+    registry.add_collector(
+        lambda: [("cache_hits_total", "counter", "Hits.", {(("cache", 'a"b'),): 3})],
+    )
+
+    # Act
+    errors.inc(labels=("gemini",))
+    errors.inc(2, labels=("gemini",))
+    tokens.set(1.5)
+    text = registry.render()
+
+    # Assert
+    assert "# TYPE errors_total counter\n" in text
+    assert 'errors_total{component="gemini"} 3\n' in text
+    assert "prompt_tokens 1.5\n" in text
+    assert 'cache_hits_total{cache="a\\"b"} 3\n' in text
+
+
+def test_histogram_counts_observations_in_cumulative_buckets() -> None:
+    """Verify that each bucket counts the observations up to its bound."""
+    # Arrange
+    histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    # Act
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    lines = list(histogram.render())
+
+    # Assert
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_count 4" in lines
+    assert "latency_seconds_sum 2.65" in lines
+
+
+def test_registry_rejects_duplicate_metric_names() -> None:
+    """Verify that a metric name can only be registered once."""
+    registry = Registry()
+    registry.register(Counter("requests_total", "Requests."))
+
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(Counter("requests_total", "Requests."))
+
+
+def test_traced_requests_log_their_spans(caplog: LogCaptureFixture) -> None:
+    """Verify that spans are recorded only inside a sampled trace."""
+    # Arrange
+    configure_tracing(1.0)
+
+    # Act
+    try:
+        with span("ignored"):
+            pass
+        with (
+            caplog.at_level(logging.INFO, logger="aura_telegram_bot.metrics"),
+            trace_request("update") as trace,
+        ):
+            with span("cache"):
+                pass
+            with span("model"):
+                pass
+    finally:
+        configure_tracing(0.0)
+
+    # Assert
+    assert trace is not None
+    assert [recorded.name for recorded in trace.spans] == ["cache", "model", "update"]
+    assert "Trace update: cache@" in caplog.text
+
+
+def test_tracing_is_off_by_default() -> None:
+    """Verify that requests are not traced unless sampling is enabled."""
+    with trace_request("update") as trace:
+        assert trace is None
+
+
+async def test_metrics_server_serves_the_registry() -> None:
+    """Verify that GET /metrics returns the rendered registry and other paths a 404."""
+    # Arrange
+    registry = Registry()
+    registry.register(Counter("requests_total", "Requests.")).inc()
+    server = MetricsServer(registry, port=0)
+    await server.start()
+
+    async def fetch(path: str) -> bytes:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    # Act
+    try:
+        metrics = await fetch("/metrics")
+        missing = await fetch("/other")
+    finally:
+        await server.stop()
+
+    # Assert
+    assert metrics.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert metrics.endswith(b"requests_total 1\n")
+    assert missing.startswith(b"HTTP/1.1 404 Not Found\r\n")
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    """Builds a text message update for a private chat."""
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+                "text": f"message {update_id}",
+            },
+        },
+        None,
+    )
+
+
+async def test_update_processor_collector_exports_queue_depth() -> None:
+    """Verify that the waiting updates are exported in total, for the busiest chat and by chat."""
+    # Arrange
+    processor = PerChatUpdateProcessor(4, overflow="drop_oldest")
+    release = asyncio.Event()
+    collect = update_processor_collector(processor)
+    chats = [1, 1, 1, 2, 2, 3]
+    tasks = [
+        asyncio.create_task(
+            processor.process_update(make_update(update_id, chat_id), release.wait())
+        )
+        for update_id, chat_id in enumerate(chats, start=1)
+    ]
+    await asyncio.sleep(0)
+
+    # Act
+    try:
+        samples = {name: values for name, _, _, values in collect()}
+    finally:
+        release.set()
+        await asyncio.gather(*tasks)
+
+    # Assert
+    assert samples["aura_update_queue_length"] == {(): 3}
+    assert samples["aura_update_queue_length_max"] == {(): 2}
+    assert samples["aura_update_queues_busy"] == {(): 2}
+    assert samples["aura_updates_total"][(("outcome", "processed"),)] == 0
+
+
+async def test_knowledge_base_watcher_collector_exports_reloads(tmp_path: Path) -> None:
+    """Verify that reloads, failed reloads and the last reload time are exported."""
+    # Arrange
+    path = tmp_path / "knowledge_base.txt"
+    path.write_text("version 1", encoding="utf-8")
+
+    async def on_change(text: str) -> None:
+        if text == "broken":
+            raise ValueError(text)
+
+    watcher = KnowledgeBaseWatcher(path, on_change)
+    collect = knowledge_base_watcher_collector(watcher)
+    before = {name: values for name, _, _, values in collect()}
+
+    # Act
+    for step, text in enumerate(["version 2", "broken"], start=1):
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, ns=(0, step * 1_000_000_000))
+        await watcher.check()
+    after = {name: values for name, _, _, values in collect()}
+
+    # Assert
+    assert "aura_knowledge_base_last_reload_seconds" not in before
+    assert after["aura_knowledge_base_reloads_total"] == {
+        (("result", "success"),): 1,
+        (("result", "failure"),): 1,
+    }
+    assert after["aura_knowledge_base_last_reload_seconds"] == {(): watcher.last_reload_seconds}
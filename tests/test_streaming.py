@@ -0,0 +1,110 @@
+"""Unit tests for the progressive Telegram message editor."""
+
+from __future__ import annotations
+
+import pytest
+
+from aura_telegram_bot.streaming import TELEGRAM_MAX_MESSAGE_LENGTH, ThrottledMessageEditor
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeClock:
+    """A manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Starts the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Returns the current fake time."""
+        return self.now
+
+
+class FakeMessage:
+    """A Telegram message that records every edit."""
+
+    def __init__(self, text: str) -> None:
+        """Creates the message with its initial text."""
+        self.history = [text]
+
+    async def edit_text(self, text: str) -> FakeMessage:
+        """Records the new text of the message."""
+        self.history.append(text)
+        return self
+
+
+class FakeChat:
+    """Collects the messages sent by the editor."""
+
+    def __init__(self) -> None:
+        """Starts with no messages."""
+        self.messages: list[FakeMessage] = []
+
+    async def send(self, text: str) -> FakeMessage:
+        """Sends a new fake message."""
+        message = FakeMessage(text)
+        self.messages.append(message)
+        return message
+
+
+async def test_first_chunk_is_sent_immediately_and_edits_are_throttled() -> None:
+    """Verify that chunks arrive in order and edits respect the minimum interval."""
+    # Arrange
+    clock = FakeClock()
+    chat = FakeChat()
+    editor = ThrottledMessageEditor(chat.send, min_interval=1.0, clock=clock)
+
+    # Act
+    await editor.append("The ")
+    clock.now = 0.3
+    await editor.append("boiler ")
+    clock.now = 0.6
+    await editor.append("is ")
+    clock.now = 1.1
+    await editor.append("fine")
+    clock.now = 1.5
+    await editor.append(".")
+    clock.now = 2.2
+    await editor.finish()
+
+    # Assert
+    assert len(chat.messages) == 1
+    assert chat.messages[0].history == [
+        "The ",
+        "The boiler is fine",
+        "The boiler is fine.",
+    ]
+    assert editor.edits == 2
+
+
+async def test_finish_skips_edit_when_text_is_already_shown() -> None:
+    """Verify that no redundant edit is made, which Telegram would reject."""
+    # Arrange
+    chat = FakeChat()
+    editor = ThrottledMessageEditor(chat.send, min_interval=0, clock=FakeClock())
+
+    # Act
+    await editor.append("Done.")
+    await editor.finish()
+
+    # Assert
+    assert chat.messages[0].history == ["Done."]
+    assert editor.edits == 0
+
+
+async def test_long_answers_continue_in_a_new_message() -> None:
+    """Verify that text beyond Telegram's length limit is split across messages."""
+    # Arrange
+    chat = FakeChat()
+    editor = ThrottledMessageEditor(chat.send, min_interval=0, clock=FakeClock())
+    long_text = "x" * TELEGRAM_MAX_MESSAGE_LENGTH
+
+    # Act
+    await editor.append(long_text)
+    await editor.append("tail")
+    await editor.finish()
+
+    # Assert
+    assert [message.history[-1] for message in chat.messages] == [long_text, "tail"]
+    assert editor.text == long_text + "tail"